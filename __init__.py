@@ -1,92 +1,141 @@
 __version__ = '0.6.2'
 __author__ = 'Jimmy Liu'
 
+import sys
+import importlib
+
 """
-for trading data
+公开接口按所在模块登记, 第一次访问 ts.xxx 时才导入对应的模块,
+import tushare 本身不导入pandas/lxml等依赖, 也不访问网络
 """
-from tushare.stock.trading import (set_use_cache, get_hist_data, get_tick_data,
-                                   get_realtime_quotes,
-                                   get_h_data, get_today_ticks,
-                                   get_index, get_hists, get_profit_yoy,
-                                   get_k_data, get_cfst,get_sina_caiwu_index,
-                                   get_sina_dd, get_etf_data,
-                                   get_debtpaying, get_profit, get_operation, get_growth,
-                                   get_djcw, get_mfratio, get_cbsheet,get_cbsheet_us,get_inst_us,get_cashflow_us, get_aastock_balance_sheet, get_wsj_hk_income_statement, get_wsj_hk_predict_pe, get_aastock_profit_loss, get_aastock_cash_flow,
-                                   get_wsj_hk_free_cash_flow,get_aastock_buyback,get_wsj_balance_sheet,set_current_year_season,
-                                   get_inst, get_k_data_qfq, get_market_cap, getZhangDieTing)
+_LAZY = {}
+
+
+def _lazy(module, names):
+    for name in names.split():
+        _LAZY[name] = module
 
-get_k_data('000651', start='2022-11-01')
 
 """
 for trading data
 """
-# from tushare.stock.fundamental import (get_stock_basics, get_report_data,get_report_data_by_code,get_stockstructure_data_by_code,get_cashflow_data_by_code,get_profitstat_data_by_code,
-#                                        get_profit_data,
-#                                        get_operation_data, get_growth_data,
-#                                        get_debtpaying_data, get_cashflow_data, get_profit_predictdc, get_profit_predictths, get_cbsheet_by_code)
-# from tushare.trader.trader import TraderAPI
+_lazy('tushare.stock.trading', '''
+      set_use_cache get_hist_data get_tick_data get_realtime_quotes
+      get_h_data get_today_ticks get_index get_hists get_profit_yoy
+      get_k_data get_k_data_many get_cfst get_sina_caiwu_index
+      get_sina_dd get_etf_data
+      get_debtpaying get_profit get_operation get_growth
+      get_djcw get_cwfx_many get_mfratio get_cbsheet get_cbsheet_us get_inst_us get_cashflow_us
+      get_aastock_balance_sheet get_wsj_hk_income_statement get_wsj_hk_predict_pe
+      get_aastock_profit_loss get_aastock_cash_flow
+      get_wsj_hk_free_cash_flow get_aastock_buyback get_wsj_balance_sheet
+      set_current_year_season
+      get_inst get_k_data_qfq get_market_cap getZhangDieTing
+      set_max_workers set_rate_limit set_max_in_flight''')
+_lazy('tushare.stock.quotes', 'QuoteStream')
+_lazy('tushare.stock.orderbook', 'OrderBook')
+_lazy('tushare.util.transport', 'set_transport')
+_lazy('tushare.util.cache', '''set_cache_dir set_cache_size set_cache_ttl
+      clear_cache cached''')
+_lazy('tushare.util.tickstore', 'set_tick_dir')
+_lazy('tushare.util.pitstore', 'set_pit_dir')
+
+"""
+for fundamental data
+"""
+_lazy('tushare.stock.fundamental', '''
+      get_stock_basics get_report_data get_report_data_by_code
+      get_stockstructure_data_by_code get_cashflow_data_by_code
+      get_profitstat_data_by_code get_profit_data
+      get_operation_data get_growth_data
+      get_debtpaying_data get_cashflow_data get_profit_predictdc
+      get_profit_predictths get_cbsheet_by_code get_statement
+      get_fundamental_panel get_fundamental_panels''')
+_lazy('tushare.trader.trader', 'TraderAPI')
 
 """
 for macro data
 """
-# from tushare.stock.macro import (get_gdp_year, get_gdp_quarter,
-#                                  get_gdp_for, get_gdp_pull,
-#                                  get_gdp_contrib, get_cpi,
-#                                  get_ppi, get_deposit_rate,
-#                                  get_loan_rate, get_rrr,
-#                                  get_money_supply, get_money_supply_bal)
+_lazy('tushare.stock.macro', '''
+      get_gdp_year get_gdp_quarter get_gdp_for get_gdp_pull
+      get_gdp_contrib get_cpi get_ppi get_deposit_rate
+      get_loan_rate get_rrr get_money_supply get_money_supply_bal''')
 
 """
 for classifying data
 """
-# from tushare.stock.classifying import (get_industry_classified, get_concept_classified,
-#                                        get_area_classified, get_gem_classified,
-#                                        get_sme_classified, get_st_classified,
-#                                        get_hs300s, get_sz50s, get_zz500s,
-#                                        get_terminated, get_suspended)
+_lazy('tushare.stock.classifying', '''
+      get_industry_classified get_concept_classified
+      get_area_classified get_gem_classified
+      get_sme_classified get_st_classified
+      get_hs300s get_sz50s get_zz500s
+      get_terminated get_suspended''')
 
 """
-for macro data
+for news data
 """
-# from tushare.stock.newsevent import (get_latest_news, latest_content,
-#                                      get_notices, notice_content,
-#                                      guba_sina)
+_lazy('tushare.stock.newsevent', '''
+      get_latest_news latest_content get_notices notice_content guba_sina''')
 
 """
 for reference
 """
-# from tushare.stock.reference import (profit_data, forecast_data,
-#                                      xsg_data, fund_holdings,
-#                                      new_stocks, sh_margins,
-#                                      sh_margin_details,
-#                                      sz_margins, sz_margin_details,
-#                                      top10_holders)
+_lazy('tushare.stock.reference', '''
+      profit_data forecast_data xsg_data fund_holdings
+      new_stocks sh_margins sh_margin_details
+      sz_margins sz_margin_details top10_holders''')
 
 """
 for shibor
 """
-# from tushare.stock.shibor import (shibor_data, shibor_quote_data,
-#                                   shibor_ma_data, lpr_data,
-#                                   lpr_ma_data)
+_lazy('tushare.stock.shibor', '''
+      shibor_data shibor_quote_data shibor_ma_data lpr_data lpr_ma_data''')
 
 """
 for LHB
 """
-# from tushare.stock.billboard import (top_list, cap_tops, broker_tops,
-#                                      inst_tops, inst_detail)
+_lazy('tushare.stock.billboard', 'top_list cap_tops broker_tops inst_tops inst_detail')
 
+"""
+for fund data
+"""
+_lazy('tushare.fund.nav', '''
+      get_nav_open get_nav_close get_nav_grading get_nav_history get_fund_info''')
 
 """
 for utils
 """
-# from tushare.util.dateu import (trade_cal, is_holiday)
-
+_lazy('tushare.util.dateu', '''trade_cal is_holiday is_trading_day TradeCalendar
+      next_trading_day prev_trading_day trading_days_between''')
 
 """
 for DataYes Token
 """
-# from tushare.util.upass import (set_token, get_token, get_broker,
-#                                 set_broker, remove_broker)
-#
-# from tushare.internet.boxoffice import (realtime_boxoffice, day_boxoffice,
-#                                         day_cinema, month_boxoffice)
+_lazy('tushare.util.upass', 'set_token get_token get_broker set_broker remove_broker')
+
+_lazy('tushare.internet.boxoffice', '''
+      realtime_boxoffice day_boxoffice day_cinema month_boxoffice''')
+
+__all__ = sorted(_LAZY)
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError("module 'tushare' has no attribute %r" % name)
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
+
+
+if sys.version_info < (3, 7):
+    # python3.7之前不支持模块级__getattr__, 导入时加载原来默认导出的交易类接口
+    for _name, _module in list(_LAZY.items()):
+        if _module in ('tushare.stock.trading', 'tushare.stock.quotes',
+                       'tushare.stock.orderbook', 'tushare.util.transport',
+                       'tushare.util.cache', 'tushare.util.tickstore'):
+            __getattr__(_name)
@@ -0,0 +1,16 @@
+# -*- coding:utf-8 -*-
+"""
+tushare的asyncio接口, 需要安装aiohttp
+    import tushare.aio as tsa
+    frames = await asyncio.gather(*[tsa.get_k_data(code) for code in codes])
+    await tsa.close()
+"""
+from tushare.aio.client import (set_max_concurrency, close)
+
+from tushare.aio.trading import (get_hist_data, get_tick_data,
+                                 get_today_ticks, get_realtime_quotes,
+                                 get_k_data)
+
+from tushare.aio.fundamental import (get_report_data, get_profit_data,
+                                     get_operation_data, get_growth_data,
+                                     get_debtpaying_data, get_cashflow_data)
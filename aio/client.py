@@ -0,0 +1,137 @@
+# -*- coding:utf-8 -*-
+"""
+异步HTTP客户端: 每个事件循环一个aiohttp会话, 全局信号量限制同时进行中的请求数,
+与同步传输层共用按域名的限速, 熔断和重试策略
+需要安装aiohttp: pip install aiohttp
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import time
+import asyncio
+import weakref
+from tushare.stock import cons as ct
+from tushare.util import workers as wk
+from tushare.util import retry as rt
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse
+
+_sessions = weakref.WeakKeyDictionary()
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def set_max_concurrency(max_concurrency):
+    """
+    设置异步接口同时进行中的请求数上限, 默认为ct.AIO_MAX_CONCURRENCY
+    """
+    ct.AIO_MAX_CONCURRENCY = max_concurrency
+    _semaphores.clear()
+
+
+def _session():
+    if aiohttp is None:
+        raise ImportError('tushare.aio需要安装aiohttp: pip install aiohttp')
+    loop = asyncio.get_running_loop()
+    s = _sessions.get(loop)
+    if s is None or s.closed:
+        limit = ct.HOST_MAX_IN_FLIGHT.get('default') or 0
+        s = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=0, limit_per_host=limit),
+            headers={'User-Agent': ct.HTTP_USER_AGENT})
+        _sessions[loop] = s
+    return s
+
+
+def _semaphore():
+    loop = asyncio.get_running_loop()
+    sem = _semaphores.get(loop)
+    if sem is None:
+        sem = asyncio.Semaphore(ct.AIO_MAX_CONCURRENCY)
+        _semaphores[loop] = sem
+    return sem
+
+
+async def close():
+    """
+    关闭当前事件循环的会话, 在事件循环结束前调用
+    """
+    loop = asyncio.get_running_loop()
+    s = _sessions.pop(loop, None)
+    if s is not None:
+        await s.close()
+
+
+async def _request(url, headers=None, timeout=None):
+    session = _session()
+    # 限速时不占用并发名额, 非阻塞地等到预订的令牌可用
+    wait = wk.throttle_delay(url)
+    if wait > 0:
+        await asyncio.sleep(wait)
+    timeout = aiohttp.ClientTimeout(total=timeout or ct.HTTP_TIMEOUT)
+    try:
+        async with _semaphore():
+            async with session.get(url, headers=headers, timeout=timeout) as r:
+                r.raise_for_status()
+                return await r.read()
+    except aiohttp.ClientResponseError:
+        raise
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        # 连接错误和超时转为IOError, 与同步传输层一样视为可重试
+        raise IOError('%s: %s' % (type(e).__name__, e))
+
+
+async def get(url, headers=None, timeout=None):
+    """
+    异步GET请求, 返回响应内容(bytes), HTTP错误状态时抛出异常
+    网络错误和5xx计入该域名的熔断计数
+    """
+    host = urlparse(url).netloc
+    try:
+        rt.breaker.allow(host)
+        content = await _request(url, headers, timeout)
+    except Exception as e:
+        if rt.is_retryable(e):
+            rt.breaker.failure(host)
+        raise
+    rt.breaker.success(host)
+    return content
+
+
+async def fetch(url, headers=None, timeout=None, retry_count=3, pause=0.001):
+    """
+    带重试的异步GET请求, 退避策略同rt.attempts, 等待时不阻塞事件循环
+    最终失败时抛出最后一次的错误
+    Parameters
+    ------
+      url: string
+      headers: dict 额外的请求头
+      timeout: int 超时秒数, 为空时使用ct.HTTP_TIMEOUT
+      retry_count : int, 默认 3
+                 如遇网络等问题重复执行的次数
+      pause : int, 默认 0
+                重复请求数据过程中暂停的秒数
+    """
+    policy = rt.RetryPolicy(retry_count, max(pause, ct.RETRY_BACKOFF))
+    start = time.time()
+    error = IOError(ct.NETWORK_URL_ERROR_MSG)
+    for i in range(policy.retries):
+        if i > 0:
+            d = policy.delay(i)
+            if policy.deadline and time.time() - start + d > policy.deadline:
+                break
+            await asyncio.sleep(d)
+        try:
+            return await get(url, headers, timeout)
+        except Exception as e:
+            if not rt.is_retryable(e):
+                raise
+            print(e)
+            error = e
+    raise error
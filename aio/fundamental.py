@@ -0,0 +1,73 @@
+# -*- coding:utf-8 -*-
+"""
+业绩报表类接口的异步版本, 逐页获取, 解析与同步接口共用
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+from tushare.stock import cons as ct
+from tushare.stock import fundamental as fd
+from tushare.util import paging as pg
+from tushare.aio import client
+
+
+async def _fd_pages(kind, year, quarter):
+    frames = []
+    seen = set()
+    page = 1
+    while page is not None and str(page) not in seen:
+        seen.add(str(page))
+        text = await client.fetch(fd._fd_page_url(kind, year, quarter, page),
+                                  timeout=60)
+        df, page = fd._parse_fd_text(kind, text)
+        if df is not None and len(df) > 0:
+            frames.append(df)
+    return fd._fd_code(pg.concat_pages(frames))
+
+
+async def get_report_data(year, quarter):
+    """
+    异步获取业绩报表数据, 参数和返回值同tushare.get_report_data
+    """
+    if ct._check_input(year, quarter) is True:
+        return await _fd_pages('report', year, quarter)
+
+
+async def get_profit_data(year, quarter):
+    """
+    异步获取盈利能力数据, 参数和返回值同tushare.get_profit_data
+    """
+    if ct._check_input(year, quarter) is True:
+        return await _fd_pages('profit', year, quarter)
+
+
+async def get_operation_data(year, quarter):
+    """
+    异步获取营运能力数据, 参数和返回值同tushare.get_operation_data
+    """
+    if ct._check_input(year, quarter) is True:
+        return await _fd_pages('operation', year, quarter)
+
+
+async def get_growth_data(year, quarter):
+    """
+    异步获取成长能力数据, 参数和返回值同tushare.get_growth_data
+    """
+    if ct._check_input(year, quarter) is True:
+        return await _fd_pages('growth', year, quarter)
+
+
+async def get_debtpaying_data(year, quarter):
+    """
+    异步获取偿债能力数据, 参数和返回值同tushare.get_debtpaying_data
+    """
+    if ct._check_input(year, quarter) is True:
+        return await _fd_pages('debtpaying', year, quarter)
+
+
+async def get_cashflow_data(year, quarter):
+    """
+    异步获取现金流量数据, 参数和返回值同tushare.get_cashflow_data
+    """
+    if ct._check_input(year, quarter) is True:
+        return await _fd_pages('cashflow', year, quarter)
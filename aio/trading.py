@@ -0,0 +1,93 @@
+# -*- coding:utf-8 -*-
+"""
+交易数据接口的异步版本, 请求url和解析与同步接口共用, 只有网络I/O在事件循环中完成
+如: df = await tushare.aio.get_k_data('600848')
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import asyncio
+import pandas as pd
+from tushare.stock import cons as ct
+from tushare.stock import trading as td
+from tushare.util import dateu as du
+from tushare.aio import client
+
+
+async def get_hist_data(code=None, start=None, end=None,
+                        ktype='D', retry_count=3, pause=0.001):
+    """
+    异步获取个股历史交易记录, 参数和返回值同tushare.get_hist_data
+    """
+    lines = await client.fetch(td._hist_data_url(code, ktype), timeout=10,
+                               retry_count=retry_count, pause=pause)
+    if len(lines) < 15:  # no data
+        return None
+    return td._parse_hist_data(lines, code, start, end, ktype)
+
+
+async def get_tick_data(code=None, date=None, retry_count=3, pause=0.001):
+    """
+    异步获取分笔数据, 参数和返回值同tushare.get_tick_data
+    """
+    if code is None or len(code) != 6 or date is None:
+        return None
+    lines = await client.fetch(td._tick_data_url(code, date), timeout=10,
+                               retry_count=retry_count, pause=pause)
+    return td._parse_tick_data(lines)
+
+
+async def get_today_ticks(code=None, retry_count=3, pause=0.001):
+    """
+    异步获取当日分笔明细数据, 各页并发获取, 参数和返回值同tushare.get_today_ticks
+    """
+    if code is None or len(code) != 6:
+        return None
+    symbol = td._code_to_symbol(code)
+    date = du.today()
+    text = await client.fetch(td._today_ticks_pages_url(symbol, date), timeout=10,
+                              retry_count=retry_count, pause=pause)
+    pages = td._parse_today_ticks_pages(text)
+    if pages == 0:
+        return pd.DataFrame(columns=ct.TODAY_TICK_COLUMNS)
+    texts = await asyncio.gather(*[client.fetch(td._today_ticks_url(symbol, date, pNo),
+                                                timeout=10, retry_count=retry_count,
+                                                pause=pause)
+                                   for pNo in range(1, pages + 1)])
+    return pd.concat([td._parse_today_ticks(t) for t in texts], ignore_index=True)
+
+
+async def get_realtime_quotes(symbols=None):
+    """
+    异步获取实时交易数据, 参数和返回值同tushare.get_realtime_quotes
+    """
+    text = await client.fetch(td._realtime_quotes_url(symbols), timeout=10)
+    return td._parse_realtime_quotes(text)
+
+
+async def get_k_data(code=None, start='', end='',
+                     ktype='D', autype='qfq',
+                     index=False,
+                     retry_count=3,
+                     pause=0.001):
+    """
+    异步获取k线数据, 按年份拆分的各个url并发获取, 参数和返回值同tushare.get_k_data
+    """
+    urls, dataflag, symbol = td._k_data_urls(code, start, end, ktype, autype, index)
+    frames = await asyncio.gather(*[_get_k_data(url, dataflag, symbol, code,
+                                                index, ktype, retry_count, pause)
+                                    for url in urls])
+    return td._merge_k_data(frames, start, end, ktype)
+
+
+async def _get_k_data(url, dataflag='', symbol='', code='', index=False,
+                      ktype='', retry_count=1, pause=0.001):
+    try:
+        lines = await client.fetch(url, retry_count=retry_count, pause=pause)
+    except Exception as e:
+        print(e)
+        return None
+    lines = lines.decode('utf-8')
+    if len(lines) < 100:  # no data
+        return None
+    return td._parse_k_data(lines, dataflag, symbol, code, index, ktype)
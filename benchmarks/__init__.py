@@ -0,0 +1,61 @@
+# -*- coding:utf-8 -*-
+"""
+性能基准脚本, 不访问网络(网络请求由StubTransport返回构造的数据), 每个脚本单独运行:
+    python -m tushare.benchmarks.convert_billion
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import time
+import tracemalloc
+from tushare.util import workers as wk
+
+
+def best(func, repeat=3):
+    """
+    运行repeat次, 返回最短耗时(秒)和最后一次的返回值
+    """
+    res, cost = None, None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        res = func()
+        elapsed = time.perf_counter() - start
+        cost = elapsed if cost is None else min(cost, elapsed)
+    return cost, res
+
+
+def peak_memory(func):
+    """
+    运行一次, 返回Python分配的峰值内存(MB)和返回值
+    """
+    tracemalloc.start()
+    try:
+        res = func()
+        return tracemalloc.get_traced_memory()[1] / 1024.0 / 1024.0, res
+    finally:
+        tracemalloc.stop()
+
+
+def report(name, seconds, note=''):
+    print('%-40s %10.4f s  %s' % (name, seconds, note))
+
+
+class StubTransport(object):
+    """
+    tp.set_transport使用的假传输层, respond(url)返回bytes
+    throttle为True时与默认传输层一样按ct.HOST_RATE_LIMITS限速, latency为模拟的每个请求的网络耗时(秒)
+    """
+
+    def __init__(self, respond, throttle=False, latency=0):
+        self.respond = respond
+        self.throttle = throttle
+        self.latency = latency
+        self.calls = 0
+
+    def get(self, url, headers=None, timeout=None):
+        if self.throttle:
+            wk.throttle(url)
+        if self.latency:
+            time.sleep(self.latency)
+        self.calls += 1
+        return self.respond(url)
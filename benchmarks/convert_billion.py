@@ -0,0 +1,24 @@
+# -*- coding:utf-8 -*-
+"""
+__convert_billion_dataframe: 向量化实现与原来逐个单元格转换的对比
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import numpy as np
+from tushare.benchmarks import best, report
+from tushare.stock import trading as td
+from tushare.tests.test_convert_billion import convert_loop, random_frame
+
+
+def main(rows=400, cols=40):
+    df = random_frame(np.random.default_rng(0), rows, cols)
+    convert = getattr(td, '__convert_billion_dataframe')
+    new, _ = best(lambda: convert(df))
+    old, _ = best(lambda: convert_loop(df), repeat=1)
+    report('convert_billion vectorized %dx%d' % (rows, cols), new)
+    report('convert_billion loop %dx%d' % (rows, cols), old, 'x%.1f' % (old / new))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+# -*- coding:utf-8 -*-
+"""
+get_cwfx_many批量获取腾讯财务比率: 桩传输层按ct.HOST_RATE_LIMITS限速并模拟每个请求的网络耗时,
+对比逐个请求、默认限速下并发、取消gtimg.cn限速后并发三种情况
+缓存写到临时目录并且不读取, 构造的数据不会进入真实的缓存
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import json
+import shutil
+import tempfile
+import time
+from tushare.benchmarks import StubTransport, report
+from tushare.stock import cons as ct
+from tushare.stock import trading as td
+from tushare.util import cache
+from tushare.util import transport as tp
+
+
+def payload(url):
+    rows = [{'bgrq': '%d-%02d-%02d' % (2021, m, d), 'jlrkc': '1,234.5', 'xsmll': '31.2',
+             'jzcsyl': '--'} for m, d in [(3, 31), (6, 30), (9, 30), (12, 31)]]
+    return ('var cwfx=%s;' % json.dumps({'data': {'ylnl': rows}})).encode('utf-8')
+
+
+def run(codes, years, max_workers, latency, throttle=True):
+    stub = StubTransport(payload, throttle=throttle, latency=latency)
+    old = tp.set_transport(stub)
+    try:
+        start = time.perf_counter()
+        df = td.get_cwfx_many(codes, years, 'profit', update=True, max_workers=max_workers)
+        return time.perf_counter() - start, stub.calls, len(df)
+    finally:
+        tp.set_transport(old)
+
+
+def main(n=100, years=(2020, 2021), latency=0.05):
+    cache_dir, tmp = ct.CACHE_DIR, tempfile.mkdtemp()
+    cache.set_cache_dir(tmp)
+    rate = ct.HOST_RATE_LIMITS.get('gtimg.cn')
+    codes = ['%06d' % (600000 + i) for i in range(n)]
+    try:
+        for name, workers in [('sequential', 1), ('%d workers' % ct.MAX_WORKERS, None)]:
+            cost, calls, rows = run(codes, years, workers, latency)
+            report('cwfx %s, gtimg.cn %s/s' % (name, rate), cost,
+                   '%d requests, %.0f req/s, %d rows' % (calls, calls / cost, rows))
+        td.set_rate_limit('gtimg.cn', None)
+        cost, calls, rows = run(codes, years, None, latency)
+        report('cwfx %d workers, no limit' % ct.MAX_WORKERS, cost,
+               '%d requests, %.0f req/s, %d rows' % (calls, calls / cost, rows))
+    finally:
+        td.set_rate_limit('gtimg.cn', rate)
+        cache.set_cache_dir(cache_dir)
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
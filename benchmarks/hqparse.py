@@ -0,0 +1,69 @@
+# -*- coding:utf-8 -*-
+"""
+sinajs实时行情解析: 500/2000/5000个代码的行情文本, 原来的正则+逐行split+逐列转换float
+与hqparse.read_quotes一次read_csv的对比
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import re
+import pandas as pd
+from tushare.benchmarks import best, report
+from tushare.stock import cons as ct
+from tushare.stock import trading as td
+
+
+def payload(n):
+    """
+    构造n个代码的行情文本(GBK), 每50个代码有一个不存在的空行
+    """
+    lines = []
+    for i in range(n):
+        symbol = 'sh%06d' % (600000 + i)
+        if i % 50 == 49:
+            lines.append('var hq_str_%s="";' % symbol)
+            continue
+        p = 10 + i % 90 * 0.11
+        fields = [u'股票%d' % i] + ['%.3f' % (p + k * 0.01) for k in range(7)]
+        fields += ['%d' % (100000 + i * 7), '%.3f' % (p * (100000 + i * 7))]
+        for k in range(20):
+            fields.append('%d' % (100 * (k + 1)) if k % 2 == 0 else '%.3f' % (p + k * 0.01))
+        fields += ['2026-10-16', '15:00:00', '00']
+        lines.append('var hq_str_%s="%s";' % (symbol, ','.join(fields)))
+    return '\n'.join(lines).encode('GBK')
+
+
+def parse_old(text):
+    """
+    原来的_parse_realtime_quotes, 之后把数值列转换为float
+    """
+    text = text.decode('GBK')
+    data = re.compile(r'\="(.*?)\";').findall(text)
+    syms = re.compile(r'(?:sh|sz)(.*?)\=').findall(text)
+    data_list, syms_list = [], []
+    for index, row in enumerate(data):
+        if len(row) > 1:
+            data_list.append([astr for astr in row.split(',')])
+            syms_list.append(syms[index])
+    df = pd.DataFrame(data_list, columns=ct.LIVE_DATA_COLS)
+    df = df.drop('s', axis=1)
+    df['code'] = syms_list
+    for txt in [c for c in df.columns if '_v' in c]:
+        df[txt] = df[txt].map(lambda x: x[:-2])
+    for col in ct.LIVE_DATA_COLS[1:30]:
+        df[col] = df[col].astype(float)
+    return df
+
+
+def main(sizes=(500, 2000, 5000)):
+    for n in sizes:
+        text = payload(n)
+        old, _ = best(lambda: parse_old(text))
+        new, df = best(lambda: td._parse_realtime_quotes(text))
+        report('realtime quotes %d symbols old' % n, old)
+        report('realtime quotes %d symbols read_quotes' % n, new,
+               'x%.1f, %d rows' % (old / new, len(df)))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+# -*- coding:utf-8 -*-
+"""
+HTML表格提取: 业绩报告、盈利能力和龙虎榜统计页面, 原来etree.tostring拼接后pd.read_html重新解析
+与htmltable.read_table直接从lxml树中提取的对比
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+from io import StringIO
+import lxml.html
+from lxml import etree
+import pandas as pd
+from tushare.benchmarks import best, report
+from tushare.benchmarks.paging import table_page
+from tushare.stock import cons as ct
+from tushare.stock import ref_vars as rv
+from tushare.util import htmltable as ht
+
+# 页面: (表格属性, 列名, 删除的列, 页面中的列数)
+PAGES = {'report': ('class="list_table"', ct.REPORT_COLS, [11], len(ct.REPORT_COLS) + 1),
+         'profit': ('class="list_table"', ct.PROFIT_COLS, None, len(ct.PROFIT_COLS)),
+         'billboard': ('id="dataTable"', rv.LHB_GGTJ_COLS, None, len(rv.LHB_GGTJ_COLS))}
+
+
+def read_old(rows, cols, drop):
+    """
+    原来的做法: 把tr节点序列化后拼成一个表格交给pd.read_html
+    """
+    sarr = '<table>%s</table>' % ''.join(etree.tostring(node).decode('utf-8') for node in rows)
+    df = pd.read_html(StringIO(sarr))[0]
+    if drop is not None:
+        df = df.drop(drop, axis=1)
+    df.columns = cols
+    return df
+
+
+def main(sizes=(ct.PAGE_NUM[1], 3000)):
+    for rows in sizes:
+        run(rows, max(1, 1200 // rows))
+
+
+def run(rows, repeat):
+    for kind, (attr, cols, drop, width) in sorted(PAGES.items()):
+        text = table_page(rows, width, 1, 1, table=attr).decode('GBK')
+        trs = lxml.html.parse(StringIO(text)).xpath('//table[@%s]/tr' % attr)
+        old, _ = best(lambda: [read_old(trs, cols, drop) for _ in range(repeat)])
+        new, df = best(lambda: [ht.read_table(trs, cols, drop=drop) for _ in range(repeat)])
+        report('%s page %d rows read_html x%d' % (kind, rows, repeat), old)
+        report('%s page %d rows read_table x%d' % (kind, rows, repeat), new,
+               'x%.1f, %d columns' % (old / new, df[0].shape[1]))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+# -*- coding:utf-8 -*-
+"""
+JavaScript对象字面量解析: 构造大的Market_Center.getHQNodeData返回(classifying._get_detail),
+对比原来的eval, 正则改写+read_json 与 jsparse.loads
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import json
+import re
+from io import StringIO
+import pandas as pd
+from tushare.benchmarks import best, report
+from tushare.stock import cons as ct
+from tushare.util import jsparse
+
+
+def payload(rows):
+    items = []
+    for i in range(rows):
+        p = 10 + i % 90 * 0.11
+        items.append(u'{symbol:"sh%06d",code:"%06d",name:"股票%d",trade:"%.3f",pricechange:"0.120",'
+                     u'changepercent:"1.210",buy:"%.3f",sell:"%.3f",settlement:"%.3f",open:"%.3f",'
+                     u'high:"%.3f",low:"%.3f",volume:%d,amount:%d,ticktime:"15:00:00",per:12.5,'
+                     u'pb:1.32,mktcap:%.4f,nmc:%.4f,turnoverratio:0.35}'
+                     % (600000 + i, 600000 + i, i, p, p, p, p, p, p, p, 100000 + i, 1000000 + i,
+                        p * 1e5, p * 9e4))
+    return u'[%s]' % ','.join(items)
+
+
+class _Dummy(dict):
+    def __getitem__(self, key):
+        return key
+
+
+def parse_eval(text):
+    return pd.DataFrame(eval(text, {}, _Dummy()), columns=ct.THE_FIELDS)[ct.FOR_CLASSIFY_B_COLS]
+
+
+def parse_regex(text):
+    """
+    原来_get_detail中的做法
+    """
+    text = re.compile(r'\,(.*?)\:').sub(r',"\1":', text)
+    text = text.replace('"{symbol', '{"symbol')
+    text = text.replace('{symbol', '{"symbol"')
+    js = json.loads(json.dumps(text))
+    df = pd.DataFrame(pd.read_json(StringIO(js), dtype={'code': object}), columns=ct.THE_FIELDS)
+    return df[ct.FOR_CLASSIFY_B_COLS]
+
+
+def parse_jsparse(text):
+    """
+    现在_get_detail中的做法
+    """
+    return pd.DataFrame(jsparse.loads(text), columns=ct.THE_FIELDS)[ct.FOR_CLASSIFY_B_COLS]
+
+
+def main(rows=3000):
+    text = payload(rows)
+    size = len(text.encode('GBK')) / 1024.0
+    for name, func in [('eval', parse_eval), ('regex + read_json', parse_regex),
+                       ('jsparse.loads', parse_jsparse)]:
+        cost, df = best(lambda: func(text))
+        report('_get_detail %d rows %s' % (rows, name), cost, '%.0f KB, %d rows' % (size, len(df)))
+
+
+if __name__ == '__main__':
+    main()
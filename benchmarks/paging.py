@@ -0,0 +1,76 @@
+# -*- coding:utf-8 -*-
+"""
+分页抓取: 100页业绩报告, 原来每页递归一次并DataFrame.append(拼接已有的全部数据)
+与iter_pages逐页获取、最后一次拼接的耗时和峰值内存对比
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import pandas as pd
+from tushare.benchmarks import StubTransport, best, peak_memory, report
+from tushare.stock import cons as ct
+from tushare.stock import fundamental as fd
+from tushare.util import paging as pg
+from tushare.util import transport as tp
+
+
+def table_page(rows, cols, page, pages, table='class="list_table"', first=0):
+    """
+    构造新浪财经列表页: 一个表格和指向下一页的翻页链接, 最后一页没有下一页
+    第一列为代码, 第二列为名称, 其余为数字, 每7行有一个'--'
+    """
+    def cell(i, j):
+        if j == 0:
+            return '%06d' % (first + i)
+        if j == 1:
+            return u'股票%d' % (first + i)
+        if j == 3 and i % 7 == 0:
+            return '--'
+        return '%.2f' % (i * 0.37 + j)
+    body = ''.join('<tr>%s</tr>' % ''.join('<td>%s</td>' % cell(i, j) for j in range(cols))
+                   for i in range(rows))
+    pager = '<div class="pages"><a onclick="set_page_num(\'%d\')">下一页</a></div>' % (page + 1) \
+        if page < pages else ''
+    html = '<html><body><table %s>%s</table>%s</body></html>' % (table, body, pager)
+    return html.encode('GBK')
+
+
+def report_pages(pages, rows=ct.PAGE_NUM[1]):
+    def respond(url):
+        page = int(url.split('&p=')[1].split('&')[0])
+        return table_page(rows, len(ct.REPORT_COLS) + 1, page, pages, first=page * rows)
+    return respond
+
+
+def append_recursive(frames, page=0, acc=None):
+    """
+    原来的做法: 每一页拼接一次已有的全部数据, 然后递归获取下一页
+    """
+    acc = frames[page] if acc is None else pd.concat([acc, frames[page]], ignore_index=True)
+    if page + 1 < len(frames):
+        return append_recursive(frames, page + 1, acc)
+    return acc
+
+
+def main(pages=100):
+    texts = [report_pages(pages)('&p=%d&' % p) for p in range(1, pages + 1)]
+    frames = [fd._parse_fd_text('report', t)[0] for t in texts]
+    fetch = lambda p: (frames[int(p) - 1], int(p) + 1 if int(p) < pages else None)
+    old, _ = best(lambda: append_recursive(frames))
+    new, _ = best(lambda: pg.collect_pages(fetch))
+    old_mem, _ = peak_memory(lambda: append_recursive(frames))
+    new_mem, _ = peak_memory(lambda: pg.collect_pages(fetch))
+    report('%d pages recursive append' % pages, old, 'peak %.1f MB' % old_mem)
+    report('%d pages collect_pages' % pages, new, 'peak %.1f MB' % new_mem)
+    stub = StubTransport(report_pages(pages))
+    old_transport = tp.set_transport(stub)
+    try:
+        cost, df = best(lambda: fd.get_report_data(2020, 4), repeat=1)
+    finally:
+        tp.set_transport(old_transport)
+    print('')
+    report('get_report_data %d stub pages' % pages, cost, '%d rows, %d requests' % (len(df), stub.calls))
+
+
+if __name__ == '__main__':
+    main()
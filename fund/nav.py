@@ -12,14 +12,18 @@ from __future__ import division
 import time
 import json
 import re
+from io import StringIO
 import pandas as pd
 import numpy as np
 from tushare.fund import cons as ct
 from tushare.util import dateu as du
 try:
-    from urllib.request import urlopen, Request
+    from urllib.request import Request
 except ImportError:
-    from urllib2 import urlopen, Request
+    from urllib2 import Request
+from tushare.util import transport as tp
+from tushare.util import retry as rt
+from tushare.util import jsparse
 
 
 def get_nav_open(fund_type='all'):
@@ -253,7 +257,7 @@ def get_fund_info(code):
     '''
     request = ct.SINA_FUND_INFO_URL % (
         ct.P_TYPE['http'], ct.DOMAINS['ssf'], code)
-    text = urlopen(request, timeout=10).read()
+    text = tp.urlopen(request, timeout=10).read()
     text = text.decode('gbk')
     org_js = json.loads(text)
 
@@ -275,21 +279,13 @@ def _parse_fund_data(url, fund_type='open'):
     try:
         request = Request(url)
 
-        text = urlopen(request, timeout=10).read()
+        text = tp.urlopen(request, timeout=10).read()
         if text == 'null':
             return None
         text = text.decode('gbk') if ct.PY3 else text
         text = text.split('data:')[1].split(',exec_time')[0]
-        reg = re.compile(r'\,(.*?)\:')
-        text = reg.sub(r',"\1":', text)
-        text = text.replace('"{symbol', '{"symbol')
-        text = text.replace('{symbol', '{"symbol"')
-        if ct.PY3:
-            jstr = json.dumps(text)
-        else:
-            jstr = json.dumps(text, encoding='gbk')
-        org_js = json.loads(jstr)
-        fund_df = pd.DataFrame(pd.read_json(org_js, dtype={'symbol': object}),
+        fund_df = pd.DataFrame(pd.read_json(StringIO(jsparse.to_json(text)),
+                                            dtype={'symbol': object}),
                                columns=ct.NAV_COLUMNS[fund_type])
         fund_df.fillna(0, inplace=True)
         return fund_df
@@ -305,18 +301,14 @@ def _get_fund_num(url):
     ct._write_console()
     try:
         request = Request(url)
-        text = urlopen(request, timeout=10).read()
+        text = tp.urlopen(request, timeout=10).read()
         text = text.decode('gbk')
         if text == 'null':
             raise ValueError('get fund num error')
 
         text = text.split('((')[1].split('))')[0]
-        reg = re.compile(r'\,(.*?)\:')
-        text = reg.sub(r',"\1":', text)
-        text = text.replace('{total_num', '{"total_num"')
-        text = text.replace('null', '0')
-        org_js = json.loads(text)
-        nums = org_js["total_num"]
+        org_js = jsparse.loads(text)
+        nums = org_js["total_num"] or 0
         return int(nums)
     except Exception as er:
         print(str(er))
@@ -341,7 +333,7 @@ def _get_nav_histroy_num(code, start, end, ismonetary=False):
                           (ct.P_TYPE['http'], ct.DOMAINS['ssf'],
                            code, start, end))
 
-    text = urlopen(request, timeout=10).read()
+    text = tp.urlopen(request, timeout=10).read()
     text = text.decode('gbk')
     org_js = json.loads(text)
     status_code = int(org_js['result']['status']['code'])
@@ -357,8 +349,7 @@ def _parse_nav_history_data(code, start, end, nums, ismonetary=False, retry_coun
     if nums == 0:
         return None
 
-    for _ in range(retry_count):
-        time.sleep(pause)
+    for _ in rt.attempts(retry_count, pause):
         # try:
         ct._write_console()
 
@@ -370,7 +361,7 @@ def _parse_nav_history_data(code, start, end, nums, ismonetary=False, retry_coun
             request = Request(ct.SINA_NAV_HISTROY_DATA_URL %
                               (ct.P_TYPE['http'], ct.DOMAINS['ssf'],
                                code, start, end, nums))
-        text = urlopen(request, timeout=timeout).read()
+        text = tp.urlopen(request, timeout=timeout).read()
         text = text.decode('gbk')
         org_js = json.loads(text)
 
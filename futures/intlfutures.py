@@ -14,9 +14,10 @@ import pandas as pd
 from tushare.futures import cons as ct
 
 try:
-    from urllib.request import urlopen, Request
+    from urllib.request import Request
 except ImportError:
-    from urllib2 import urlopen, Request
+    from urllib2 import Request
+from tushare.util import transport as tp
     
     
 def get_intlfuture(symbols=None):
@@ -29,7 +30,7 @@ def get_intlfuture(symbols=None):
 def _get_data(url):
     try:
         request = Request(url)
-        data_str = urlopen(request, timeout=10).read()
+        data_str = tp.urlopen(request, timeout=10).read()
         data_str = data_str.split('=')[1]
         data_str = data_str.replace('futures', '"futures"')
         if six.PY3:
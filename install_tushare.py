@@ -76,6 +76,7 @@ setup(
     license='BSD',
     url='http://tushare.org',
     install_requires=read_install_requires(),
+    extras_require={'aio': ['aiohttp>=3.0']},
     keywords='Global Financial Data',
     classifiers=['Development Status :: 4 - Beta',
                  'Programming Language :: Python :: 2.6',
@@ -10,9 +10,11 @@ import pandas as pd
 from tushare.stock import cons as ct
 from tushare.util import dateu as du
 try:
-    from urllib.request import urlopen, Request
+    from urllib.request import Request
 except ImportError:
-    from urllib2 import urlopen, Request
+    from urllib2 import Request
+from tushare.util import transport as tp
+from tushare.util import retry as rt
 import time
 import json
 
@@ -37,12 +39,11 @@ def realtime_boxoffice(retry_count=3,pause=0.001):
               sumBoxOffice  累计票房（万） 
               time          数据获取时间
     """
-    for _ in range(retry_count):
-        time.sleep(pause)
+    for _ in rt.attempts(retry_count, pause):
         try:
             request = Request(ct.MOVIE_BOX%(ct.P_TYPE['http'], ct.DOMAINS['mbox'],
                               ct.BOX, _random()))
-            lines = urlopen(request, timeout = 10).read()
+            lines = tp.urlopen(request, timeout = 10).read()
             if len(lines) < 15: #no data
                 return None
         except Exception as e:
@@ -79,8 +80,7 @@ def day_boxoffice(date=None, retry_count=3, pause=0.001):
               SumBoxOffice  累计票房（万） 
               WomIndex      口碑指数 
     """
-    for _ in range(retry_count):
-        time.sleep(pause)
+    for _ in rt.attempts(retry_count, pause):
         try:
             if date is None:
                 date = 0
@@ -89,7 +89,7 @@ def day_boxoffice(date=None, retry_count=3, pause=0.001):
                 
             request = Request(ct.BOXOFFICE_DAY%(ct.P_TYPE['http'], ct.DOMAINS['mbox'],
                               ct.BOX, date, _random()))
-            lines = urlopen(request, timeout = 10).read()
+            lines = tp.urlopen(request, timeout = 10).read()
             if len(lines) < 15: #no data
                 return None
         except Exception as e:
@@ -131,12 +131,11 @@ def month_boxoffice(date=None, retry_count=3, pause=0.001):
         print(ct.BOX_INPUT_ERR_MSG)
         return
     date += '-01'
-    for _ in range(retry_count):
-        time.sleep(pause)
+    for _ in rt.attempts(retry_count, pause):
         try:
             request = Request(ct.BOXOFFICE_MONTH%(ct.P_TYPE['http'], ct.DOMAINS['mbox'],
                               ct.BOX, date))
-            lines = urlopen(request, timeout = 10).read()
+            lines = tp.urlopen(request, timeout = 10).read()
             if len(lines) < 15: #no data
                 return None
         except Exception as e:
@@ -173,25 +172,22 @@ def day_cinema(date=None, retry_count=3, pause=0.001):
     """
     if date is None:
         date = du.day_last_week(-1)
-    data = pd.DataFrame()
     ct._write_head()
-    for x in range(1, 11):
-        df = _day_cinema(date, x, retry_count,
-                                       pause)
-        if df is not None:
-            data = pd.concat([data, df])
-    data = data.drop_duplicates()
+    frames = [_day_cinema(date, x, retry_count, pause) for x in range(1, 11)]
+    frames = [df for df in frames if df is not None]
+    if len(frames) == 0:
+        return pd.DataFrame()
+    data = pd.concat(frames).drop_duplicates()
     return data.reset_index(drop=True)
 
 
 def _day_cinema(date=None, pNo=1, retry_count=3, pause=0.001):
     ct._write_console()
-    for _ in range(retry_count):
-        time.sleep(pause)
+    for _ in rt.attempts(retry_count, pause):
         try:
             request = Request(ct.BOXOFFICE_CBD%(ct.P_TYPE['http'], ct.DOMAINS['mbox'],
                               ct.BOX, pNo, date))
-            lines = urlopen(request, timeout = 10).read()
+            lines = tp.urlopen(request, timeout = 10).read()
             if len(lines) < 15: #no data
                 return None
         except Exception as e:
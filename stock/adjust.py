@@ -0,0 +1,129 @@
+# -*- coding:utf-8 -*-
+"""
+复权计算: 按股票代码缓存复权因子序列, 前复权/后复权/不复权都是价格数组乘以每行的乘数,
+一次NumPy运算完成; 因子可以增量合并, 前复权可以以任意日期为基准
+复权因子为后复权因子: 后复权价 = 原始价 * 当日因子, 前复权价 = 后复权价 / 基准日因子
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import threading
+import numpy as np
+import pandas as pd
+from tushare.util import dateu as du
+
+PRICE_COLS = ['open', 'high', 'close', 'low']
+# code -> {'date': datetime64数组(升序), 'factor': float数组, 'checked': 最近一次获取的日期}
+_factors = {}
+_lock = threading.Lock()
+
+
+def update_factors(code, df, checked=None):
+    """
+    把新获取的复权因子合并进缓存, 同一日期以新值为准, 返回合并后的因子序列
+    Parameters
+    ------
+      code: string 股票代码
+      df: DataFrame 列为date, factor, 可以只包含最近新增的部分
+      checked: string 获取日期 format：YYYY-MM-DD, 为空时为今天
+    """
+    dates = pd.to_datetime(df['date']).to_numpy(dtype='datetime64[ns]')
+    values = pd.to_numeric(df['factor'], errors='coerce').to_numpy(dtype=float)
+    valid = ~(np.isnat(dates) | np.isnan(values))
+    dates, values = dates[valid], values[valid]
+    with _lock:
+        old = _factors.get(code)
+        if old is not None:
+            keep = ~np.isin(old['date'], dates)
+            dates = np.concatenate([old['date'][keep], dates])
+            values = np.concatenate([old['factor'][keep], values])
+        order = np.argsort(dates, kind='stable')
+        dates, values = dates[order], values[order]
+        if len(dates) > 1:
+            # 新数据中同一日期出现多次时保留最后一个
+            last = np.append(dates[1:] != dates[:-1], True)
+            dates, values = dates[last], values[last]
+        _factors[code] = {'date': dates, 'factor': values,
+                          'checked': checked or du.today()}
+    return factor_series(code)
+
+
+def factor_series(code):
+    """
+    缓存的复权因子序列(以日期为索引的Series, 升序), 没有缓存时返回None
+    """
+    item = _factors.get(code)
+    if item is None:
+        return None
+    return pd.Series(item['factor'], index=pd.DatetimeIndex(item['date'], name='date'),
+                     name='factor')
+
+
+def get_factors(code, fetch, asof=None, refresh=False):
+    """
+    返回复权因子序列, 缓存中没有该股票, 或者缓存早于asof(默认今天)获取时调用fetch更新
+    Parameters
+    ------
+      code: string 股票代码
+      fetch: function 无参数, 返回date, factor两列的DataFrame
+      asof: string 需要用到的最晚日期 format：YYYY-MM-DD
+      refresh: bool 为True时总是重新获取
+    """
+    item = _factors.get(code)
+    day = du.today() if asof is None else str(asof)[:10]
+    if refresh or item is None or item['checked'] < min(day, du.today()):
+        return update_factors(code, fetch())
+    return factor_series(code)
+
+
+def clear_factors(code=None):
+    with _lock:
+        if code is None:
+            _factors.clear()
+        else:
+            _factors.pop(code, None)
+
+
+def factor_at(factors, dates):
+    """
+    每个日期当天生效的复权因子(该日期及之前最近的一个), 早于第一个因子的日期取第一个
+    Parameters
+    ------
+      factors: Series factor_series的返回值
+      dates: 日期或日期数组
+    """
+    keys = factors.index.to_numpy(dtype='datetime64[ns]')
+    when = np.asarray(pd.to_datetime(dates), dtype='datetime64[ns]')
+    pos = np.searchsorted(keys, when, side='right') - 1
+    return factors.to_numpy()[np.clip(pos, 0, len(keys) - 1)]
+
+
+def adjust(df, factor, autype='qfq', base=None, adjusted=False, cols=PRICE_COLS,
+           decimals=2):
+    """
+    复权计算, 价格列整体乘以每行的乘数, 返回新的DataFrame
+    Parameters
+    ------
+      df: DataFrame 包含cols中的价格列
+      factor: 与df各行对应的复权因子数组
+      autype: string qfq-前复权 hfq-后复权 None-不复权
+      base: float 前复权的基准因子, 为空时取factor中最后一个(最近日期的)因子
+      adjusted: bool df中的价格是否已经是后复权价格(如新浪复权页面)
+      cols: list 需要复权的价格列
+      decimals: int 保留的小数位数, 为None时不做舍入
+    """
+    factor = np.asarray(factor, dtype=float)
+    if autype == 'hfq':
+        mult = np.ones(len(factor)) if adjusted else factor
+    elif autype == 'qfq':
+        if base is None:
+            base = factor[-1]
+        mult = (1.0 if adjusted else factor) / base * np.ones(len(factor))
+    else:
+        mult = 1.0 / factor if adjusted else np.ones(len(factor))
+    values = df[cols].to_numpy(dtype=float) * mult[:, None]
+    if decimals is not None:
+        values = values.round(decimals)
+    df = df.copy()
+    df[cols] = values
+    return df
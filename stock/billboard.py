@@ -9,20 +9,24 @@ Created on 2015年6月10日
 """
 
 import pandas as pd
-from pandas.compat import StringIO
+from io import StringIO
 from tushare.stock import cons as ct
 import numpy as np
 import time
 import json
 import re
 import lxml.html
-from lxml import etree
 from tushare.util import dateu as du
+from tushare.util import paging as pg
 from tushare.stock import ref_vars as rv
 try:
-    from urllib.request import urlopen, Request
+    from urllib.request import Request
 except ImportError:
-    from urllib2 import urlopen, Request
+    from urllib2 import Request
+from tushare.util import transport as tp
+from tushare.util import retry as rt
+from tushare.util import jsparse
+from tushare.util import htmltable as ht
 
 
 def top_list(date = None, retry_count=3, pause=0.001):
@@ -59,17 +63,13 @@ def top_list(date = None, retry_count=3, pause=0.001):
     else:
         if(du.is_holiday(date)):
             return None
-    for _ in range(retry_count):
-        time.sleep(pause)
+    for _ in rt.attempts(retry_count, pause):
         try:
             request = Request(rv.LHB_URL%(ct.P_TYPE['http'], ct.DOMAINS['em'], date, date))
-            text = urlopen(request, timeout=10).read()
+            text = tp.urlopen(request, timeout=10).read()
             text = text.decode('GBK')
             text = text.split('_1=')[1]
-            text = eval(text, type('Dummy', (dict,), 
-                                           dict(__getitem__ = lambda s, n:n))())
-            text = json.dumps(text)
-            text = json.loads(text)
+            text = jsparse.loads(text)
             df = pd.DataFrame(text['data'], columns=rv.LHB_TMP_COLS)
             df.columns = rv.LHB_COLS
             df['buy'] = df['buy'].astype(float)
@@ -115,46 +115,25 @@ def cap_tops(days= 5, retry_count= 3, pause= 0.001):
         net：净额(万)
         bcount：买入席位数
         scount：卖出席位数
+    Raises
+    ------
+    IOError: 某一页多次重试后仍然获取失败时抛出, 不返回已获取的部分数据
     """
     
     if ct._check_lhb_input(days) is True:
         ct._write_head()
-        df =  _cap_tops(days, pageNo=1, retry_count=retry_count,
+        df =  _cap_tops(days, retry_count=retry_count,
                         pause=pause)
-        df['code'] = df['code'].map(lambda x: str(x).zfill(6))
         if df is not None:
+            df['code'] = df['code'].map(lambda x: str(x).zfill(6))
             df = df.drop_duplicates('code')
         return df
     
     
-def _cap_tops(last=5, pageNo=1, retry_count=3, pause=0.001, dataArr=pd.DataFrame()):   
-    ct._write_console()
-    for _ in range(retry_count):
-        time.sleep(pause)
-        try:
-            request = Request(rv.LHB_SINA_URL%(ct.P_TYPE['http'], ct.DOMAINS['vsf'], rv.LHB_KINDS[0],
-                                               ct.PAGES['fd'], last, pageNo))
-            text = urlopen(request, timeout=10).read()
-            text = text.decode('GBK')
-            html = lxml.html.parse(StringIO(text))
-            res = html.xpath("//table[@id=\"dataTable\"]/tr")
-            if ct.PY3:
-                sarr = [etree.tostring(node).decode('utf-8') for node in res]
-            else:
-                sarr = [etree.tostring(node) for node in res]
-            sarr = ''.join(sarr)
-            sarr = '<table>%s</table>'%sarr
-            df = pd.read_html(sarr)[0]
-            df.columns = rv.LHB_GGTJ_COLS
-            dataArr = dataArr.append(df, ignore_index=True)
-            nextPage = html.xpath('//div[@class=\"pages\"]/a[last()]/@onclick')
-            if len(nextPage)>0:
-                pageNo = re.findall(r'\d+', nextPage[0])[0]
-                return _cap_tops(last, pageNo, retry_count, pause, dataArr)
-            else:
-                return dataArr
-        except Exception as e:
-            print(e)
+def _cap_tops(last=5, retry_count=3, pause=0.001):
+    return pg.collect_pages(lambda pageNo: _lhb_page(rv.LHB_KINDS[0], last, pageNo,
+                                                     rv.LHB_GGTJ_COLS),
+                            retry_count=retry_count, pause=pause)
             
 
 def broker_tops(days= 5, retry_count= 3, pause= 0.001):
@@ -177,42 +156,21 @@ def broker_tops(days= 5, retry_count= 3, pause= 0.001):
     samount：累积卖出额(万)
     scount：卖出席位数
     top3：买入前三股票
+    Raises
+    ------
+    IOError: 某一页多次重试后仍然获取失败时抛出, 不返回已获取的部分数据
     """
     if ct._check_lhb_input(days) is True:
         ct._write_head()
-        df =  _broker_tops(days, pageNo=1, retry_count=retry_count,
+        df =  _broker_tops(days, retry_count=retry_count,
                         pause=pause)
         return df
 
 
-def _broker_tops(last=5, pageNo=1, retry_count=3, pause=0.001, dataArr=pd.DataFrame()):   
-    ct._write_console()
-    for _ in range(retry_count):
-        time.sleep(pause)
-        try:
-            request = Request(rv.LHB_SINA_URL%(ct.P_TYPE['http'], ct.DOMAINS['vsf'], rv.LHB_KINDS[1],
-                                               ct.PAGES['fd'], last, pageNo))
-            text = urlopen(request, timeout=10).read()
-            text = text.decode('GBK')
-            html = lxml.html.parse(StringIO(text))
-            res = html.xpath("//table[@id=\"dataTable\"]/tr")
-            if ct.PY3:
-                sarr = [etree.tostring(node).decode('utf-8') for node in res]
-            else:
-                sarr = [etree.tostring(node) for node in res]
-            sarr = ''.join(sarr)
-            sarr = '<table>%s</table>'%sarr
-            df = pd.read_html(sarr)[0]
-            df.columns = rv.LHB_YYTJ_COLS
-            dataArr = dataArr.append(df, ignore_index=True)
-            nextPage = html.xpath('//div[@class=\"pages\"]/a[last()]/@onclick')
-            if len(nextPage)>0:
-                pageNo = re.findall(r'\d+', nextPage[0])[0]
-                return _broker_tops(last, pageNo, retry_count, pause, dataArr)
-            else:
-                return dataArr
-        except Exception as e:
-            print(e)
+def _broker_tops(last=5, retry_count=3, pause=0.001):
+    return pg.collect_pages(lambda pageNo: _lhb_page(rv.LHB_KINDS[1], last, pageNo,
+                                                     rv.LHB_YYTJ_COLS),
+                            retry_count=retry_count, pause=pause)
         
 
 def inst_tops(days= 5, retry_count= 3, pause= 0.001):
@@ -236,44 +194,23 @@ def inst_tops(days= 5, retry_count= 3, pause= 0.001):
     samount:累积卖出额(万)
     scount:卖出次数
     net:净额(万)
+    Raises
+    ------
+    IOError: 某一页多次重试后仍然获取失败时抛出, 不返回已获取的部分数据
     """
     if ct._check_lhb_input(days) is True:
         ct._write_head()
-        df =  _inst_tops(days, pageNo=1, retry_count=retry_count,
+        df =  _inst_tops(days, retry_count=retry_count,
                         pause=pause)
-        df['code'] = df['code'].map(lambda x: str(x).zfill(6))
+        if df is not None:
+            df['code'] = df['code'].map(lambda x: str(x).zfill(6))
         return df 
  
 
-def _inst_tops(last=5, pageNo=1, retry_count=3, pause=0.001, dataArr=pd.DataFrame()):   
-    ct._write_console()
-    for _ in range(retry_count):
-        time.sleep(pause)
-        try:
-            request = Request(rv.LHB_SINA_URL%(ct.P_TYPE['http'], ct.DOMAINS['vsf'], rv.LHB_KINDS[2],
-                                               ct.PAGES['fd'], last, pageNo))
-            text = urlopen(request, timeout=10).read()
-            text = text.decode('GBK')
-            html = lxml.html.parse(StringIO(text))
-            res = html.xpath("//table[@id=\"dataTable\"]/tr")
-            if ct.PY3:
-                sarr = [etree.tostring(node).decode('utf-8') for node in res]
-            else:
-                sarr = [etree.tostring(node) for node in res]
-            sarr = ''.join(sarr)
-            sarr = '<table>%s</table>'%sarr
-            df = pd.read_html(sarr)[0]
-            df = df.drop([2,3], axis=1)
-            df.columns = rv.LHB_JGZZ_COLS
-            dataArr = dataArr.append(df, ignore_index=True)
-            nextPage = html.xpath('//div[@class=\"pages\"]/a[last()]/@onclick')
-            if len(nextPage)>0:
-                pageNo = re.findall(r'\d+', nextPage[0])[0]
-                return _inst_tops(last, pageNo, retry_count, pause, dataArr)
-            else:
-                return dataArr
-        except Exception as e:
-            print(e)
+def _inst_tops(last=5, retry_count=3, pause=0.001):
+    return pg.collect_pages(lambda pageNo: _lhb_page(rv.LHB_KINDS[2], last, pageNo,
+                                                     rv.LHB_JGZZ_COLS, drop=[2, 3]),
+                            retry_count=retry_count, pause=pause)
 
 
 def inst_detail(retry_count= 3, pause= 0.001):
@@ -294,45 +231,42 @@ def inst_detail(retry_count= 3, pause= 0.001):
     bamount:机构席位买入额(万)     
     samount:机构席位卖出额(万)     
     type:类型
+    Raises
+    ------
+    IOError: 某一页多次重试后仍然获取失败时抛出, 不返回已获取的部分数据
     """
     ct._write_head()
-    df =  _inst_detail(pageNo=1, retry_count=retry_count,
+    df =  _inst_detail(retry_count=retry_count,
                         pause=pause)
-    if len(df)>0:
+    if df is not None and len(df)>0:
         df['code'] = df['code'].map(lambda x: str(x).zfill(6))
     return df  
  
 
-def _inst_detail(pageNo=1, retry_count=3, pause=0.001, dataArr=pd.DataFrame()):   
-    ct._write_console()
-    for _ in range(retry_count):
-        time.sleep(pause)
-        try:
-            request = Request(rv.LHB_SINA_URL%(ct.P_TYPE['http'], ct.DOMAINS['vsf'], rv.LHB_KINDS[3],
-                                               ct.PAGES['fd'], '', pageNo))
-            text = urlopen(request, timeout=10).read()
-            text = text.decode('GBK')
-            html = lxml.html.parse(StringIO(text))
-            res = html.xpath("//table[@id=\"dataTable\"]/tr")
-            if ct.PY3:
-                sarr = [etree.tostring(node).decode('utf-8') for node in res]
-            else:
-                sarr = [etree.tostring(node) for node in res]
-            sarr = ''.join(sarr)
-            sarr = '<table>%s</table>'%sarr
-            df = pd.read_html(sarr)[0]
-            df.columns = rv.LHB_JGMX_COLS
-            dataArr = dataArr.append(df, ignore_index=True)
-            nextPage = html.xpath('//div[@class=\"pages\"]/a[last()]/@onclick')
-            if len(nextPage)>0:
-                pageNo = re.findall(r'\d+', nextPage[0])[0]
-                return _inst_detail(pageNo, retry_count, pause, dataArr)
-            else:
-                return dataArr
-        except Exception as e:
-            print(e)
+def _inst_detail(retry_count=3, pause=0.001):
+    return pg.collect_pages(lambda pageNo: _lhb_page(rv.LHB_KINDS[3], '', pageNo,
+                                                     rv.LHB_JGMX_COLS),
+                            retry_count=retry_count, pause=pause)
 
             
+def _lhb_page(kind, last, pageNo, cols, drop=None):
+    """
+    获取并解析龙虎榜统计的一页, 返回(该页DataFrame, 下一页页码)
+    """
+    ct._write_console()
+    request = Request(rv.LHB_SINA_URL%(ct.P_TYPE['http'], ct.DOMAINS['vsf'], kind,
+                                       ct.PAGES['fd'], last, pageNo))
+    text = tp.urlopen(request, timeout=10).read()
+    text = text.decode('GBK')
+    html = lxml.html.parse(StringIO(text))
+    res = html.xpath("//table[@id=\"dataTable\"]/tr")
+    df = ht.read_table(res, cols, drop=drop)
+    nextPage = html.xpath('//div[@class=\"pages\"]/a[last()]/@onclick')
+    if len(nextPage)>0:
+        return df, re.findall(r'\d+', nextPage[0])[0]
+    return df, None
+
+
 def _f_rows(x):
     if '%' in x[3]:
         x[11] = x[6]
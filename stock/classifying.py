@@ -19,9 +19,12 @@ import tushare.stock.fundamental as fd
 from tushare.util.netbase import Client
 
 try:
-    from urllib.request import urlopen, Request
+    from urllib.request import Request
 except ImportError:
-    from urllib2 import urlopen, Request
+    from urllib2 import Request
+from tushare.util import transport as tp
+from tushare.util import retry as rt
+from tushare.util import jsparse
 
 
 def get_industry_classified(standard='sina'):
@@ -145,25 +148,18 @@ def get_st_classified():
 
 
 def _get_detail(tag, retry_count=3, pause=0.001):
-    for _ in range(retry_count):
-        time.sleep(pause)
+    for _ in rt.attempts(retry_count, pause):
         try:
             ct._write_console()
             request = Request(ct.SINA_DATA_DETAIL_URL%(ct.P_TYPE['http'],
                                                                ct.DOMAINS['vsf'], ct.PAGES['jv'],
                                                                tag))
-            text = urlopen(request, timeout=10).read()
+            text = tp.urlopen(request, timeout=10).read()
             text = text.decode('gbk')
         except _network_error_classes:
             pass
         else:
-            reg = re.compile(r'\,(.*?)\:') 
-            text = reg.sub(r',"\1":', text) 
-            text = text.replace('"{symbol', '{"symbol')
-            text = text.replace('{symbol', '{"symbol"')
-            jstr = json.dumps(text)
-            js = json.loads(jstr)
-            df = pd.DataFrame(pd.read_json(js, dtype={'code':object}), columns=ct.THE_FIELDS)
+            df = pd.DataFrame(jsparse.loads(text), columns=ct.THE_FIELDS)
             df = df[ct.FOR_CLASSIFY_B_COLS]
             return df
         #raise IOError(ct.NETWORK_URL_ERROR_MSG)
@@ -172,7 +168,7 @@ def _get_detail(tag, retry_count=3, pause=0.001):
 def _get_type_data(url):
     try:
         request = Request(url)
-        data_str = urlopen(request, timeout=10).read()
+        data_str = tp.urlopen(request, timeout=10).read()
         data_str = data_str.decode('GBK')
         data_str = data_str.split('=')[1]
         data_json = json.loads(data_str)
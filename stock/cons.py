@@ -19,6 +19,18 @@ P_TYPE = {'http': 'http://', 'ftp': 'ftp://'}
 USE_CACHE=True
 CURRENT_YEAR='2019'
 CURRENT_SEASON='03'
+MAX_WORKERS = 8
+HOST_RATE_LIMITS = {'gtimg.cn': 20, 'sina.com.cn': 10, 'sinajs.cn': 20}
+HOST_MAX_IN_FLIGHT = {'default': 8}
+HTTP_TIMEOUT = 10
+AIO_MAX_CONCURRENCY = 100
+LIVE_DATA_CHUNK_SIZE = 500
+RETRY_BACKOFF = 0.5
+RETRY_MAX_BACKOFF = 30
+RETRY_DEADLINE = 120
+CIRCUIT_THRESHOLD = 10
+CIRCUIT_RESET = 30
+HTTP_USER_AGENT = 'Mozilla/5.0 (Windows NT 6.1; rv:37.0) Gecko/20100101 Firefox/37.0'
 
 PAGE_NUM = [38, 60, 80, 100]
 FORMAT = lambda x: '%.2f' % x
@@ -138,7 +150,34 @@ DATE_CHK_Q_MSG = '季度输入错误：请输入1、2、3或4数字'
 TOP_PARAS_MSG = 'top有误，请输入整数或all.'
 LHB_MSG = '周期输入有误，请输入数字5、10、30或60'
 TOKEN_F_P = 'tk.csv'
-CACHE_DIR = '/Users/nobbyheell/Documents/workspace/migungun_desktop/tushare/cache/'
+CACHE_DIR = '~/.tushare/cache/'
+TICK_DIR = '~/.tushare/ticks/'
+PIT_DIR = '~/.tushare/pit/'
+CACHE_MAX_BYTES = 1024 * 1024 * 1024
+CACHE_FORMAT = 'feather'
+DAY_SECONDS = 24 * 60 * 60
+CACHE_TTL = {'default': 7 * DAY_SECONDS, 'sina_statement': 30 * DAY_SECONDS,
+             'sina_statement_us': 30 * DAY_SECONDS, 'cwfx': 7 * DAY_SECONDS,
+             'stockstructure': 30 * DAY_SECONDS, 'aastock': 7 * DAY_SECONDS,
+             'wsj': 7 * DAY_SECONDS, 'trade_cal': DAY_SECONDS,
+             'fundamental_panel': DAY_SECONDS}
+# 已出年报的年度财务报表不再变化, 缓存一年
+STATEMENT_CLOSED_TTL = 365 * DAY_SECONDS
+# comdata.finance.gtimg.cn 财务比率: 名称 -> 接口中的数据键
+CWFX_KINDS = {'debtpaying': 'czzb', 'profit': 'ylnl', 'operation': 'yynl',
+              'growth': 'cznl', 'djcw': 'djcw'}
+CWFX_URL = 'http://comdata.finance.gtimg.cn/data/%s/%s/%d'
+# 财务报表统一列名 -> 各年份页面中出现过的科目名, 按优先顺序取第一个有值的
+STATEMENT_ALIASES = {
+    'balance': {'net_assets': [u'归属于母公司的股东权益合计', u'归属于母公司股东权益合计',
+                               u'归属于母公司股东的权益'],
+                'total_assets': [u'资产总计'],
+                'total_liab': [u'负债合计']},
+    'income': {'revenue': [u'营业总收入', u'营业收入'],
+               'net_profits': [u'归属于母公司所有者的净利润', u'归属于母公司的净利润',
+                               u'归属于母公司股东的净利润']},
+    'cashflow': {'operating_cashflow': [u'经营活动产生的现金流量净额']},
+    'guideline': {}}
 TOKEN_ERR_MSG = '请设置通联数据接口的token凭证码'
 BOX_INPUT_ERR_MSG = '请输入YYYY-MM格式的年月数据'
 INDEX_SYMBOL = {"399990": "sz399990", "000006": "sh000006", "399998": "sz399998", 
@@ -11,18 +11,25 @@ from tushare.stock import cons as ct
 import lxml.html
 from lxml import etree
 import re
-from pandas.compat import StringIO
+from io import StringIO
 import time
 from tushare.stock.trading import _code_to_symbol
 import datetime
 import tushare as ts
 import json
 import os
+from tushare.util import paging as pg
+from tushare.util import cache
+from tushare.util import htmltable as ht
+from tushare.util import workers as wk
+from tushare.stock import trading as td
 
 try:
-    from urllib.request import urlopen, Request
+    from urllib.request import Request
 except ImportError:
-    from urllib2 import urlopen, Request
+    from urllib2 import Request
+from tushare.util import transport as tp
+from tushare.util import retry as rt
 
 def get_stock_basics():
     """
@@ -48,20 +55,21 @@ def get_stock_basics():
                timeToMarket,上市日期
     """
     request = Request(ct.ALL_STOCK_BASICS_FILE)
-    text = urlopen(request, timeout=60).read()
+    text = tp.urlopen(request, timeout=60).read()
     text = text.decode('GBK')
     text = text.replace('--', '')
     df = pd.read_csv(StringIO(text), dtype={'code':'object'})
     df = df.set_index('code')
     return df
 
-def get_report_data(year, quarter):
+def get_report_data(year, quarter, stream=False):
     """
         获取业绩报表数据
     Parameters
     --------
     year:int 年度 e.g:2014
     quarter:int 季度 :1、2、3、4，只能输入这4个季度
+    stream:bool 默认False，为True时返回生成器，每抓取到一页就产出该页的DataFrame
        说明：由于是从网站获取的数据，需要一页页抓取，速度取决于您当前网络速度
        
     Return
@@ -78,32 +86,33 @@ def get_report_data(year, quarter):
         profits_yoy,净利润同比(%)
         distrib,分配方案
         report_date,发布日期
+    Raises
+    ------
+    IOError: 某一页多次重试后仍然获取失败时抛出, 不返回已获取的部分数据
     """
-    if ct._check_input(year,quarter) is True:
+    if ct._check_input(year, quarter) is True:
         ct._write_head()
-        df =  _get_report_data(year, quarter, 1, pd.DataFrame())
-        if df is not None:
-#             df = df.drop_duplicates('code')
-            df['code'] = df['code'].map(lambda x:str(x).zfill(6))
-        return df
+        return _fd_pages('report', year, quarter, stream)
 
 """
 Created on 2022/11/30
 @author: Charlie Zhou
 @contact: ben02060846@qq.com
 """
-def get_stockstructure_data_by_code(code, retry_count=3, pause=5):
-    for _ in range(retry_count):
+def get_stockstructure_data_by_code(code, retry_count=3, pause=5, update=False):
+    _url = 'http://vip.stock.finance.sina.com.cn/corp/go.php/vCI_StockStructure/stockid/'+code + '.phtml'
+    print(_url)
+    return cache.fetch(_url, lambda: _get_stockstructure(_url, retry_count, pause),
+                       'stockstructure', update=update)
+
+
+def _get_stockstructure(url, retry_count=3, pause=5):
+    for _ in rt.attempts(retry_count, pause):
         try:
-            _url = 'http://vip.stock.finance.sina.com.cn/corp/go.php/vCI_StockStructure/stockid/'+code + '.phtml'
-            print(_url)
-            __cache_file_path = '%s%s' % (ct.CACHE_DIR, _url.replace('/', ''))
-            if os.path.exists(__cache_file_path) and 1:
-                print ('read from cache', __cache_file_path)
-                return pd.read_csv(__cache_file_path)
-            request = Request(_url)
-            text = urlopen(request, timeout=60).read()
-            text = text.decode('gb2312')
+            request = Request(url)
+            text = tp.urlopen(request, timeout=60).read()
+            # gbk兼容gb2312, 不必再按gb2312失败后重试
+            text = text.decode('gbk')
             text = text.replace('--', '')
             html = lxml.html.parse(StringIO(text))
             res_1 = html.xpath("//div[@id=\"con02-1\"]/table/tbody/tr[1]/td[position()>1]")
@@ -113,33 +122,9 @@ def get_stockstructure_data_by_code(code, retry_count=3, pause=5):
             df = pd.DataFrame()
             df['date'] = arr_1
             df['shares'] = arr_5
-            print ('save to cache', __cache_file_path)
-            df.to_csv(__cache_file_path)
-            time.sleep(20)
             return df
         except Exception as e:
             print(e)
-            time.sleep(pause)
-            _url = 'http://vip.stock.finance.sina.com.cn/corp/go.php/vCI_StockStructure/stockid/' + code + '.phtml'
-            if os.path.exists(__cache_file_path):
-                print ('read from cache', __cache_file_path)
-                return pd.read_csv(__cache_file_path)
-            request = Request(_url)
-            text = urlopen(request, timeout=60).read()
-            text = text.decode('gbk')
-            text = text.replace('--', '')
-            html = lxml.html.parse(StringIO(text))
-            res_1 = html.xpath("//div[@id=\"con02-1\"]/table/tbody/tr[1]/td[position()>1]")
-            res_5 = html.xpath("//div[@id=\"con02-1\"]/table/tbody/tr[5]/td[position()>1]")
-            arr_1 = [date.text for date in res_1]
-            arr_5 = [float(date.text[:-2]) for date in res_5]
-            df = pd.DataFrame()
-            df['date'] = arr_1
-            df['shares'] = arr_5
-            print ('save to cache', __cache_file_path)
-            df.to_csv(__cache_file_path)
-            time.sleep(20)
-            return df
     raise IOError(ct.NETWORK_URL_ERROR_MSG)
 
 """
@@ -151,12 +136,12 @@ def get_profit_predictdc(code, retry_count=3, pause=5):
     '''
     获取机构预测利润, 东方财富
     '''
-    for _ in range(retry_count):
+    for _ in rt.attempts(retry_count, pause):
         try:
             url = 'http://emweb.securities.eastmoney.com/PC_HSF10/ProfitForecast/ProfitForecastAjax?code=%s' % _code_to_symbol(code)
             print (url)
             request = Request(url)
-            text = urlopen(request, timeout=60).read()
+            text = tp.urlopen(request, timeout=60).read()
             text = text.decode('utf8')
             text = text.replace('--', '')
             if 0:
@@ -201,7 +186,6 @@ def get_profit_predictdc(code, retry_count=3, pause=5):
                                      'year': years})
         except Exception as e:
             print(e)
-            time.sleep(pause)
     raise IOError(ct.NETWORK_URL_ERROR_MSG)
 
 """
@@ -213,12 +197,12 @@ def get_profit_predictths(code, retry_count=3, pause=5):
     '''
     获取机构预测利润,童虎顺
     '''
-    for _ in range(retry_count):
+    for _ in rt.attempts(retry_count, pause):
         try:
             url = 'http://stockpage.10jqka.com.cn/%s/worth/#forecast' % code
             print (url)
             request = Request(url)
-            text = urlopen(request, timeout=60).read()
+            text = tp.urlopen(request, timeout=60).read()
             text = text.decode('utf8')
             text = text.replace('--', '')
             html = lxml.html.parse(StringIO(text))
@@ -229,7 +213,6 @@ def get_profit_predictths(code, retry_count=3, pause=5):
             return df
         except Exception as e:
             print(e)
-            time.sleep(pause)
     return None
 """
 Created on 2022/11/30
@@ -241,7 +224,7 @@ def get_cashflow_data_by_code(code):
         _url = 'http://vip.stock.finance.sina.com.cn/corp/go.php/vFD_CashFlow/stockid/'+code + '/ctrl/all/displaytype/4.phtml'
         print (_url)
         request = Request(_url)
-        text = urlopen(request, timeout=60).read()
+        text = tp.urlopen(request, timeout=60).read()
         text = text.decode('gb2312')
         text = text.replace('--', '')
         html = lxml.html.parse(StringIO(text))
@@ -263,12 +246,12 @@ Created on 2022/11/30
 @contact: ben02060846@qq.com
 """
 def get_profitstat_data_by_code(code, retry_count=3, pause=5):
-    for _ in range(retry_count):
+    for _ in rt.attempts(retry_count, pause):
         try:
             _url = 'http://vip.stock.finance.sina.com.cn/corp/go.php/vFD_ProfitStatement/stockid/'+code + '/ctrl/all/displaytype/4.phtml'
             print (_url)
             request = Request(_url)
-            text = urlopen(request, timeout=60).read()
+            text = tp.urlopen(request, timeout=60).read()
             text = text.decode('gb2312')
             text = text.replace('--', '')
             html = lxml.html.parse(StringIO(text))
@@ -282,7 +265,6 @@ def get_profitstat_data_by_code(code, retry_count=3, pause=5):
             return df
         except Exception as e:
             print(e)
-            time.sleep(pause)
     raise IOError(ct.NETWORK_URL_ERROR_MSG)
 
 """
@@ -291,30 +273,20 @@ Created on 2022/11/30
 @contact: ben02060846@qq.com
 """
 def get_report_data_by_code(code, retry_count=3, pause=5):
-    for _ in range(retry_count):
+    for _ in rt.attempts(retry_count, pause):
         try:
             _url = 'http://vip.stock.finance.sina.com.cn/q/go.php/vFinanceAnalyze/kind/mainindex/index.phtml?symbol='+code
             print (_url)
             request = Request(_url)
-            text = urlopen(request, timeout=60).read()
+            text = tp.urlopen(request, timeout=60).read()
             text = text.decode('GBK')
-            text = text.replace('--', '')
             html = lxml.html.parse(StringIO(text))
             res = html.xpath("//table[@class=\"list_table\"]/tr")
-            if ct.PY3:
-                sarr = [etree.tostring(node).decode('utf-8') for node in res]
-            else:
-                sarr = [etree.tostring(node) for node in res]
-            sarr = ''.join(sarr)
-            sarr = '<table>%s</table>'%sarr
-            df = pd.read_html(sarr)[0]
-            df = df.drop(11, axis=1)
-            df.columns = ct.REPORT_COLS
+            df = ht.read_table(res, ct.REPORT_COLS, drop=[11])
             df = df.sort_values(by='name', ascending=False)  # 根据时间排序
             return df
         except Exception as e:
-            time.sleep(pause)
-            print (e)
+            print(e)
     raise IOError(ct.NETWORK_URL_ERROR_MSG)
 
 from importlib import reload
@@ -324,64 +296,62 @@ import sys
 
 
 def get_cbsheet_by_code(code, start_year=2006):
-    cbdf_list = []
-    for year in range(start_year, datetime.date.today().year + 1):
-        cbdf = ts.get_cbsheet(code, year)
-        if cbdf is not None:
-            cbdf_list.append(cbdf)
-    cbdf = pd.concat(cbdf_list)  # 因为时间段而拆分的价格数据, 重新拼接
-    cbdf = cbdf.sort_index(ascending=False)  # 根据时间排序
-    cbdf = cbdf[pd.notnull(cbdf.index)]
-
-    if u'归属于母公司的股东权益合计' in cbdf.columns:
-        cbdf['net_assets'] = cbdf[u'归属于母公司的股东权益合计']
-    elif u'归属于母公司股东权益合计' in cbdf.columns:
-        cbdf['net_assets'] = cbdf[u'归属于母公司股东权益合计']
-    elif u'归属于母公司股东的权益' in cbdf.columns:
-        cbdf['net_assets'] = cbdf[u'归属于母公司股东的权益']
-    return cbdf
-
-
-def _get_report_data(year, quarter, pageNo, dataArr):
-    ct._write_console()
-    try:
-        _url = ct.REPORT_URL%(ct.P_TYPE['http'], ct.DOMAINS['vsf'], ct.PAGES['fd'],
-                         year, quarter, pageNo, ct.PAGE_NUM[1])
-        print (_url)
-        request = Request(ct.REPORT_URL%(ct.P_TYPE['http'], ct.DOMAINS['vsf'], ct.PAGES['fd'],
-                         year, quarter, pageNo, ct.PAGE_NUM[1]))
-        text = urlopen(request, timeout=60).read()
-        text = text.decode('GBK')
-        text = text.replace('--', '')
-        html = lxml.html.parse(StringIO(text))
-        res = html.xpath("//table[@class=\"list_table\"]/tr")
-        if ct.PY3:
-            sarr = [etree.tostring(node).decode('utf-8') for node in res]
-        else:
-            sarr = [etree.tostring(node) for node in res]
-        sarr = ''.join(sarr)
-        sarr = '<table>%s</table>'%sarr
-        df = pd.read_html(sarr)[0]
-        df = df.drop(11, axis=1)
-        df.columns = ct.REPORT_COLS
-        dataArr = dataArr.append(df, ignore_index=True)
-        nextPage = html.xpath('//div[@class=\"pages\"]/a[last()]/@onclick')
-        if len(nextPage)>0:
-            pageNo = re.findall(r'\d+', nextPage[0])[0]
-            return _get_report_data(year, quarter, pageNo, dataArr)
-        else:
-            return dataArr
-    except Exception as e:
-        print(e)
+    return get_statement(code, 'balance', start_year)
+
+
+def get_statement(code, statement='balance', start_year=2006, end_year=None,
+                  update=False, max_workers=None):
+    """
+    获取多年的新浪财务报表, 各年份并发获取(受ct.HOST_RATE_LIMITS限速), 合并为一个按报告期
+    倒序排列的DataFrame; 已有年报的年份从缓存读取, 只有当年重新获取
+    Parameters
+    ------
+      code: string 股票代码 e.g. 600848
+      statement: string balance-资产负债表 income-利润表 cashflow-现金流量表 guideline-财务指标
+      start_year: int 开始年份
+      end_year: int 结束年份, 默认为今年
+      update: bool 为True时忽略缓存, 全部重新获取
+      max_workers: int 并发线程数, 为空时使用ct.MAX_WORKERS
+    return
+    -------
+      DataFrame 以报告期(YYYY-MM-DD)为索引, 列为各科目,
+      另外按ct.STATEMENT_ALIASES增加统一列名, 如资产负债表的net_assets
+    """
+    end_year = datetime.date.today().year if end_year is None else end_year
+    years = list(range(end_year, start_year - 1, -1))
+    frames = wk.run_tasks(lambda year: td._sina_statement(code, statement, year, update),
+                          years, max_workers)
+    frames = [df.loc[:, ~df.columns.duplicated()] for df in frames
+              if df is not None and len(df) > 0]
+    if len(frames) == 0:
+        return None
+    df = pd.concat(frames)
+    df = df[pd.notnull(df.index)]
+    df = df[~df.index.duplicated()]
+    df = df.sort_index(ascending=False)
+    return _harmonize(df, ct.STATEMENT_ALIASES.get(statement, {}))
+
+
+def _harmonize(df, aliases):
+    """
+    不同年份的同一科目名称不同, 合并后每个名称只在部分行有值, 按优先顺序取第一个有值的
+    """
+    for name, items in aliases.items():
+        cols = [c for c in items if c in df.columns]
+        if cols:
+            df[name] = df[cols].bfill(axis=1).iloc[:, 0]
+    return df
 
 
-def get_profit_data(year, quarter):
+
+def get_profit_data(year, quarter, stream=False):
     """
         获取盈利能力数据
     Parameters
     --------
     year:int 年度 e.g:2014
     quarter:int 季度 :1、2、3、4，只能输入这4个季度
+    stream:bool 默认False，为True时返回生成器，每抓取到一页就产出该页的DataFrame
        说明：由于是从网站获取的数据，需要一页页抓取，速度取决于您当前网络速度
        
     Return
@@ -396,53 +366,23 @@ def get_profit_data(year, quarter):
         eps,每股收益
         business_income,营业收入(百万元)
         bips,每股主营业务收入(元)
+    Raises
+    ------
+    IOError: 某一页多次重试后仍然获取失败时抛出, 不返回已获取的部分数据
     """
     if ct._check_input(year, quarter) is True:
         ct._write_head()
-        data =  _get_profit_data(year, quarter, 1, pd.DataFrame())
-        if data is not None:
-#             data = data.drop_duplicates('code')
-            data['code'] = data['code'].map(lambda x:str(x).zfill(6))
-        return data
+        return _fd_pages('profit', year, quarter, stream)
 
 
-def _get_profit_data(year, quarter, pageNo, dataArr):
-    ct._write_console()
-    try:
-        request = Request(ct.PROFIT_URL%(ct.P_TYPE['http'], ct.DOMAINS['vsf'],
-                                              ct.PAGES['fd'], year,
-                                              quarter, pageNo, ct.PAGE_NUM[1]))
-        text = urlopen(request, timeout=60).read()
-        text = text.decode('GBK')
-        text = text.replace('--', '')
-        html = lxml.html.parse(StringIO(text))
-        res = html.xpath("//table[@class=\"list_table\"]/tr")
-        if ct.PY3:
-            sarr = [etree.tostring(node).decode('utf-8') for node in res]
-        else:
-            sarr = [etree.tostring(node) for node in res]
-        sarr = ''.join(sarr)
-        sarr = '<table>%s</table>'%sarr
-        df = pd.read_html(sarr)[0]
-        df.columns=ct.PROFIT_COLS
-        dataArr = dataArr.append(df, ignore_index=True)
-        nextPage = html.xpath('//div[@class=\"pages\"]/a[last()]/@onclick')
-        if len(nextPage)>0:
-            pageNo = re.findall(r'\d+', nextPage[0])[0]
-            return _get_profit_data(year, quarter, pageNo, dataArr)
-        else:
-            return dataArr
-    except:
-        pass
-
-
-def get_operation_data(year, quarter):
+def get_operation_data(year, quarter, stream=False):
     """
         获取营运能力数据
     Parameters
     --------
     year:int 年度 e.g:2014
     quarter:int 季度 :1、2、3、4，只能输入这4个季度
+    stream:bool 默认False，为True时返回生成器，每抓取到一页就产出该页的DataFrame
        说明：由于是从网站获取的数据，需要一页页抓取，速度取决于您当前网络速度
        
     Return
@@ -456,53 +396,23 @@ def get_operation_data(year, quarter):
         inventory_days,存货周转天数(天)
         currentasset_turnover,流动资产周转率(次)
         currentasset_days,流动资产周转天数(天)
+    Raises
+    ------
+    IOError: 某一页多次重试后仍然获取失败时抛出, 不返回已获取的部分数据
     """
     if ct._check_input(year, quarter) is True:
         ct._write_head()
-        data =  _get_operation_data(year, quarter, 1, pd.DataFrame())
-        if data is not None:
-#             data = data.drop_duplicates('code')
-            data['code'] = data['code'].map(lambda x:str(x).zfill(6))
-        return data
-
-
-def _get_operation_data(year, quarter, pageNo, dataArr):
-    ct._write_console()
-    try:
-        request = Request(ct.OPERATION_URL%(ct.P_TYPE['http'], ct.DOMAINS['vsf'],
-                                                 ct.PAGES['fd'], year,
-                                                 quarter, pageNo, ct.PAGE_NUM[1]))
-        text = urlopen(request, timeout=60).read()
-        text = text.decode('GBK')
-        text = text.replace('--', '')
-        html = lxml.html.parse(StringIO(text))
-        res = html.xpath("//table[@class=\"list_table\"]/tr")
-        if ct.PY3:
-            sarr = [etree.tostring(node).decode('utf-8') for node in res]
-        else:
-            sarr = [etree.tostring(node) for node in res]
-        sarr = ''.join(sarr)
-        sarr = '<table>%s</table>'%sarr
-        df = pd.read_html(sarr)[0]
-        df.columns=ct.OPERATION_COLS
-        dataArr = dataArr.append(df, ignore_index=True)
-        nextPage = html.xpath('//div[@class=\"pages\"]/a[last()]/@onclick')
-        if len(nextPage)>0:
-            pageNo = re.findall(r'\d+', nextPage[0])[0]
-            return _get_operation_data(year, quarter, pageNo, dataArr)
-        else:
-            return dataArr
-    except Exception as e:
-        print(e)
+        return _fd_pages('operation', year, quarter, stream)
 
 
-def get_growth_data(year, quarter):
+def get_growth_data(year, quarter, stream=False):
     """
         获取成长能力数据
     Parameters
     --------
     year:int 年度 e.g:2014
     quarter:int 季度 :1、2、3、4，只能输入这4个季度
+    stream:bool 默认False，为True时返回生成器，每抓取到一页就产出该页的DataFrame
        说明：由于是从网站获取的数据，需要一页页抓取，速度取决于您当前网络速度
        
     Return
@@ -516,61 +426,23 @@ def get_growth_data(year, quarter):
         targ,总资产增长率
         epsg,每股收益增长率
         seg,股东权益增长率
+    Raises
+    ------
+    IOError: 某一页多次重试后仍然获取失败时抛出, 不返回已获取的部分数据
     """
     if ct._check_input(year, quarter) is True:
         ct._write_head()
-        data =  _get_growth_data(year, quarter, 1, pd.DataFrame())
-        if data is not None:
-#             data = data.drop_duplicates('code')
-            data['code'] = data['code'].map(lambda x:str(x).zfill(6))
-        return data
-
+        return _fd_pages('growth', year, quarter, stream)
 
-def _get_growth_data(year, quarter, pageNo, dataArr):
-    ct._write_console()
-    try:
-        _url = ct.GROWTH_URL%(ct.P_TYPE['http'], ct.DOMAINS['vsf'],
-                                              ct.PAGES['fd'], year,
-                                              quarter, pageNo, ct.PAGE_NUM[1])
-        print (_url)
-        request = Request(ct.GROWTH_URL%(ct.P_TYPE['http'], ct.DOMAINS['vsf'],
-                                              ct.PAGES['fd'], year,
-                                              quarter, pageNo, ct.PAGE_NUM[1]))
-        text = urlopen(request, timeout=60).read()
-        text = text.decode('GBK')
-        text = text.replace('--', '')
-        html = lxml.html.parse(StringIO(text))
-        res = html.xpath("//table[@class=\"list_table\"]/tr")
-        if len(res) == 0:
-            return None
-        if ct.PY3:
-            sarr = [etree.tostring(node).decode('utf-8') for node in res]
-        else:
-            sarr = [etree.tostring(node) for node in res]
-        sarr = ''.join(sarr)
-        sarr = '<table>%s</table>'%sarr
-        df = pd.read_html(sarr)[0]
-        df.columns=ct.GROWTH_COLS
-        dataArr = dataArr.append(df, ignore_index=True)
-        # print dataArr
-        # return dataArr
-        nextPage = html.xpath('//div[@class=\"pages\"]/a[last()]/@onclick')
-        if len(nextPage) > 0:
-            pageNo = re.findall(r'\d+', nextPage[0])[0]
-            return _get_growth_data(year, quarter, pageNo, dataArr)
-        else:
-            return dataArr
-    except Exception as e:
-        print(e)
-        return _get_growth_data(year, quarter, pageNo, dataArr)
 
-def get_debtpaying_data(year, quarter):
+def get_debtpaying_data(year, quarter, stream=False):
     """
         获取偿债能力数据
     Parameters
     --------
     year:int 年度 e.g:2014
     quarter:int 季度 :1、2、3、4，只能输入这4个季度
+    stream:bool 默认False，为True时返回生成器，每抓取到一页就产出该页的DataFrame
        说明：由于是从网站获取的数据，需要一页页抓取，速度取决于您当前网络速度
        
     Return
@@ -584,52 +456,23 @@ def get_debtpaying_data(year, quarter):
         icratio,利息支付倍数
         sheqratio,股东权益比率
         adratio,股东权益增长率
+    Raises
+    ------
+    IOError: 某一页多次重试后仍然获取失败时抛出, 不返回已获取的部分数据
     """
     if ct._check_input(year, quarter) is True:
         ct._write_head()
-        df =  _get_debtpaying_data(year, quarter, 1, pd.DataFrame())
-        if df is not None:
-#             df = df.drop_duplicates('code')
-            df['code'] = df['code'].map(lambda x:str(x).zfill(6))
-        return df
+        return _fd_pages('debtpaying', year, quarter, stream)
 
 
-def _get_debtpaying_data(year, quarter, pageNo, dataArr):
-    ct._write_console()
-    try:
-        request = Request(ct.DEBTPAYING_URL%(ct.P_TYPE['http'], ct.DOMAINS['vsf'],
-                                                  ct.PAGES['fd'], year,
-                                                  quarter, pageNo, ct.PAGE_NUM[1]))
-        text = urlopen(request, timeout=60).read()
-        text = text.decode('GBK')
-        html = lxml.html.parse(StringIO(text))
-        res = html.xpath("//table[@class=\"list_table\"]/tr")
-        if ct.PY3:
-            sarr = [etree.tostring(node).decode('utf-8') for node in res]
-        else:
-            sarr = [etree.tostring(node) for node in res]
-        sarr = ''.join(sarr)
-        sarr = '<table>%s</table>'%sarr
-        df = pd.read_html(sarr)[0]
-        df.columns = ct.DEBTPAYING_COLS
-        dataArr = dataArr.append(df, ignore_index=True)
-        nextPage = html.xpath('//div[@class=\"pages\"]/a[last()]/@onclick')
-        if len(nextPage)>0:
-            pageNo = re.findall(r'\d+', nextPage[0])[0]
-            return _get_debtpaying_data(year, quarter, pageNo, dataArr)
-        else:
-            return dataArr
-    except Exception as e:
-        print(e)
- 
- 
-def get_cashflow_data(year, quarter):
+def get_cashflow_data(year, quarter, stream=False):
     """
         获取现金流量数据
     Parameters
     --------
     year:int 年度 e.g:2014
     quarter:int 季度 :1、2、3、4，只能输入这4个季度
+    stream:bool 默认False，为True时返回生成器，每抓取到一页就产出该页的DataFrame
        说明：由于是从网站获取的数据，需要一页页抓取，速度取决于您当前网络速度
        
     Return
@@ -642,48 +485,213 @@ def get_cashflow_data(year, quarter):
         cf_nm,经营现金净流量与净利润的比率
         cf_liabilities,经营现金净流量对负债比率
         cashflowratio,现金流量比率
+    Raises
+    ------
+    IOError: 某一页多次重试后仍然获取失败时抛出, 不返回已获取的部分数据
     """
     if ct._check_input(year, quarter) is True:
         ct._write_head()
-        df =  _get_cashflow_data(year, quarter, 1, pd.DataFrame())
-        if df is not None:
-#             df = df.drop_duplicates('code')
-            df['code'] = df['code'].map(lambda x:str(x).zfill(6))
-        return df
+        return _fd_pages('cashflow', year, quarter, stream)
+
+
+# 业绩报表类数据: (url模板, 列名, 需要删除的列), 单元格中的'--'解析为NaN
+_FD_PAGES = {'report': (ct.REPORT_URL, ct.REPORT_COLS, [11]),
+             'profit': (ct.PROFIT_URL, ct.PROFIT_COLS, None),
+             'operation': (ct.OPERATION_URL, ct.OPERATION_COLS, None),
+             'growth': (ct.GROWTH_URL, ct.GROWTH_COLS, None),
+             'debtpaying': (ct.DEBTPAYING_URL, ct.DEBTPAYING_COLS, None),
+             'cashflow': (ct.CASHFLOW_URL, ct.CASHFLOW_COLS, None)}
+
+
+def _fd_page_url(kind, year, quarter, pageNo):
+    return _FD_PAGES[kind][0]%(ct.P_TYPE['http'], ct.DOMAINS['vsf'], ct.PAGES['fd'],
+                               year, quarter, pageNo, ct.PAGE_NUM[1])
+
+
+def _parse_fd_text(kind, text):
+    """
+    解析业绩报表类页面的原始内容, 返回(该页DataFrame, 下一页页码)
+    """
+    _, cols, drop = _FD_PAGES[kind]
+    return _parse_fd_page(text.decode('GBK'), cols, drop)
 
 
-def _get_cashflow_data(year, quarter, pageNo, dataArr):
+def _get_fd_page(kind, year, quarter, pageNo):
     ct._write_console()
-    try:
-        url = ct.CASHFLOW_URL%(ct.P_TYPE['http'], ct.DOMAINS['vsf'],
-                                                ct.PAGES['fd'], year,
-                                                quarter, pageNo, ct.PAGE_NUM[1])
-        print (url)
-        request = Request(url)
-        text = urlopen(request, timeout=60).read()
-        text = text.decode('GBK')
-        text = text.replace('--', '')
-        html = lxml.html.parse(StringIO(text))
-        res = html.xpath("//table[@class=\"list_table\"]/tr")
-        if ct.PY3:
-            sarr = [etree.tostring(node).decode('utf-8') for node in res]
-        else:
-            sarr = [etree.tostring(node) for node in res]
-        sarr = ''.join(sarr)
-        sarr = '<table>%s</table>'%sarr
-        df = pd.read_html(sarr)[0]
-        df.columns = ct.CASHFLOW_COLS
-        dataArr = dataArr.append(df, ignore_index=True)
-        nextPage = html.xpath('//div[@class=\"pages\"]/a[last()]/@onclick')
-        if len(nextPage)>0:
-            pageNo = re.findall(r'\d+', nextPage[0])[0]
-            return _get_cashflow_data(year, quarter, pageNo, dataArr)
-        else:
-            return dataArr
-    except Exception as e:
-        print(e)
-       
-       
+    text = tp.get(_fd_page_url(kind, year, quarter, pageNo), timeout=60)
+    return _parse_fd_text(kind, text)
+
+
+def _fd_pages(kind, year, quarter, stream=False):
+    """
+    按页获取业绩报表类数据, stream为True时返回逐页产出的生成器
+    """
+    pages = pg.iter_pages(lambda pageNo: _get_fd_page(kind, year, quarter, pageNo))
+    if stream:
+        return (_fd_code(df) for df in pages)
+    return _fd_code(pg.concat_pages(pages))
+
+
+def _fd_code(df):
+    if df is not None:
+        df['code'] = df['code'].map(lambda x:str(x).zfill(6))
+    return df
+
+
+# 基本面面板包含的业绩报表, 同名的列以靠前的为准, 靠后的加上 _类别 后缀, 如profit中的roe为roe_profit
+_PANEL_KINDS = ['report', 'profit', 'operation', 'growth', 'debtpaying', 'cashflow']
+
+
+def _panel_columns():
+    """
+    各类报表的列在面板中的列名 {类别: {原列名: 面板列名}}
+    """
+    seen = set(['code', 'name'])
+    res = {}
+    for kind in _PANEL_KINDS:
+        names = {}
+        for col in _FD_PAGES[kind][1]:
+            if col in ('code', 'name'):
+                continue
+            names[col] = col if col not in seen else '%s_%s' % (col, kind)
+            seen.add(names[col])
+        res[kind] = names
+    return res
+
+
+def _panel_fields(fields, columns):
+    """
+    把fields转换为面板列名: 原列名匹配所有同名的列(如'roe'匹配roe和roe_profit), 带后缀的列名只匹配该列
+    """
+    res = []
+    for f in fields:
+        for names in columns.values():
+            for col, name in names.items():
+                if f in (col, name) and name not in res:
+                    res.append(name)
+    return res
+
+
+def get_fundamental_panel(year, quarter, fields=None, update=False, max_workers=None):
+    """
+        获取某个季度全部股票的基本面面板
+    业绩报告, 盈利能力, 营运能力, 成长能力, 偿债能力, 现金流量六类数据并发获取后按代码合并为一张表
+    每类数据按(年份, 季度)保存在本地缓存中(feather列式存储), 多个季度的面板直接从磁盘读取
+    Parameters
+    --------
+    year:int 年度 e.g:2014
+    quarter:int 季度 :1、2、3、4，只能输入这4个季度
+    fields:list 需要的列, 如['eps', 'roe', 'mbrg', 'currentratio'], 只获取包含这些列的报表; 为空时为全部列
+           原列名同时选出各报表中的同名列, 如'roe'选出roe和roe_profit, 'roe_profit'只选出盈利能力中的roe
+    update:bool 为True时忽略缓存, 重新获取
+    max_workers:int 并发线程数, 为空时使用ct.MAX_WORKERS
+
+    Return
+    --------
+    DataFrame
+        code,代码
+        name,名称
+        其余为get_report_data/get_profit_data/get_operation_data/get_growth_data/
+        get_debtpaying_data/get_cashflow_data的各列, 重名的列加上 _profit 等后缀
+    """
+    if ct._check_input(year, quarter) is True:
+        if fields is not None:
+            fields = _panel_fields(fields, _panel_columns())
+        key = 'fundamental_panel/%s/%s' % (year, quarter)
+        ttl = _panel_ttl(year, quarter)
+        panel = None
+        if ct.USE_CACHE and not update:
+            panel = cache.get(key, 'fundamental_panel', ttl)
+        if panel is None:
+            ct._write_head()
+            panel = _build_panel(year, quarter, fields, update, max_workers)
+            if panel is None:
+                return None
+            if fields is None and ct.USE_CACHE:
+                cache.put(key, panel, 'fundamental_panel')
+        if fields is not None:
+            panel = panel[['code', 'name'] + [c for c in fields if c in panel.columns]]
+        return panel
+
+
+def _build_panel(year, quarter, fields, update, max_workers):
+    """
+    并发获取需要的各类报表, 按代码一次合并
+    """
+    columns = _panel_columns()
+    kinds = [k for k in _PANEL_KINDS
+             if fields is None or any(c in fields for c in columns[k].values())]
+    frames = wk.run_tasks(lambda kind: _fd_quarter(kind, year, quarter, update),
+                          kinds, max_workers)
+    names = []
+    parts = []
+    for kind, df in zip(kinds, frames):
+        if df is None or len(df) == 0:
+            continue
+        df = df.drop_duplicates('code').set_index('code')
+        names.append(df['name'])
+        parts.append(df[list(columns[kind])].rename(columns=columns[kind]))
+    if len(parts) == 0:
+        return None
+    panel = pd.concat(parts, axis=1, join='outer')
+    names = pd.concat(names)
+    panel.insert(0, 'name', names[~names.index.duplicated()].reindex(panel.index))
+    panel.index.name = 'code'
+    return panel.sort_index().reset_index()
+
+
+def get_fundamental_panels(periods, fields=None, update=False, max_workers=None):
+    """
+        获取多个季度的基本面面板, 纵向拼接并增加year, quarter两列
+    Parameters
+    --------
+    periods:list [(year, quarter), ...] e.g. [(2021, 4), (2022, 1)]
+    其余参数同get_fundamental_panel
+    """
+    frames = []
+    for year, quarter in periods:
+        df = get_fundamental_panel(year, quarter, fields, update, max_workers)
+        if df is not None:
+            df.insert(0, 'quarter', quarter)
+            df.insert(0, 'year', year)
+            frames.append(df)
+    if len(frames) == 0:
+        return None
+    return pd.concat(frames, ignore_index=True)
+
+
+def _panel_ttl(year, quarter):
+    """
+    季度结束半年以上的数据已基本不再变化, 缓存ct.STATEMENT_CLOSED_TTL秒, 否则使用默认的过期时间
+    """
+    end = datetime.date(year, quarter * 3, 1) + datetime.timedelta(days=31 + 183)
+    return ct.STATEMENT_CLOSED_TTL if end < datetime.date.today() else None
+
+
+def _fd_quarter(kind, year, quarter, update=False):
+    """
+    某类业绩报表一个季度的全部数据, 按(类别, 年份, 季度)缓存
+    """
+    return cache.fetch('fundamental_panel/%s/%s/%s' % (kind, year, quarter),
+                       lambda: _fd_pages(kind, year, quarter), 'fundamental_panel',
+                       ttl=_panel_ttl(year, quarter), update=update)
+
+
+def _parse_fd_page(text, cols, drop=None):
+    """
+    解析业绩报表类页面, 返回(该页DataFrame, 下一页页码), 没有下一页时页码为None
+    """
+    html = lxml.html.parse(StringIO(text))
+    res = html.xpath("//table[@class=\"list_table\"]/tr")
+    if len(res) == 0:
+        return None, None
+    df = ht.read_table(res, cols, drop=drop)
+    nextPage = html.xpath('//div[@class=\"pages\"]/a[last()]/@onclick')
+    if len(nextPage)>0:
+        return df, re.findall(r'\d+', nextPage[0])[0]
+    return df, None
+
+
 def _data_path():
     import os
     import inspect
@@ -12,9 +12,11 @@ import pandas as pd
 from tushare.stock import cons as ct
 from tushare.util import dateu as du
 try:
-    from urllib.request import urlopen, Request
+    from urllib.request import Request
 except ImportError:
-    from urllib2 import urlopen, Request
+    from urllib2 import Request
+from tushare.util import transport as tp
+from tushare.util import hqparse as hq
 
 def global_realtime(symbols=None):
     """
@@ -32,26 +34,34 @@ def global_realtime(symbols=None):
         symbols_list = symbols_list[:-1] if len(symbols_list) > 8 else symbols_list 
     request = Request(ct.LIVE_DATA_URL%(ct.P_TYPE['http'], ct.DOMAINS['sinahq'],
                                                 du._random(), symbols_list))
-    content = urlopen(request,timeout=10).readlines()
-    datalist = []
-    for cont in content:
-        arrs = []
-        cont = cont.decode('GBK')
-        cont = cont.split('=')
-        symbolstr = cont[0].split('_') 
-        symbol = symbolstr[2]
-        vals = cont[1][1:-3]
-        valarr = vals.split(',')
-        if (symbol == 'sh000001') or (symbol == 'sz399001'):
-            price = float(valarr[3])
-            preclose = float(valarr[2])
-            chg = (price - preclose) / preclose * 100
-            arrs = [symbol, valarr[0], valarr[3],  price-preclose , chg, valarr[30] + ' ' + valarr[31]]
-        elif symbol == 'hkHSI':
-            arrs = [symbol, valarr[1], valarr[6], valarr[7], valarr[8], valarr[17].replace('/', '-') + ' ' + valarr[18] + ':00']
-        else:
-            arrs = [symbolstr[3], valarr[0], valarr[1], valarr[2], valarr[3], du.int2time(int(valarr[5]))]
-        datalist.append(arrs)
-    df = pd.DataFrame(datalist, columns=ct.GLOBAL_HQ_COLS)
-    return df
+    df = hq.read_hq(tp.urlopen(request,timeout=10).read())
+    symbol = df['symbol']
+    ab = symbol.isin(['sh000001', 'sz399001'])
+    hk = symbol == 'hkHSI'
+    znb = ~(ab | hk)
+    res = pd.DataFrame(index=df.index, columns=ct.GLOBAL_HQ_COLS)
+    res['symbol'] = symbol.where(~znb, symbol.str.replace('znb_', '', regex=False))
+    num = lambda col, mask: pd.to_numeric(df.loc[mask, col], errors='coerce')
+    if ab.any():
+        price, preclose = num(3, ab), num(2, ab)
+        res.loc[ab, 'name'] = df.loc[ab, 0]
+        res.loc[ab, 'price'] = price
+        res.loc[ab, 'chga'] = price - preclose
+        res.loc[ab, 'chgp'] = (price - preclose) / preclose * 100
+        res.loc[ab, 'datetime'] = df.loc[ab, 30] + ' ' + df.loc[ab, 31]
+    if hk.any():
+        res.loc[hk, 'name'] = df.loc[hk, 1]
+        res.loc[hk, 'price'] = num(6, hk)
+        res.loc[hk, 'chga'] = num(7, hk)
+        res.loc[hk, 'chgp'] = num(8, hk)
+        res.loc[hk, 'datetime'] = df.loc[hk, 17].str.replace('/', '-') + ' ' + df.loc[hk, 18] + ':00'
+    if znb.any():
+        res.loc[znb, 'name'] = df.loc[znb, 0]
+        res.loc[znb, 'price'] = num(1, znb)
+        res.loc[znb, 'chga'] = num(2, znb)
+        res.loc[znb, 'chgp'] = num(3, znb)
+        res.loc[znb, 'datetime'] = pd.to_datetime(num(5, znb), unit='s').dt.strftime('%Y-%m-%d %H:%M:%S')
+    for col in ['price', 'chga', 'chgp']:
+        res[col] = res[col].astype(float)
+    return res
 
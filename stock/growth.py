@@ -0,0 +1,137 @@
+# -*- coding:utf-8 -*-
+"""
+同比/环比/TTM计算: 适用于以报告期为索引的财务报表或财务比率, 也可以是(code, 报告期)的MultiIndex
+(如get_cwfx_many的结果), 对比期的数据按(代码, 报告期)对齐后整列计算, 全市场一次完成
+    df = ts.get_cwfx_many(codes, range(2015, 2022), 'profit')
+    gr.yoy(df, ['jlrkc'])
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import numpy as np
+import pandas as pd
+
+
+def _keys(df):
+    """
+    返回(代码数组, 报告期DatetimeIndex), 单层索引时代码全部为空字符串
+    """
+    if isinstance(df.index, pd.MultiIndex):
+        codes = df.index.get_level_values(0)
+        periods = df.index.get_level_values(-1)
+    else:
+        codes = np.full(len(df), '', dtype=object)
+        periods = df.index
+    return np.asarray(codes, dtype=object), pd.DatetimeIndex(pd.to_datetime(periods, errors='coerce'))
+
+
+def _values(df, fields):
+    fields = list(df.columns if fields is None else fields)
+    return df[fields].apply(pd.to_numeric, errors='coerce').astype(float), fields
+
+
+def _lookup(values, codes, periods, target):
+    """
+    取每行对应的对比期(target)的数据, 没有该期数据时为NaN
+    """
+    index = pd.MultiIndex.from_arrays([codes, periods])
+    source = values.set_axis(index, axis=0)
+    source = source[~index.duplicated(keep='first')]
+    prior = source.reindex(pd.MultiIndex.from_arrays([codes, target]))
+    return prior.set_axis(values.index, axis=0)
+
+
+def _last_year(periods):
+    return periods - pd.DateOffset(years=1)
+
+
+def _last_quarter(periods):
+    return periods + pd.offsets.QuarterEnd(-1)
+
+
+def _change(cur, prior, fields, suffix):
+    """
+    增长率(%) = (本期 / 对比期 - 1) * 100, 对比期为0或缺失时为NaN
+    """
+    prior = prior.where(prior != 0)
+    res = (cur / prior - 1) * 100
+    res.columns = ['%s_%s' % (f, suffix) for f in fields]
+    return res
+
+
+def single_quarter(df, fields=None):
+    """
+    把累计值(年初至今, 如利润表)转换为单季度值: 一季度不变, 其他季度减去上一季度的累计值
+    """
+    values, fields = _values(df, fields)
+    codes, periods = _keys(df)
+    prior = _lookup(values, codes, periods, _last_quarter(periods))
+    first = np.asarray(periods.month == 3)[:, None]
+    return pd.DataFrame(np.where(first, values, values - prior), index=values.index,
+                        columns=fields)
+
+
+def ttm(df, fields=None):
+    """
+    滚动十二个月(TTM)值: 本期累计 + 上年年报 - 上年同期累计, 年报期即为年报数据
+    Parameters
+    ------
+      df: DataFrame 以报告期或(code, 报告期)为索引, 数据为年初至今的累计值
+      fields: list 需要计算的列, 为空时为全部列
+    return
+    -------
+      DataFrame 列名为原列名加_ttm后缀
+    """
+    values, fields = _values(df, fields)
+    codes, periods = _keys(df)
+    annual = _lookup(values, codes, periods,
+                     pd.to_datetime((periods.year - 1).astype(str) + '-12-31', errors='coerce'))
+    same = _lookup(values, codes, periods, _last_year(periods))
+    fourth = np.asarray(periods.month == 12)[:, None]
+    return pd.DataFrame(np.where(fourth, values, values + annual - same), index=values.index,
+                        columns=['%s_ttm' % f for f in fields])
+
+
+def yoy(df, fields=None):
+    """
+    同比增长率(%): 与上年同一报告期相比
+    Parameters
+    ------
+      df: DataFrame 以报告期或(code, 报告期)为索引
+      fields: list 需要计算的列, 为空时为全部列
+    return
+    -------
+      DataFrame 与df的行一一对应, 列名为原列名加_yoy后缀, 没有上年数据的为NaN
+    """
+    values, fields = _values(df, fields)
+    codes, periods = _keys(df)
+    return _change(values, _lookup(values, codes, periods, _last_year(periods)), fields, 'yoy')
+
+
+def qoq(df, fields=None, cumulative=False):
+    """
+    环比增长率(%): 与上一个报告期相比
+    Parameters
+    ------
+      df: DataFrame 以报告期或(code, 报告期)为索引
+      fields: list 需要计算的列, 为空时为全部列
+      cumulative: bool 数据是否为年初至今的累计值, 为True时先转换为单季度值再比较
+    """
+    if cumulative:
+        df = single_quarter(df, fields)
+        fields = None
+    values, fields = _values(df, fields)
+    codes, periods = _keys(df)
+    return _change(values, _lookup(values, codes, periods, _last_quarter(periods)), fields, 'qoq')
+
+
+def ttm_yoy(df, fields=None):
+    """
+    TTM同比增长率(%): 本期TTM与上年同期TTM相比
+    """
+    values = ttm(df, fields)
+    fields = list(df.columns if fields is None else fields)
+    values.columns = fields
+    res = yoy(values)
+    res.columns = ['%s_ttm_yoy' % f for f in fields]
+    return res
@@ -17,9 +17,11 @@ from lxml import etree
 import re
 import json
 try:
-    from urllib.request import urlopen, Request
+    from urllib.request import Request
 except ImportError:
-    from urllib2 import urlopen, Request
+    from urllib2 import Request
+from tushare.util import transport as tp
+from tushare.util import jsparse
 
 
 
@@ -46,13 +48,10 @@ def get_latest_news(top=None, show_content=False):
         request = Request(nv.LATEST_URL % (ct.P_TYPE['http'], ct.DOMAINS['sina'],
                                                    ct.PAGES['lnews'], top,
                                                    _random()))
-        data_str = urlopen(request, timeout=10).read()
+        data_str = tp.urlopen(request, timeout=10).read()
         data_str = data_str.decode('GBK')
         data_str = data_str.split('=')[1][:-1]
-        data_str = eval(data_str, type('Dummy', (dict,), 
-                                       dict(__getitem__ = lambda s, n:n))())
-        data_str = json.dumps(data_str)
-        data_str = json.loads(data_str)
+        data_str = jsparse.loads(data_str)
         data_str = data_str['list']
         data = []
         for r in data_str:
@@ -164,9 +163,8 @@ def guba_sina(show_content=False):
         rcounts,阅读次数
     """
     
-    from pandas.io.common import urlopen
     try:
-        with urlopen(nv.GUBA_SINA_URL%(ct.P_TYPE['http'],
+        with tp.urlopen(nv.GUBA_SINA_URL%(ct.P_TYPE['http'],
                                        ct.DOMAINS['sina'])) as resp:
             lines = resp.read()
         html = lxml.html.document_fromstring(lines)
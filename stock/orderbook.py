@@ -0,0 +1,150 @@
+# -*- coding:utf-8 -*-
+"""
+五档盘口快照: 以NumPy结构化数组保存每只股票一行的最新行情和五档买卖盘,
+每次轮询原地更新, 价差, 委托不平衡度, 涨跌幅排行等查询直接在数组上计算
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import numpy as np
+import pandas as pd
+
+LEVELS = 5
+BOOK_DTYPE = np.dtype([('price', 'f8'), ('pre_close', 'f8'), ('open', 'f8'),
+                       ('high', 'f8'), ('low', 'f8'),
+                       ('volume', 'i8'), ('amount', 'f8'),
+                       ('bid_p', 'f8', (LEVELS,)), ('bid_v', 'i8', (LEVELS,)),
+                       ('ask_p', 'f8', (LEVELS,)), ('ask_v', 'i8', (LEVELS,)),
+                       ('time', 'U8')])
+_BID_P = ['b%s_p' % i for i in range(1, LEVELS + 1)]
+_BID_V = ['b%s_v' % i for i in range(1, LEVELS + 1)]
+_ASK_P = ['a%s_p' % i for i in range(1, LEVELS + 1)]
+_ASK_V = ['a%s_v' % i for i in range(1, LEVELS + 1)]
+
+
+class OrderBook(object):
+    """
+    按股票代码保存的五档盘口快照
+    book = OrderBook(codes)
+    book.update(ts.get_realtime_quotes(codes))
+    book.spread(), book.imbalance(), book.top_movers(10)
+    Parameters
+    ------
+      codes: list 股票代码, 可以为空, update时遇到新代码自动追加
+    """
+
+    def __init__(self, codes=None):
+        self.codes = np.empty(0, dtype=object)
+        self.data = np.zeros(0, dtype=BOOK_DTYPE)
+        self._row = {}
+        if codes is not None:
+            self._rows(list(codes))
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _rows(self, codes):
+        """
+        返回codes对应的行号, 新代码追加到末尾
+        """
+        new = [c for c in dict.fromkeys(codes) if c not in self._row]
+        if new:
+            start = len(self.codes)
+            for i, code in enumerate(new):
+                self._row[code] = start + i
+            self.codes = np.concatenate([self.codes, np.array(new, dtype=object)])
+            extra = np.zeros(len(new), dtype=BOOK_DTYPE)
+            extra['price'] = np.nan
+            self.data = np.concatenate([self.data, extra])
+        return np.fromiter((self._row[c] for c in codes), dtype=np.intp,
+                           count=len(codes))
+
+    def update(self, df):
+        """
+        用实时行情原地更新快照, df为get_realtime_quotes或hqparse.read_quotes的结果
+        """
+        if df is None or len(df) == 0:
+            return
+        codes = df['code'] if 'code' in df.columns else df['symbol'].str[2:]
+        rows = self._rows(list(codes))
+        d = self.data
+        for col in ['price', 'pre_close', 'open', 'high', 'low', 'amount']:
+            d[col][rows] = pd.to_numeric(df[col], errors='coerce').to_numpy()
+        d['volume'][rows] = pd.to_numeric(df['volume'], errors='coerce').fillna(0).to_numpy()
+        d['bid_p'][rows] = df[_BID_P].astype(float).to_numpy()
+        d['bid_v'][rows] = df[_BID_V].astype(float).fillna(0).to_numpy()
+        d['ask_p'][rows] = df[_ASK_P].astype(float).to_numpy()
+        d['ask_v'][rows] = df[_ASK_V].astype(float).fillna(0).to_numpy()
+        d['time'][rows] = df['time'].astype(str).to_numpy()
+
+    def get(self, code):
+        """
+        返回某只股票的记录(numpy.void), 字段同BOOK_DTYPE
+        """
+        return self.data[self._row[code]]
+
+    def spread(self):
+        """
+        卖一价减买一价, 与self.codes对齐的数组, 没有挂单时为NaN
+        """
+        bid = self.data['bid_p'][:, 0]
+        ask = self.data['ask_p'][:, 0]
+        with np.errstate(invalid='ignore'):
+            return np.where((bid > 0) & (ask > 0), ask - bid, np.nan)
+
+    def mid(self):
+        """
+        买一卖一的中间价
+        """
+        bid = self.data['bid_p'][:, 0]
+        ask = self.data['ask_p'][:, 0]
+        with np.errstate(invalid='ignore'):
+            return np.where((bid > 0) & (ask > 0), (ask + bid) / 2, np.nan)
+
+    def imbalance(self, levels=LEVELS):
+        """
+        前levels档的委托不平衡度 (买量-卖量)/(买量+卖量), 取值-1~1
+        """
+        bid = self.data['bid_v'][:, :levels].sum(axis=1)
+        ask = self.data['ask_v'][:, :levels].sum(axis=1)
+        total = bid + ask
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(total > 0, (bid - ask) / total, np.nan)
+
+    def change(self):
+        """
+        相对昨收的涨跌幅(%), 停牌(价格为0)时为NaN
+        """
+        price = self.data['price']
+        pre = self.data['pre_close']
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where((price > 0) & (pre > 0), (price / pre - 1) * 100, np.nan)
+
+    def top_movers(self, n=10, ascending=False):
+        """
+        涨幅(ascending=True时为跌幅)最大的n只股票, 返回以代码为索引的Series
+        """
+        chg = self.change()
+        valid = np.flatnonzero(~np.isnan(chg))
+        n = min(n, len(valid))
+        if n == 0:
+            return pd.Series([], dtype=float)
+        key = chg[valid] if ascending else -chg[valid]
+        top = valid[np.argpartition(key, n - 1)[:n]]
+        top = top[np.argsort(key[np.searchsorted(valid, top)], kind='stable')]
+        return pd.Series(chg[top], index=self.codes[top], name='change')
+
+    def to_frame(self):
+        """
+        把快照转为DataFrame, 五档展开为b1_p..a5_v列
+        """
+        d = self.data
+        df = pd.DataFrame({'code': self.codes})
+        for col in ['price', 'pre_close', 'open', 'high', 'low', 'volume', 'amount']:
+            df[col] = d[col]
+        for cols, field in [(_BID_P, 'bid_p'), (_BID_V, 'bid_v'),
+                            (_ASK_P, 'ask_p'), (_ASK_V, 'ask_v')]:
+            for i, col in enumerate(cols):
+                df[col] = d[field][:, i]
+        df['time'] = d['time']
+        return df
@@ -0,0 +1,160 @@
+# -*- coding:utf-8 -*-
+"""
+实时行情轮询: 股票列表按url长度拆分为多个请求并发获取, 解析为数值数组写入预分配的快照,
+每次轮询只产出价格或成交量有变化的股票
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from tushare.stock import cons as ct
+from tushare.stock import trading as td
+from tushare.util import transport as tp
+from tushare.util import hqparse as hq
+
+_PRICE = hq.LIVE_FLOAT_COLS.index('price')
+
+
+def _chunks(symbols, size):
+    return [symbols[i:i + size] for i in range(0, len(symbols), size)]
+
+
+class QuoteStream(object):
+    """
+    实时行情轮询
+    for df in QuoteStream(codes):
+        ...  # df只包含价格或成交量变化了的股票
+    Parameters
+    ------
+      symbols: list 股票代码
+      interval: float 两次轮询的间隔秒数, 默认3秒
+      chunk_size: int 每个请求包含的股票数, 为空时使用ct.LIVE_DATA_CHUNK_SIZE
+      max_workers: int 并发请求数, 为空时使用ct.MAX_WORKERS
+      book: OrderBook 传入时每次轮询同时原地更新该五档盘口快照
+    """
+
+    def __init__(self, symbols, interval=3, chunk_size=None, max_workers=None,
+                 book=None):
+        if isinstance(symbols, str):
+            symbols = [symbols]
+        codes = []
+        for code in symbols:
+            if code not in codes and td._code_to_symbol(code) != '':
+                codes.append(code)
+        self.codes = np.array(codes, dtype=object)
+        self.interval = interval
+        self.max_workers = max_workers or ct.MAX_WORKERS
+        self.book = book
+        self._symbols = [td._code_to_symbol(c) for c in codes]
+        self._row = dict((s, i) for i, s in enumerate(self._symbols))
+        self._lists = [','.join(c) for c in
+                       _chunks(self._symbols, chunk_size or ct.LIVE_DATA_CHUNK_SIZE)]
+        n = len(codes)
+        # 列式快照, 每次轮询原地更新
+        self._name = np.empty(n, dtype=object)
+        self._float = np.full((n, len(hq.LIVE_FLOAT_COLS)), np.nan)
+        self._int = np.zeros((n, len(hq.LIVE_INT_COLS)), dtype=np.int64)
+        self._date = np.empty(n, dtype=object)
+        self._time = np.empty(n, dtype=object)
+        self._last_price = np.full(n, np.nan)
+        self._last_volume = np.full(n, -1, dtype=np.int64)
+        self._valid = np.zeros(n, dtype=bool)
+        self._changed = np.zeros(n, dtype=bool)
+        self._executor = None
+        self._stop = threading.Event()
+
+    def _url(self, symbols_list):
+        return ct.LIVE_DATA_URL % (ct.P_TYPE['http'], ct.DOMAINS['sinahq'],
+                                   td._random(), symbols_list)
+
+    def _fetch(self, symbols_list):
+        try:
+            return tp.get(self._url(symbols_list), timeout=ct.HTTP_TIMEOUT)
+        except Exception as e:
+            # 单个请求失败时保留上一次的数据, 下一轮再取
+            print(e)
+            return None
+
+    def _update(self, text):
+        df = hq.read_quotes(text)
+        idx = df['symbol'].map(self._row)
+        keep = idx.notna().to_numpy()
+        if not keep.all():
+            df = df[keep]
+        idx = idx[keep].to_numpy(dtype=np.intp)
+        self._name[idx] = df['name'].to_numpy()
+        self._float[idx] = df[hq.LIVE_FLOAT_COLS].to_numpy()
+        self._int[idx] = df[hq.LIVE_INT_COLS].to_numpy()
+        self._date[idx] = df['date'].to_numpy()
+        self._time[idx] = df['time'].to_numpy()
+        self._valid[idx] = True
+        if self.book is not None:
+            self.book.update(df)
+
+    def poll(self):
+        """
+        获取一次全部股票的行情, 返回价格或成交量有变化的股票(DataFrame)
+        """
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        for text in self._executor.map(self._fetch, self._lists):
+            if text is None:
+                continue
+            try:
+                self._update(text)
+            except Exception as e:
+                # 与请求失败一样, 无法解析的一批保留上一次的数据, 不中断轮询
+                print(e)
+        price = self._float[:, _PRICE]
+        volume = self._int[:, 0]
+        np.not_equal(price, self._last_price, out=self._changed)
+        self._changed &= ~np.isnan(price)
+        self._changed |= volume != self._last_volume
+        self._changed &= self._valid
+        self._last_price[:] = price
+        self._last_volume[:] = volume
+        return self._frame(np.flatnonzero(self._changed))
+
+    def snapshot(self):
+        """
+        返回最近一次轮询后全部股票的行情(DataFrame)
+        """
+        return self._frame(slice(None))
+
+    def _frame(self, rows):
+        data = {'name': self._name[rows]}
+        for i, col in enumerate(hq.LIVE_FLOAT_COLS):
+            data[col] = self._float[rows, i]
+        for i, col in enumerate(hq.LIVE_INT_COLS):
+            data[col] = self._int[rows, i]
+        data['date'] = self._date[rows]
+        data['time'] = self._time[rows]
+        data['code'] = self.codes[rows]
+        return pd.DataFrame(data, columns=ct.LIVE_DATA_COLS[:-1] + ['code'])
+
+    def __iter__(self):
+        self._stop.clear()
+        try:
+            while not self._stop.is_set():
+                start = time.time()
+                df = self.poll()
+                if len(df) > 0:
+                    yield df
+                self._stop.wait(max(0, self.interval - (time.time() - start)))
+        finally:
+            self.close()
+
+    def stop(self):
+        """
+        停止轮询, 可在其他线程中调用
+        """
+        self._stop.set()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -15,15 +15,18 @@ import lxml.html
 from lxml import etree
 import re
 import json
-from pandas.compat import StringIO
+from io import StringIO
 from tushare.util import dateu as du
+from tushare.util import paging as pg
 from tushare.util.netbase import Client
 from _csv import Error
 
 try:
-    from urllib.request import urlopen, Request
+    from urllib.request import Request
 except ImportError:
-    from urllib2 import urlopen, Request
+    from urllib2 import Request
+from tushare.util import transport as tp
+from tushare.util import retry as rt
 
 
 def profit_data(year=2015, top=25, 
@@ -53,10 +56,9 @@ def profit_data(year=2015, top=25,
     if top == 'all':
         ct._write_head()
         df, pages = _dist_cotent(year, 0, retry_count, pause)
-        for idx in range(1,int(pages)):
-            df = df.append(_dist_cotent(year, idx, retry_count,
-                                        pause), ignore_index=True)
-        return df
+        frames = [df] + [_dist_cotent(year, idx, retry_count, pause)
+                         for idx in range(1, int(pages))]
+        return pd.concat(frames, ignore_index=True)
     elif top <= 25:
         df, pages = _dist_cotent(year, 0, retry_count, pause)
         return df.head(top)
@@ -67,10 +69,9 @@ def profit_data(year=2015, top=25,
             df, pages = _dist_cotent(year, 0, retry_count, pause)
             if int(allPages) < int(pages):
                 pages = allPages
-            for idx in range(1, int(pages)):
-                df = df.append(_dist_cotent(year, idx, retry_count,
-                                            pause), ignore_index=True)
-            return df.head(top)
+            frames = [df] + [_dist_cotent(year, idx, retry_count, pause)
+                             for idx in range(1, int(pages))]
+            return pd.concat(frames, ignore_index=True).head(top)
         else:
             print(ct.TOP_PARAS_MSG)
     
@@ -117,8 +118,7 @@ def _fun_into(x):
     
     
 def _dist_cotent(year, pageNo, retry_count, pause):
-    for _ in range(retry_count):
-        time.sleep(pause)
+    for _ in rt.attempts(retry_count, pause):
         try:
             if pageNo > 0:
                 ct._write_console()
@@ -173,41 +173,41 @@ def forecast_data(year, quarter):
         pre_eps,上年同期每股收益
         range,业绩变动范围
         
+    Raises
+    ------
+    IOError: 某一页多次重试后仍然获取失败时抛出, 不返回已获取的部分数据
     """
     if ct._check_input(year, quarter) is True:
         ct._write_head()
-        data =  _get_forecast_data(year, quarter, 1, pd.DataFrame())
+        data = pg.collect_pages(lambda pageNo: _get_forecast_data(year, quarter, pageNo))
         df = pd.DataFrame(data, columns=ct.FORECAST_COLS)
         df['code'] = df['code'].map(lambda x: str(x).zfill(6))
         return df
 
 
-def _get_forecast_data(year, quarter, pageNo, dataArr):
+def _get_forecast_data(year, quarter, pageNo):
     ct._write_console()
-    try:
-        html = lxml.html.parse(ct.FORECAST_URL%(ct.P_TYPE['http'], ct.DOMAINS['vsf'], 
-                                                ct.PAGES['fd'], year, quarter, pageNo,
-                                                ct.PAGE_NUM[1]))
-        res = html.xpath("//table[@class=\"list_table\"]/tr")
-        if ct.PY3:
-            sarr = [etree.tostring(node).decode('utf-8') for node in res]
-        else:
-            sarr = [etree.tostring(node) for node in res]
-        sarr = ''.join(sarr)
-        sarr = sarr.replace('--', '0')
-        sarr = '<table>%s</table>'%sarr
-        df = pd.read_html(sarr)[0]
-        df = df.drop([4, 5, 8], axis=1)
-        df.columns = ct.FORECAST_COLS
-        dataArr = dataArr.append(df, ignore_index=True)
-        nextPage = html.xpath('//div[@class=\"pages\"]/a[last()]/@onclick')
-        if len(nextPage)>0:
-            pageNo = re.findall(r'\d+',nextPage[0])[0]
-            return _get_forecast_data(year, quarter, pageNo, dataArr)
-        else:
-            return dataArr
-    except Exception as e:
-            print(e)
+    text = tp.get(ct.FORECAST_URL%(ct.P_TYPE['http'], ct.DOMAINS['vsf'],
+                                   ct.PAGES['fd'], year, quarter, pageNo,
+                                   ct.PAGE_NUM[1]), timeout=10)
+    html = lxml.html.parse(StringIO(text.decode('GBK')))
+    res = html.xpath("//table[@class=\"list_table\"]/tr")
+    if len(res) == 0:
+        return None, None
+    if ct.PY3:
+        sarr = [etree.tostring(node).decode('utf-8') for node in res]
+    else:
+        sarr = [etree.tostring(node) for node in res]
+    sarr = ''.join(sarr)
+    sarr = sarr.replace('--', '0')
+    sarr = '<table>%s</table>'%sarr
+    df = pd.read_html(StringIO(sarr))[0]
+    df = df.drop([4, 5, 8], axis=1)
+    df.columns = ct.FORECAST_COLS
+    nextPage = html.xpath('//div[@class=\"pages\"]/a[last()]/@onclick')
+    if len(nextPage)>0:
+        return df, re.findall(r'\d+',nextPage[0])[0]
+    return df, None
     
 
 def xsg_data(year=None, month=None, 
@@ -234,12 +234,11 @@ def xsg_data(year=None, month=None,
     """
     year = du.get_year() if year is None else year
     month = du.get_month() if month is None else month
-    for _ in range(retry_count):
-        time.sleep(pause)
+    for _ in rt.attempts(retry_count, pause):
         try:
             request = Request(rv.XSG_URL%(ct.P_TYPE['http'], ct.DOMAINS['em'],
                                      ct.PAGES['emxsg'], year, month))
-            lines = urlopen(request, timeout = 10).read()
+            lines = tp.urlopen(request, timeout = 10).read()
             lines = lines.decode('utf-8') if ct.PY3 else lines
         except Exception as e:
             print(e)
@@ -295,22 +294,20 @@ def fund_holdings(year, quarter,
         start, end = start%year, end%year
     ct._write_head()
     df, pages = _holding_cotent(start, end, 0, retry_count, pause)
-    for idx in range(1, pages):
-        df = df.append(_holding_cotent(start, end, idx, retry_count, pause),
-                  ignore_index=True)
-    return df
+    frames = [df] + [_holding_cotent(start, end, idx, retry_count, pause)
+                     for idx in range(1, pages)]
+    return pd.concat(frames, ignore_index=True)
 
 
 def _holding_cotent(start, end, pageNo, retry_count, pause):
-    for _ in range(retry_count):
-        time.sleep(pause)
+    for _ in rt.attempts(retry_count, pause):
         if pageNo>0:
                 ct._write_console()
         try:
             request = Request(rv.FUND_HOLDS_URL%(ct.P_TYPE['http'], ct.DOMAINS['163'],
                      ct.PAGES['163fh'], ct.PAGES['163fh'],
                      pageNo, start, end, _random(5)))
-            lines = urlopen(request, timeout = 10).read()
+            lines = tp.urlopen(request, timeout = 10).read()
             lines = lines.decode('utf-8') if ct.PY3 else lines
             lines = lines.replace('--', '0')
             lines = json.loads(lines)
@@ -365,44 +362,37 @@ def new_stocks(retry_count=3, pause=0.001):
     limit:个人申购上限(万股)
     funds：募集资金(亿元)
     ballot:网上中签率(%)
+    Raises
+    ------
+    IOError: 某一页多次重试后仍然获取失败时抛出, 不返回已获取的部分数据
     """
-    data = pd.DataFrame()
     ct._write_head()
-    df = _newstocks(data, 1, retry_count,
-                    pause)
+    df = pg.collect_pages(_newstocks, 1, retry_count,
+                          pause)
     return df
 
 
-def _newstocks(data, pageNo, retry_count, pause):
-    for _ in range(retry_count):
-        time.sleep(pause)
-        ct._write_console()
-        try:
-            html = lxml.html.parse(rv.NEW_STOCKS_URL%(ct.P_TYPE['http'],ct.DOMAINS['vsf'],
-                         ct.PAGES['newstock'], pageNo))
-            res = html.xpath('//table[@id=\"NewStockTable\"]/tr')
-            if ct.PY3:
-                sarr = [etree.tostring(node).decode('utf-8') for node in res]
-            else:
-                sarr = [etree.tostring(node) for node in res]
-            sarr = ''.join(sarr)
-            sarr = sarr.replace('<font color="red">*</font>', '')
-            sarr = '<table>%s</table>'%sarr
-            df = pd.read_html(StringIO(sarr), skiprows=[0, 1])[0]
-            df = df.drop([df.columns[idx] for idx in [1, 12, 13, 14]], axis=1)
-            df.columns = rv.NEW_STOCKS_COLS
-            df['code'] = df['code'].map(lambda x : str(x).zfill(6))
-            res = html.xpath('//table[@class=\"table2\"]/tr[1]/td[1]/a/text()')
-            tag = '下一页' if ct.PY3 else unicode('下一页', 'utf-8')
-            hasNext = True if tag in res else False 
-            data = data.append(df, ignore_index=True)
-            pageNo += 1
-            if hasNext:
-                data = _newstocks(data, pageNo, retry_count, pause)
-        except Exception as ex:
-            print(ex)
-        else:
-            return data 
+def _newstocks(pageNo):
+    ct._write_console()
+    text = tp.get(rv.NEW_STOCKS_URL%(ct.P_TYPE['http'],ct.DOMAINS['vsf'],
+                  ct.PAGES['newstock'], pageNo), timeout=10)
+    html = lxml.html.parse(StringIO(text.decode('GBK')))
+    res = html.xpath('//table[@id=\"NewStockTable\"]/tr')
+    if ct.PY3:
+        sarr = [etree.tostring(node).decode('utf-8') for node in res]
+    else:
+        sarr = [etree.tostring(node) for node in res]
+    sarr = ''.join(sarr)
+    sarr = sarr.replace('<font color="red">*</font>', '')
+    sarr = '<table>%s</table>'%sarr
+    df = pd.read_html(StringIO(sarr), skiprows=[0, 1])[0]
+    df = df.drop([df.columns[idx] for idx in [1, 12, 13, 14]], axis=1)
+    df.columns = rv.NEW_STOCKS_COLS
+    df['code'] = df['code'].map(lambda x : str(x).zfill(6))
+    res = html.xpath('//table[@class=\"table2\"]/tr[1]/td[1]/a/text()')
+    tag = '下一页' if ct.PY3 else unicode('下一页', 'utf-8')
+    hasNext = True if tag in res else False 
+    return df, pageNo + 1 if hasNext else None
 
 
 def sh_margins(start=None, end=None, retry_count=3, pause=0.001):
@@ -429,61 +419,50 @@ def sh_margins(start=None, end=None, retry_count=3, pause=0.001):
     rqylje: 本日融券余量金额(元)
     rqmcl: 本日融券卖出量
     rzrqjyzl:本日融资融券余额(元)
+    Raises
+    ------
+    IOError: 某一页多次重试后仍然获取失败时抛出, 不返回已获取的部分数据
     """
     start = du.today_last_year() if start is None else start
     end = du.today() if end is None else end
     if du.diff_day(start, end) < 0:
         return None
     start, end = start.replace('-', ''), end.replace('-', '')
-    data = pd.DataFrame()
     ct._write_head()
-    df = _sh_hz(data, start=start, end=end,
-                retry_count=retry_count,
-                pause=pause)
+    df = pg.collect_pages(lambda pageNo: _sh_hz(start=start, end=end, pageNo=pageNo),
+                          '', retry_count, pause)
     return df
 
 
-def _sh_hz(data, start=None, end=None, 
-           pageNo='', beginPage='',
-           endPage='',
-           retry_count=3, pause=0.001):
-    for _ in range(retry_count):
-        time.sleep(pause)
-        ct._write_console()
-        try:
-            tail = rv.MAR_SH_HZ_TAIL_URL%(pageNo,
-                                    beginPage, endPage)
-            if pageNo == '':
-                pageNo = 6
-                tail = ''
-            else:
-                pageNo += 5
-            beginPage = pageNo
-            endPage = pageNo + 4
-            url = rv.MAR_SH_HZ_URL%(ct.P_TYPE['http'], ct.DOMAINS['sseq'],
-                                    ct.PAGES['qmd'], _random(5),
-                                    start, end, tail,
-                                    _random())
-            ref = rv.MAR_SH_HZ_REF_URL%(ct.P_TYPE['http'], ct.DOMAINS['sse'])
-            clt = Client(url, ref=ref, cookie=rv.MAR_SH_COOKIESTR)
-            lines = clt.gvalue()
-            lines = lines.decode('utf-8') if ct.PY3 else lines
-            lines = lines[19:-1]
-            lines = json.loads(lines)
-            pagecount = int(lines['pageHelp'].get('pageCount'))
-            datapage = int(pagecount/5+1 if pagecount%5>0 else pagecount/5)
-            df = pd.DataFrame(lines['result'], columns=rv.MAR_SH_HZ_COLS)
-            df['opDate'] = df['opDate'].map(lambda x: '%s-%s-%s'%(x[0:4], x[4:6], x[6:8]))
-            data = data.append(df, ignore_index=True)
-            if beginPage < datapage*5:
-                data = _sh_hz(data, start=start, end=end, pageNo=pageNo, 
-                       beginPage=beginPage, endPage=endPage, 
-                       retry_count=retry_count, pause=pause)
-        except Exception as e:
-            print(e)
-        else:
-            return data
-    raise IOError(ct.NETWORK_URL_ERROR_MSG)
+def _sh_hz(start=None, end=None, pageNo=''):
+    """
+    获取沪市融资融券汇总的一页, 接口每次返回5页数据
+    pageNo为''时获取第一批, 否则获取从pageNo开始的5页
+    返回(DataFrame, 下一批的起始页码)
+    """
+    ct._write_console()
+    if pageNo == '':
+        tail = ''
+        nextNo = 6
+    else:
+        tail = rv.MAR_SH_HZ_TAIL_URL%(pageNo,
+                                pageNo, pageNo + 4)
+        nextNo = pageNo + 5
+    url = rv.MAR_SH_HZ_URL%(ct.P_TYPE['http'], ct.DOMAINS['sseq'],
+                            ct.PAGES['qmd'], _random(5),
+                            start, end, tail,
+                            _random())
+    ref = rv.MAR_SH_HZ_REF_URL%(ct.P_TYPE['http'], ct.DOMAINS['sse'])
+    clt = Client(url, ref=ref, cookie=rv.MAR_SH_COOKIESTR)
+    lines = clt.gvalue()
+    lines = lines.decode('utf-8') if ct.PY3 else lines
+    lines = lines[19:-1]
+    lines = json.loads(lines)
+    pagecount = int(lines['pageHelp'].get('pageCount'))
+    datapage = int(pagecount/5+1 if pagecount%5>0 else pagecount/5)
+    df = pd.DataFrame(lines['result'], columns=rv.MAR_SH_HZ_COLS)
+    df['opDate'] = df['opDate'].map(lambda x: '%s-%s-%s'%(x[0:4], x[4:6], x[6:8]))
+    return df, nextNo if nextNo < datapage*5 else None
 
 
 def sh_margin_details(date='', symbol='', 
@@ -518,66 +497,54 @@ def sh_margin_details(date='', symbol='',
     rqyl: 本日融券余量
     rqmcl: 本日融券卖出量
     rqchl: 本日融券偿还量
+    Raises
+    ------
+    IOError: 某一页多次重试后仍然获取失败时抛出, 不返回已获取的部分数据
     """
     date = date if date == '' else date.replace('-', '')
     start = start if start == '' else start.replace('-', '')
     end = end if end == '' else end.replace('-', '')
     if (start != '') & (end != ''):
         date = ''
-    data = pd.DataFrame()
     ct._write_head()
-    df = _sh_mx(data, date=date, start=start,
-                end=end, symbol=symbol,
-                retry_count=retry_count,
-                pause=pause)
-    return df
+    df = pg.collect_pages(lambda pageNo: _sh_mx(date=date, start=start,
+                                                end=end, symbol=symbol,
+                                                pageNo=pageNo),
+                          '', retry_count, pause)
+    return pd.DataFrame(columns=rv.MAR_SH_MX_COLS) if df is None else df
 
 
-def _sh_mx(data, date='', start='', end='', 
-           symbol='',
-           pageNo='', beginPage='',
-           endPage='',
-           retry_count=3, pause=0.001):
-    for _ in range(retry_count):
-        time.sleep(pause)
-        ct._write_console()
-        try:
-            tail = '&pageHelp.pageNo=%s&pageHelp.beginPage=%s&pageHelp.endPage=%s'%(pageNo,
-                                    beginPage, endPage)
-            if pageNo == '':
-                pageNo = 6
-                tail = ''
-            else:
-                pageNo += 5
-            beginPage = pageNo
-            endPage = pageNo + 4
-            ref = rv.MAR_SH_HZ_REF_URL%(ct.P_TYPE['http'], ct.DOMAINS['sse'])
-            clt = Client(rv.MAR_SH_MX_URL%(ct.P_TYPE['http'], ct.DOMAINS['sseq'],
-                                    ct.PAGES['qmd'], _random(5), date, 
-                                    symbol, start, end, tail,
-                                    _random()), ref=ref, cookie=rv.MAR_SH_COOKIESTR)
-            lines = clt.gvalue()
-            lines = lines.decode('utf-8') if ct.PY3 else lines
-            lines = lines[19:-1]
-            lines = json.loads(lines)
-            pagecount = int(lines['pageHelp'].get('pageCount'))
-            datapage = int(pagecount/5+1 if pagecount%5>0 else pagecount/5)
-            if pagecount == 0:
-                return data
-            if pageNo == 6:
-                ct._write_tips(lines['pageHelp'].get('total'))
-            df = pd.DataFrame(lines['result'], columns=rv.MAR_SH_MX_COLS)
-            df['opDate'] = df['opDate'].map(lambda x: '%s-%s-%s'%(x[0:4], x[4:6], x[6:8]))
-            data = data.append(df, ignore_index=True)
-            if beginPage < datapage*5:
-                data = _sh_mx(data, start=start, end=end, pageNo=pageNo, 
-                       beginPage=beginPage, endPage=endPage, 
-                       retry_count=retry_count, pause=pause)
-        except Exception as e:
-            print(e)
-        else:
-            return data
-    raise IOError(ct.NETWORK_URL_ERROR_MSG)
+def _sh_mx(date='', start='', end='', 
+           symbol='', pageNo=''):
+    """
+    获取沪市融资融券明细的一页, 分页方式同_sh_hz
+    """
+    ct._write_console()
+    if pageNo == '':
+        tail = ''
+        nextNo = 6
+    else:
+        tail = '&pageHelp.pageNo=%s&pageHelp.beginPage=%s&pageHelp.endPage=%s'%(pageNo,
+                                pageNo, pageNo + 4)
+        nextNo = pageNo + 5
+    ref = rv.MAR_SH_HZ_REF_URL%(ct.P_TYPE['http'], ct.DOMAINS['sse'])
+    clt = Client(rv.MAR_SH_MX_URL%(ct.P_TYPE['http'], ct.DOMAINS['sseq'],
+                            ct.PAGES['qmd'], _random(5), date, 
+                            symbol, start, end, tail,
+                            _random()), ref=ref, cookie=rv.MAR_SH_COOKIESTR)
+    lines = clt.gvalue()
+    lines = lines.decode('utf-8') if ct.PY3 else lines
+    lines = lines[19:-1]
+    lines = json.loads(lines)
+    pagecount = int(lines['pageHelp'].get('pageCount'))
+    datapage = int(pagecount/5+1 if pagecount%5>0 else pagecount/5)
+    if pagecount == 0:
+        return None, None
+    if pageNo == '':
+        ct._write_tips(lines['pageHelp'].get('total'))
+    df = pd.DataFrame(lines['result'], columns=rv.MAR_SH_MX_COLS)
+    df['opDate'] = df['opDate'].map(lambda x: '%s-%s-%s'%(x[0:4], x[4:6], x[6:8]))
+    return df, nextNo if nextNo < datapage*5 else None
 
 
 def sz_margins(start=None, end=None, retry_count=3, pause=0.001):
@@ -605,7 +572,6 @@ def sz_margins(start=None, end=None, retry_count=3, pause=0.001):
     rqye: 融券余量(元)
     rzrqye:融资融券余额(元)
     """
-    data = pd.DataFrame()
     if start is None and end is None:
         end = du.today()
         start = du.day_last_week()
@@ -618,8 +584,8 @@ def sz_margins(start=None, end=None, retry_count=3, pause=0.001):
             ct._write_msg(rv.MAR_SZ_HZ_MSG)
         else:
             ct._write_head()
-            for date in date_range:
-                data = data.append(_sz_hz(str(date.date()), retry_count, pause) )
+            data = pd.concat([_sz_hz(str(date.date()), retry_count, pause)
+                              for date in date_range])
     except:
         ct._write_msg(ct.DATA_INPUT_ERROR_MSG)
     else:
@@ -627,13 +593,12 @@ def sz_margins(start=None, end=None, retry_count=3, pause=0.001):
         
 
 def _sz_hz(date='', retry_count=3, pause=0.001):
-    for _ in range(retry_count):
-        time.sleep(pause)
+    for _ in rt.attempts(retry_count, pause):
         ct._write_console()
         try:
             request = Request(rv.MAR_SZ_HZ_URL%(ct.P_TYPE['http'], ct.DOMAINS['szse'],
                                     ct.PAGES['szsefc'], date))
-            lines = urlopen(request, timeout = 10).read()
+            lines = tp.urlopen(request, timeout = 10).read()
             if len(lines) <= 200:
                 return pd.DataFrame()
             df = pd.read_html(lines, skiprows=[0])[0]
@@ -671,12 +636,11 @@ def sz_margin_details(date='', retry_count=3, pause=0.001):
     rqye: 融券余量(元)
     rzrqye:融资融券余额(元)
     """
-    for _ in range(retry_count):
-        time.sleep(pause)
+    for _ in rt.attempts(retry_count, pause):
         try:
             request = Request(rv.MAR_SZ_MX_URL%(ct.P_TYPE['http'], ct.DOMAINS['szse'],
                                     ct.PAGES['szsefc'], date))
-            lines = urlopen(request, timeout = 10).read()
+            lines = tp.urlopen(request, timeout = 10).read()
             if len(lines) <= 200:
                 return pd.DataFrame()
             df = pd.read_html(lines, skiprows=[0])[0]
@@ -700,18 +664,17 @@ def top10_holders(code=None, year=None, quarter=None, gdtype='0',
     qdate = ''
     if (year is not None) & (quarter is not None):
         qdate = du.get_q_date(year, quarter)
-    for _ in range(retry_count):
-        time.sleep(pause)
+    for _ in rt.attempts(retry_count, pause):
         try:
             request = Request(rv.TOP10_HOLDERS_URL%(ct.P_TYPE['http'], ct.DOMAINS['gw'],
                                     gdtype, code.upper()))
-            lines = urlopen(request, timeout = 10).read()
+            lines = tp.urlopen(request, timeout = 10).read()
             lines = lines.decode('utf8') if ct.PY3 else lines
             reg = re.compile(r'= \'\[(.*?)\]\';')
             lines = reg.findall(lines)[0]
             jss = json.loads('[%s]' %lines)
             summ = []
-            data = pd.DataFrame()
+            frames = []
             for row in jss:
                 qt = row['jzrq']
                 hold = row['ljcy']
@@ -728,8 +691,9 @@ def top10_holders(code=None, year=None, quarter=None, gdtype='0',
                     h_pro = inrow['zzgs']
                     status = inrow['zjqk']
                     dlist.append([qt, name, hold, h_pro, sharetype, status])
-                ddata = pd.DataFrame(dlist, columns=rv.TOP10_PER_COLS)
-                data = data.append(ddata, ignore_index=True)
+                frames.append(pd.DataFrame(dlist, columns=rv.TOP10_PER_COLS))
+            data = pd.concat(frames, ignore_index=True) if len(frames) > 0 \
+                else pd.DataFrame(columns=rv.TOP10_PER_COLS)
             df = pd.DataFrame(summ, columns=rv.TOP10_SUMM_COLS)
             if qdate != '':
                 df = df[df.quarter == qdate]
@@ -6,10 +6,12 @@ Created on 2014/07/31
 @group : waditu
 @contact: jimmysoa@sina.cn
 """
+from io import BytesIO
 import pandas as pd
 import numpy as np
 from tushare.stock import cons as ct
 from tushare.util import dateu as du
+from tushare.util import transport as tp
 
 def shibor_data(year=None):
     """
@@ -34,10 +36,7 @@ def shibor_data(year=None):
     lab = ct.SHIBOR_TYPE['Shibor']
     lab = lab.encode('utf-8') if ct.PY3 else lab
     try:
-        df = pd.read_excel(ct.SHIBOR_DATA_URL%(ct.P_TYPE['http'], ct.DOMAINS['shibor'],
-                                               ct.PAGES['dw'], 'Shibor',
-                                               year, lab,
-                                               year))
+        df = _read_excel('Shibor', year, lab)
         df.columns = ct.SHIBOR_COLS
         df['date'] = df['date'].map(lambda x: x.date())
         df['date'] = df['date'].astype(np.datetime64)
@@ -78,10 +77,7 @@ def shibor_quote_data(year=None):
     lab = ct.SHIBOR_TYPE['Quote']
     lab = lab.encode('utf-8') if ct.PY3 else lab
     try:
-        df = pd.read_excel(ct.SHIBOR_DATA_URL%(ct.P_TYPE['http'], ct.DOMAINS['shibor'],
-                                               ct.PAGES['dw'], 'Quote',
-                                               year, lab,
-                                               year), skiprows=[0])
+        df = _read_excel('Quote', year, lab, skiprows=[0])
         df.columns = ct.QUOTE_COLS
         df['date'] = df['date'].map(lambda x: x.date())
         df['date'] = df['date'].astype(np.datetime64)
@@ -105,10 +101,7 @@ def shibor_ma_data(year=None):
     lab = ct.SHIBOR_TYPE['Tendency']
     lab = lab.encode('utf-8') if ct.PY3 else lab
     try:
-        df = pd.read_excel(ct.SHIBOR_DATA_URL%(ct.P_TYPE['http'], ct.DOMAINS['shibor'],
-                                               ct.PAGES['dw'], 'Shibor_Tendency',
-                                               year, lab,
-                                               year), skiprows=[0])
+        df = _read_excel('Shibor_Tendency', year, lab, skiprows=[0])
         df.columns = ct.SHIBOR_MA_COLS
         df['date'] = df['date'].map(lambda x: x.date())
         df['date'] = df['date'].astype(np.datetime64)
@@ -133,10 +126,7 @@ def lpr_data(year=None):
     lab = ct.SHIBOR_TYPE['LPR']
     lab = lab.encode('utf-8') if ct.PY3 else lab
     try:
-        df = pd.read_excel(ct.SHIBOR_DATA_URL%(ct.P_TYPE['http'], ct.DOMAINS['shibor'],
-                                               ct.PAGES['dw'], 'LPR',
-                                               year, lab,
-                                               year))
+        df = _read_excel('LPR', year, lab)
         df.columns = ct.LPR_COLS
         df['date'] = df['date'].map(lambda x: x.date())
         df['date'] = df['date'].astype(np.datetime64)
@@ -163,13 +153,19 @@ def lpr_ma_data(year=None):
     lab = ct.SHIBOR_TYPE['LPR_Tendency']
     lab = lab.encode('utf-8') if ct.PY3 else lab
     try:
-        df = pd.read_excel(ct.SHIBOR_DATA_URL%(ct.P_TYPE['http'], ct.DOMAINS['shibor'],
-                                               ct.PAGES['dw'], 'LPR_Tendency',
-                                               year, lab,
-                                               year), skiprows=[0])
+        df = _read_excel('LPR_Tendency', year, lab, skiprows=[0])
         df.columns = ct.LPR_MA_COLS
         df['date'] = df['date'].map(lambda x: x.date())
         df['date'] = df['date'].astype(np.datetime64)
         return df
     except:
         return None
+
+
+def _read_excel(name, year, lab, **kwargs):
+    """
+    通过共用的传输层下载某类数据某一年的Excel文件并读取
+    """
+    url = ct.SHIBOR_DATA_URL%(ct.P_TYPE['http'], ct.DOMAINS['shibor'],
+                              ct.PAGES['dw'], name, year, lab, year)
+    return pd.read_excel(BytesIO(tp.get(url, timeout=10)), **kwargs)
@@ -21,14 +21,24 @@ import numpy as np
 from tushare.stock import cons as ct
 import re
 # from pandas.compat import StringIO
-from io import StringIO
+from io import StringIO, BytesIO
 from tushare.util import dateu as du
+from tushare.util import workers as wk
+from tushare.util import cache
 import os
 
 try:
-    from urllib.request import urlopen, Request
+    from urllib.request import Request
 except ImportError:
-    from urllib2 import urlopen, Request
+    from urllib2 import Request
+from tushare.util import transport as tp
+from tushare.util import retry as rt
+from tushare.util import hqparse as hq
+from tushare.util import tickstore as tks
+from tushare.util import jsparse
+from tushare.util import htmltable as ht
+from tushare.stock import adjust as fq
+from tushare.stock import growth as gr
 import requests
 
 
@@ -56,6 +66,27 @@ def set_current_year_season(year, season):
     ct.CURRENT_YEAR = year
     ct.CURRENT_SEASON = season
 
+def set_max_workers(max_workers):
+    ct.MAX_WORKERS = max_workers
+    return ct.MAX_WORKERS
+
+def set_rate_limit(host, rate):
+    '''
+    设置域名的限速(每秒请求数), rate为None或0时取消限速
+    '''
+    if rate:
+        ct.HOST_RATE_LIMITS[host] = rate
+    else:
+        ct.HOST_RATE_LIMITS.pop(host, None)
+    return ct.HOST_RATE_LIMITS
+
+def set_max_in_flight(host, max_in_flight):
+    '''
+    设置某个域名同时进行中的最大请求数, host为'default'时设置其他域名的默认值
+    '''
+    ct.HOST_MAX_IN_FLIGHT[host] = max_in_flight
+    return ct.HOST_MAX_IN_FLIGHT
+
 def get_hist_data(code=None, start=None, end=None,
                   ktype='D', retry_count=3,
                   pause=0.001):
@@ -80,53 +111,56 @@ def get_hist_data(code=None, start=None, end=None,
       DataFrame
           属性:日期 ，开盘价， 最高价， 收盘价， 最低价， 成交量， 价格变动 ，涨跌幅，5日均价，10日均价，20日均价，5日均量，10日均量，20日均量，换手率
     """
-    symbol = _code_to_symbol(code)
-    url = ''
-    if ktype.upper() in ct.K_LABELS:
-        url = ct.DAY_PRICE_URL % (ct.P_TYPE['http'], ct.DOMAINS['ifeng'],
-                                  ct.K_TYPE[ktype.upper()], symbol)
-    elif ktype in ct.K_MIN_LABELS:
-        url = ct.DAY_PRICE_MIN_URL % (ct.P_TYPE['http'], ct.DOMAINS['ifeng'],
-                                      symbol, ktype)
-    else:
-        raise TypeError('ktype input error.')
-
-    for _ in range(retry_count):
-        time.sleep(pause)
+    url = _hist_data_url(code, ktype)
+    for _ in rt.attempts(retry_count, pause):
         try:
-            request = Request(url)
-            lines = urlopen(request, timeout=10).read()
+            lines = tp.get(url, timeout=10)
             if len(lines) < 15:  # no data
                 return None
         except Exception as e:
             print(e)
         else:
-            js = json.loads(lines.decode('utf-8') if ct.PY3 else lines)
-            cols = []
-            if (code in ct.INDEX_LABELS) & (ktype.upper() in ct.K_LABELS):
-                cols = ct.INX_DAY_PRICE_COLUMNS
-            else:
-                cols = ct.DAY_PRICE_COLUMNS
-            if len(js['record'][0]) == 14:
-                cols = ct.INX_DAY_PRICE_COLUMNS
-            df = pd.DataFrame(js['record'], columns=cols)
-            if ktype.upper() in ['D', 'W', 'M']:
-                df = df.applymap(lambda x: x.replace(u',', u''))
-                df[df == ''] = 0
-            for col in cols[1:]:
-                df[col] = df[col].astype(float)
-            if start is not None:
-                df = df[df.date >= start]
-            if end is not None:
-                df = df[df.date <= end]
-            if (code in ct.INDEX_LABELS) & (ktype in ct.K_MIN_LABELS):
-                df = df.drop('turnover', axis=1)
-            df = df.set_index('date')
-            df = df.sort_index(ascending=False)
-            return df
+            return _parse_hist_data(lines, code, start, end, ktype)
     raise IOError(ct.NETWORK_URL_ERROR_MSG)
 
 
+def _hist_data_url(code, ktype='D'):
+    symbol = _code_to_symbol(code)
+    if ktype.upper() in ct.K_LABELS:
+        return ct.DAY_PRICE_URL % (ct.P_TYPE['http'], ct.DOMAINS['ifeng'],
+                                   ct.K_TYPE[ktype.upper()], symbol)
+    elif ktype in ct.K_MIN_LABELS:
+        return ct.DAY_PRICE_MIN_URL % (ct.P_TYPE['http'], ct.DOMAINS['ifeng'],
+                                       symbol, ktype)
+    raise TypeError('ktype input error.')
+
+
+def _parse_hist_data(lines, code, start=None, end=None, ktype='D'):
+    js = json.loads(lines.decode('utf-8') if ct.PY3 else lines)
+    cols = []
+    if (code in ct.INDEX_LABELS) & (ktype.upper() in ct.K_LABELS):
+        cols = ct.INX_DAY_PRICE_COLUMNS
+    else:
+        cols = ct.DAY_PRICE_COLUMNS
+    if len(js['record'][0]) == 14:
+        cols = ct.INX_DAY_PRICE_COLUMNS
+    df = pd.DataFrame(js['record'], columns=cols)
+    if ktype.upper() in ['D', 'W', 'M']:
+        df = df.applymap(lambda x: x.replace(u',', u''))
+        df[df == ''] = 0
+    for col in cols[1:]:
+        df[col] = df[col].astype(float)
+    if start is not None:
+        df = df[df.date >= start]
+    if end is not None:
+        df = df[df.date <= end]
+    if (code in ct.INDEX_LABELS) & (ktype in ct.K_MIN_LABELS):
+        df = df.drop('turnover', axis=1)
+    df = df.set_index('date')
+    df = df.sort_index(ascending=False)
+    return df
+
+
 def get_tick_data(code=None, date=None, retry_count=3, pause=0.001):
     """
         获取分笔数据
@@ -147,25 +181,58 @@ def get_tick_data(code=None, date=None, retry_count=3, pause=0.001):
     """
     if code is None or len(code) != 6 or date is None:
         return None
-    symbol = _code_to_symbol(code)
-    for _ in range(retry_count):
-        time.sleep(pause)
+    # 历史日期的分笔数据不会再变化, 完整下载过一次后从本地存档读取
+    archive = ct.USE_CACHE and date < du.today()
+    if archive:
+        meta = tks.info(code, date)
+        if meta is not None and meta['complete']:
+            return _archived_ticks(code, date, ct.TICK_COLUMNS)
+    url = _tick_data_url(code, date)
+    for _ in rt.attempts(retry_count, pause):
         try:
-            re = Request(ct.TICK_PRICE_URL % (ct.P_TYPE['http'], ct.DOMAINS['sf'], ct.PAGES['dl'],
-                                              date, symbol))
-            lines = urlopen(re, timeout=10).read()
-            lines = lines.decode('GBK')
-            if len(lines) < 20:
-                return None
-            df = pd.read_table(StringIO(lines), names=ct.TICK_COLUMNS,
-                               skiprows=[0])
+            df = _parse_tick_data(tp.get(url, timeout=10))
         except Exception as e:
             print(e)
         else:
+            if archive and df is not None:
+                with tks._lock(code, date):
+                    tks.delete(code, date)
+                    tks.append(code, date, _ascending(df), complete=True)
+                    return _archived_ticks(code, date, ct.TICK_COLUMNS)
             return df
     raise IOError(ct.NETWORK_URL_ERROR_MSG)
 
 
+def _ascending(df):
+    """
+    分笔数据按成交时间从早到晚排列, 新浪返回的是从晚到早
+    """
+    if len(df) > 1 and df['time'].iloc[0] > df['time'].iloc[-1]:
+        return df.iloc[::-1].reset_index(drop=True)
+    return df
+
+
+def _archived_ticks(code, date, columns=None):
+    """
+    读取分笔存档, 与接口返回的顺序一致按成交时间从晚到早排列
+    """
+    df = tks.read(code, date, columns)
+    return df.iloc[::-1].reset_index(drop=True)
+
+
+def _tick_data_url(code, date):
+    return ct.TICK_PRICE_URL % (ct.P_TYPE['http'], ct.DOMAINS['sf'], ct.PAGES['dl'],
+                                date, _code_to_symbol(code))
+
+
+def _parse_tick_data(lines):
+    lines = lines.decode('GBK')
+    if len(lines) < 20:
+        return None
+    return pd.read_table(StringIO(lines), names=ct.TICK_COLUMNS,
+                         skiprows=[0])
+
+
 def get_sina_dd(code=None, date=None, vol=400, retry_count=3, pause=0.001):
     """
         获取sina大单数据
@@ -188,12 +255,11 @@ def get_sina_dd(code=None, date=None, vol=400, retry_count=3, pause=0.001):
         return None
     symbol = _code_to_symbol(code)
     vol = vol * 100
-    for _ in range(retry_count):
-        time.sleep(pause)
+    for _ in rt.attempts(retry_count, pause):
         try:
             re = Request(ct.SINA_DD % (ct.P_TYPE['http'], ct.DOMAINS['vsf'], ct.PAGES['sinadd'],
                                        symbol, vol, date))
-            lines = urlopen(re, timeout=10).read()
+            lines = tp.urlopen(re, timeout=10).read()
             lines = lines.decode('GBK')
             if len(lines) < 100:
                 return None
@@ -208,7 +274,8 @@ def get_sina_dd(code=None, date=None, vol=400, retry_count=3, pause=0.001):
     raise IOError(ct.NETWORK_URL_ERROR_MSG)
 
 
-def get_today_ticks(code=None, retry_count=3, pause=0.001):
+def get_today_ticks(code=None, retry_count=3, pause=0.001, incremental=False,
+                    max_workers=None):
     """
         获取当日分笔明细数据
     Parameters
@@ -219,6 +286,10 @@ def get_today_ticks(code=None, retry_count=3, pause=0.001):
                   如遇网络等问题重复执行的次数
         pause : int, 默认 0
                  重复请求数据过程中暂停的秒数，防止请求间隔时间太短出现的问题
+        incremental : bool, 默认 False
+                 为True时只返回上一次调用之后的新成交, 第一次调用返回全天
+        max_workers : int, 默认 None
+                 并发获取分页的线程数, 为空时使用ct.MAX_WORKERS
      return
      -------
         DataFrame 当日所有股票交易数据(DataFrame)
@@ -228,52 +299,141 @@ def get_today_ticks(code=None, retry_count=3, pause=0.001):
         return None
     symbol = _code_to_symbol(code)
     date = du.today()
-    for _ in range(retry_count):
-        time.sleep(pause)
+    if ct.USE_CACHE:
+        # 读存档、下载新成交和追加在同一把锁内完成, 同一股票的并发调用不会重复追加
+        with tks._lock(code, date):
+            return _get_today_ticks(code, symbol, date, retry_count, pause,
+                                    incremental, max_workers)
+    return _get_today_ticks(code, symbol, date, retry_count, pause,
+                            incremental, max_workers)
+
+
+def _get_today_ticks(code, symbol, date, retry_count, pause, incremental, max_workers):
+    # 已经取到的成交不再重复下载: 有存档时以存档最后一笔为准, 否则以上一次调用记住的为准
+    state = _today_ticks_state.get(code)
+    if state is not None and state['date'] != date:
+        state = None
+    last_time, seen = None, 0
+    if ct.USE_CACHE:
+        meta = tks.info(code, date)
+        if meta is not None and meta['last_time'] is not None:
+            last_time = meta['last_time']
+            seen = tks.tail_count(code, date, last_time)
+    elif incremental and state is not None:
+        last_time, seen = state['last_time'], state['seen']
+    known_pages = state['pages'] if state is not None and last_time is not None else None
+    for _ in rt.attempts(retry_count, pause):
         try:
-            request = Request(ct.TODAY_TICKS_PAGE_URL % (ct.P_TYPE['http'], ct.DOMAINS['vsf'],
-                                                         ct.PAGES['jv'], date,
-                                                         symbol))
-            data_str = urlopen(request, timeout=10).read()
-            data_str = data_str.decode('GBK')
-            data_str = data_str[1:-1]
-            data_str = eval(data_str, type('Dummy', (dict,),
-                                           dict(__getitem__=lambda s, n: n))())
-            data_str = json.dumps(data_str)
-            data_str = json.loads(data_str)
-            pages = len(data_str['detailPages'])
-            data = pd.DataFrame()
+            data_str = tp.get(_today_ticks_pages_url(symbol, date), timeout=10)
+            pages = _parse_today_ticks_pages(data_str)
             ct._write_head()
-            for pNo in range(1, pages + 1):
-                data = data.append(_today_ticks(symbol, date, pNo,
-                                                retry_count, pause), ignore_index=True)
+            data = _today_ticks_since(symbol, date, pages, last_time, known_pages,
+                                      retry_count, pause, max_workers)
         except Exception as er:
             print(str(er))
         else:
-            return data
+            data = _ascending(data)
+            if last_time is not None:
+                data = _drop_archived(data, last_time, seen)
+            _remember_ticks(code, date, pages, data, last_time, seen)
+            if ct.USE_CACHE:
+                tks.append(code, date, data)
+                if not incremental:
+                    return _archived_ticks(code, date)
+            return data.iloc[::-1].reset_index(drop=True)
     raise IOError(ct.NETWORK_URL_ERROR_MSG)
 
 
+# 每只股票最近一次获取当日分笔时的 {'date', 'pages', 'last_time', 'seen'}
+_today_ticks_state = {}
+
+
+def _remember_ticks(code, date, pages, data, last_time, seen):
+    """
+    记住总页数, 最后一笔的成交时间, 以及该秒已经取到的成交笔数
+    """
+    if len(data) > 0:
+        new_last = data['time'].iloc[-1]
+        count = int((data['time'] == new_last).sum())
+        if new_last == last_time:
+            count += seen
+        last_time, seen = new_last, count
+    _today_ticks_state[code] = {'date': date, 'pages': pages,
+                                'last_time': last_time, 'seen': seen}
+
+
+def _today_ticks_since(symbol, date, pages, last_time=None, known_pages=None,
+                       retry_count=3, pause=0.001, max_workers=None):
+    """
+    并发获取分页, 第1页是最新的成交; 没有last_time时获取全部分页,
+    否则按上次的总页数估算新成交所在的页数, 不够时再按批往后取, 直到遇到不晚于last_time的成交
+    """
+    batch_size = max_workers or ct.MAX_WORKERS
+    if last_time is None:
+        batch = pages
+    elif known_pages is not None:
+        batch = max(1, pages - known_pages + 1)
+    else:
+        batch = batch_size
+    frames = []
+    start = 1
+    while start <= pages:
+        end = min(pages, start + batch - 1)
+        got = wk.run_tasks(lambda pNo: _today_ticks(symbol, date, pNo, retry_count, pause),
+                           range(start, end + 1), max_workers)
+        frames.extend(got)
+        if last_time is not None and any((df['time'] <= last_time).any() for df in got):
+            break
+        start = end + 1
+        batch = batch_size
+    if len(frames) == 0:
+        return pd.DataFrame(columns=ct.TODAY_TICK_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _drop_archived(data, last_time, archived):
+    """
+    去掉已存档的成交: 早于last_time的全部去掉, 与last_time同一秒的去掉已存档的条数
+    data按成交时间从早到晚排列
+    """
+    same = data['time'] == last_time
+    keep = (data['time'] > last_time) | (same & (same.cumsum() > archived))
+    return data[keep].reset_index(drop=True)
+
+
+def _today_ticks_pages_url(symbol, date):
+    return ct.TODAY_TICKS_PAGE_URL % (ct.P_TYPE['http'], ct.DOMAINS['vsf'],
+                                      ct.PAGES['jv'], date, symbol)
+
+
+def _parse_today_ticks_pages(data_str):
+    """
+    解析当日分笔的分页信息, 返回总页数
+    """
+    data_str = data_str.decode('GBK')
+    data_str = jsparse.loads(data_str[1:-1])
+    return len(data_str['detailPages'])
+
+
+def _today_ticks_url(symbol, tdate, pageNo):
+    return ct.TODAY_TICKS_URL % (ct.P_TYPE['http'], ct.DOMAINS['vsf'],
+                                 ct.PAGES['t_ticks'], symbol, tdate, pageNo)
+
+
+def _parse_today_ticks(text):
+    html = lxml.html.parse(BytesIO(text))
+    res = html.xpath('//table[@id=\"datatbl\"]/tbody/tr')
+    df = ht.read_table(res, ct.TODAY_TICK_COLUMNS, percent=['pchange'])
+    df[['pchange', 'change']] = df[['pchange', 'change']].fillna(0)
+    return df
+
+
 def _today_ticks(symbol, tdate, pageNo, retry_count, pause):
     ct._write_console()
-    for _ in range(retry_count):
-        time.sleep(pause)
+    url = _today_ticks_url(symbol, tdate, pageNo)
+    for _ in rt.attempts(retry_count, pause):
         try:
-            html = lxml.html.parse(ct.TODAY_TICKS_URL % (ct.P_TYPE['http'],
-                                                         ct.DOMAINS['vsf'], ct.PAGES['t_ticks'],
-                                                         symbol, tdate, pageNo
-                                                         ))
-            res = html.xpath('//table[@id=\"datatbl\"]/tbody/tr')
-            if ct.PY3:
-                sarr = [etree.tostring(node).decode('utf-8') for node in res]
-            else:
-                sarr = [etree.tostring(node) for node in res]
-            sarr = ''.join(sarr)
-            sarr = '<table>%s</table>' % sarr
-            sarr = sarr.replace('--', '0')
-            df = pd.read_html(StringIO(sarr), parse_dates=False)[0]
-            df.columns = ct.TODAY_TICK_COLUMNS
-            df['pchange'] = df['pchange'].map(lambda x: x.replace('%', ''))
+            df = _parse_today_ticks(tp.get(url, timeout=10))
         except Exception as e:
             print(e)
         else:
@@ -318,6 +478,11 @@ def get_realtime_quotes(symbols=None):
             30：date，日期；
             31：time，时间；
     """
+    text = tp.get(_realtime_quotes_url(symbols), timeout=10)
+    return _parse_realtime_quotes(text)
+
+
+def _realtime_quotes_url(symbols):
     symbols_list = ''
     if isinstance(symbols, list) or isinstance(symbols, set) or isinstance(symbols, tuple) or isinstance(symbols,
                                                                                                          pd.Series):
@@ -327,33 +492,21 @@ def get_realtime_quotes(symbols=None):
         symbols_list = _code_to_symbol(symbols)
 
     symbols_list = symbols_list[:-1] if len(symbols_list) > 8 else symbols_list
-    request = Request(ct.LIVE_DATA_URL % (ct.P_TYPE['http'], ct.DOMAINS['sinahq'],
-                                          _random(), symbols_list))
-    text = urlopen(request, timeout=10).read()
-    text = text.decode('GBK')
-    reg = re.compile(r'\="(.*?)\";')
-    data = reg.findall(text)
-    regSym = re.compile(r'(?:sh|sz)(.*?)\=')
-    syms = regSym.findall(text)
-    data_list = []
-    syms_list = []
-    for index, row in enumerate(data):
-        if len(row) > 1:
-            data_list.append([astr for astr in row.split(',')])
-            syms_list.append(syms[index])
-    if len(syms_list) == 0:
+    return ct.LIVE_DATA_URL % (ct.P_TYPE['http'], ct.DOMAINS['sinahq'],
+                               _random(), symbols_list)
+
+
+def _parse_realtime_quotes(text):
+    df = hq.read_quotes(text)
+    if len(df) == 0:
         return None
-    df = pd.DataFrame(data_list, columns=ct.LIVE_DATA_COLS)
-    df = df.drop('s', axis=1)
-    df['code'] = syms_list
-    ls = [cls for cls in df.columns if '_v' in cls]
-    for txt in ls:
-        df[txt] = df[txt].map(lambda x: x[:-2])
-    return df
+    df['code'] = df['symbol'].str[2:]
+    return df.drop('symbol', axis=1)
 
 
 def get_h_data(code, start=None, end=None, autype='qfq',
-               index=False, retry_count=3, pause=0.001, drop_factor=True):
+               index=False, retry_count=3, pause=0.001, drop_factor=True,
+               asof=None, max_workers=None):
     '''
     获取历史复权数据
     Parameters
@@ -372,6 +525,10 @@ def get_h_data(code, start=None, end=None, autype='qfq',
                 重复请求数据过程中暂停的秒数，防止请求间隔时间太短出现的问题
       drop_factor : bool, 默认 True
                 是否移除复权因子，在分析过程中可能复权因子意义不大，但是如需要先储存到数据库之后再分析的话，有该项目会更加灵活
+      asof:string
+                  前复权的基准日期 format：YYYY-MM-DD, 为空时以最新的复权因子为基准
+      max_workers : int, 默认 None
+                并发获取各季度页面的线程数, 为空时使用ct.MAX_WORKERS
     return
     -------
       DataFrame
@@ -387,22 +544,9 @@ def get_h_data(code, start=None, end=None, autype='qfq',
     start = du.today_last_year() if start is None else start
     end = du.today() if end is None else end
     qs = du.get_quarts(start, end)
-    qt = qs[0]
     ct._write_head()
-    data = _parse_fq_data(_get_index_url(index, code, qt), index,
-                          retry_count, pause)
-    if data is None:
-        data = pd.DataFrame()
-    if len(qs) > 1:
-        for d in range(1, len(qs)):
-            qt = qs[d]
-            ct._write_console()
-            df = _parse_fq_data(_get_index_url(index, code, qt), index,
-                                retry_count, pause)
-            if df is None:  # 可能df为空，退出循环
-                break
-            else:
-                data = data.append(df, ignore_index=True)
+    frames = _fq_pages(code, qs, index, retry_count, pause, max_workers)
+    data = pd.concat(frames, ignore_index=True) if len(frames) > 0 else pd.DataFrame()
     if len(data) == 0 or len(data[(data.date >= start) & (data.date <= end)]) == 0:
         return None
     data = data.drop_duplicates('date')
@@ -411,67 +555,53 @@ def get_h_data(code, start=None, end=None, autype='qfq',
         data = data.set_index('date')
         data = data.sort_index(ascending=False)
         return data
-    if autype == 'hfq':
-        if drop_factor:
-            data = data.drop('factor', axis=1)
-        data = data[(data.date >= start) & (data.date <= end)]
-        for label in ['open', 'high', 'close', 'low']:
-            data[label] = data[label].map(ct.FORMAT)
-            data[label] = data[label].astype(float)
-        data = data.set_index('date')
-        data = data.sort_index(ascending=False)
-        return data
-    else:
-        if autype == 'qfq':
-            if drop_factor:
-                data = data.drop('factor', axis=1)
-            df = _parase_fq_factor(code, start, end)
-            df = df.drop_duplicates('date')
-            df = df.sort('date', ascending=False)
-            firstDate = data.head(1)['date']
-            frow = df[df.date == firstDate[0]]
-            rt = get_realtime_quotes(code)
-            if rt is None:
-                return None
-            if ((float(rt['high']) == 0) & (float(rt['low']) == 0)):
-                preClose = float(rt['pre_close'])
-            else:
-                if du.is_holiday(du.today()):
-                    preClose = float(rt['price'])
-                else:
-                    if (du.get_hour() > 9) & (du.get_hour() < 18):
-                        preClose = float(rt['pre_close'])
-                    else:
-                        preClose = float(rt['price'])
-
-            rate = float(frow['factor']) / preClose
-            data = data[(data.date >= start) & (data.date <= end)]
-            for label in ['open', 'high', 'low', 'close']:
-                data[label] = data[label] / rate
-                data[label] = data[label].map(ct.FORMAT)
-                data[label] = data[label].astype(float)
-            data = data.set_index('date')
-            data = data.sort_index(ascending=False)
-            return data
-        else:
-            for label in ['open', 'high', 'close', 'low']:
-                data[label] = data[label] / data['factor']
-            if drop_factor:
-                data = data.drop('factor', axis=1)
-            data = data[(data.date >= start) & (data.date <= end)]
-            for label in ['open', 'high', 'close', 'low']:
-                data[label] = data[label].map(ct.FORMAT)
-            data = data.set_index('date')
-            data = data.sort_index(ascending=False)
-            data = data.astype(float)
-            return data
+    data = data[(data.date >= start) & (data.date <= end)]
+    factor = data['factor'].to_numpy(dtype=float)
+    base = None
+    if autype == 'qfq':
+        # 页面中是后复权价格和当天的复权因子, 除以基准日的因子即为前复权价格;
+        # 页面的因子并入该股票的因子缓存, 之前获取过更近日期的页面时也能以最新因子为基准
+        # (getStockFuQuanData返回的是后复权价格而不是因子, 不能用作基准)
+        factors = fq.update_factors(code, data[['date', 'factor']])
+        base = fq.factor_at(factors, du.today() if asof is None else asof)
+    data = fq.adjust(data, factor, autype, base, adjusted=True)
+    if drop_factor:
+        data = data.drop('factor', axis=1)
+    data = data.set_index('date')
+    data = data.sort_index(ascending=False)
+    if autype not in ('qfq', 'hfq'):
+        data = data.astype(float)
+    return data
+
+
+def _fq_pages(code, quarters, index, retry_count, pause, max_workers=None):
+    """
+    按批并发获取各季度的历史页面, 每批max_workers个, 结果与quarters的顺序(由近到远)一致
+    某个季度没有数据表时说明更早的季度也没有数据, 丢弃它之后的结果并不再请求后面的批次;
+    最近的一个季度可能还没有数据, 不作为结束的标志
+    """
+    def page(qt):
+        ct._write_console()
+        return _parse_fq_data(_get_index_url(index, code, qt), index,
+                              retry_count, pause)
+    batch = max_workers or ct.MAX_WORKERS
+    frames = []
+    for start in range(0, len(quarters), batch):
+        got = wk.run_tasks(page, quarters[start:start + batch], max_workers)
+        for i, df in enumerate(got):
+            if df is None:
+                if start + i == 0:
+                    continue
+                return frames
+            frames.append(df)
+    return frames
 
 
 def _parase_fq_factor(code, start, end):
     symbol = _code_to_symbol(code)
     request = Request(ct.HIST_FQ_FACTOR_URL % (ct.P_TYPE['http'],
                                                ct.DOMAINS['vsf'], symbol))
-    text = urlopen(request, timeout=10).read()
+    text = tp.urlopen(request, timeout=10).read()
     text = text[1:len(text) - 1]
     text = text.decode('utf-8') if ct.PY3 else text
     text = text.replace('{_', '{"')
@@ -483,8 +613,7 @@ def _parase_fq_factor(code, start, end):
     text = json.loads(text)
     df = pd.DataFrame({'date': list(text['data'].keys()), 'factor': list(text['data'].values())})
     df['date'] = df['date'].map(_fun_except)  # for null case
-    if df['date'].dtypes == np.object:
-        df['date'] = df['date'].astype(np.datetime64)
+    df['date'] = pd.to_datetime(df['date'])
     df = df.drop_duplicates('date')
     df['factor'] = df['factor'].astype(float)
     return df
@@ -498,30 +627,23 @@ def _fun_except(x):
 
 
 def _parse_fq_data(url, index, retry_count, pause):
-    for _ in range(retry_count):
-        time.sleep(pause)
+    for _ in rt.attempts(retry_count, pause):
         try:
             request = Request(url)
-            text = urlopen(request, timeout=10).read()
+            text = tp.urlopen(request, timeout=10).read()
             text = text.decode('GBK')
             html = lxml.html.parse(StringIO(text))
             res = html.xpath('//table[@id=\"FundHoldSharesTable\"]')
-            if ct.PY3:
-                sarr = [etree.tostring(node).decode('utf-8') for node in res]
-            else:
-                sarr = [etree.tostring(node) for node in res]
-            sarr = ''.join(sarr)
-            if sarr == '':
+            if len(res) == 0:
                 return None
-            df = pd.read_html(sarr, skiprows=[0, 1])[0]
+            df = ht.read_table(res[0], skiprows=2)
             if len(df) == 0:
                 return pd.DataFrame()
             if index:
                 df.columns = ct.HIST_FQ_COLS[0:7]
             else:
                 df.columns = ct.HIST_FQ_COLS
-            if df['date'].dtypes == np.object:
-                df['date'] = df['date'].astype(np.datetime64)
+            df['date'] = pd.to_datetime(df['date'])
             df = df.drop_duplicates('date')
         except ValueError as e:
             # 时间较早，已经读不到数据
@@ -552,7 +674,7 @@ def get_index():
     """
     request = Request(ct.INDEX_HQ_URL % (ct.P_TYPE['http'],
                                          ct.DOMAINS['sinahq']))
-    text = urlopen(request, timeout=10).read()
+    text = tp.urlopen(request, timeout=10).read()
     text = text.decode('GBK')
     text = text.replace('var hq_str_sh', '').replace('var hq_str_sz', '')
     text = text.replace('";', '').replace('"', '').replace('=', ',')
@@ -587,32 +709,36 @@ Created on 2022/11/30
 @author: Charlie Zhou
 @contact: ben02060846@qq.com
 """
-def _get_cwfx(url, key='czzb', retry_count=3, pause=5):
-    for _ in range(retry_count):
+def _get_cwfx(url, key='czzb', retry_count=3, pause=5, update=False, ttl=None):
+    return cache.fetch(url, lambda: _fetch_cwfx(url, key, retry_count, pause),
+                       'cwfx', ttl=ttl, update=update)
+
+
+def _fetch_cwfx(url, key, retry_count, pause):
+    for _ in rt.attempts(retry_count, pause):
         try:
-            print(sys._getframe().f_code.co_name, url)
             request = Request(url)
-            lines = urlopen(request, timeout=10).read()
+            lines = tp.urlopen(request, timeout=10).read()
             if len(lines) < 100:  # no data
                 return None
-            else:
-                lines = lines.decode('utf-8') if ct.PY3 else lines
-                lines = lines.replace('--', '')
-                lines = lines.split('=')[1]
-                js = json.loads(lines[:-1])
-                df = pd.DataFrame(js['data'][key])
-                for col in df.columns:
-                    try:
-                        df[col] = [x.replace(',', '') for x in df[col]]
-                        df[col] = df[col].astype(float)
-                    except:
-                        pass
-                df.index = list(df['bgrq'])
-                return df
+            return _parse_cwfx(lines, key)
         except Exception as e:
             print(sys._getframe().f_code.co_name, url)
             print(e)
-            time.sleep(pause)
+
+
+def _parse_cwfx(lines, key):
+    """
+    解析 var xxx={...}; 形式的返回, 除bgrq外的列去掉千分位后整列转为数值, '--'等无法转换的为NaN
+    """
+    lines = lines.decode('utf-8') if ct.PY3 else lines
+    js = json.loads(lines.split('=', 1)[1].strip().rstrip(';'))
+    df = pd.DataFrame(js['data'][key])
+    for col in df.columns.drop('bgrq', errors='ignore'):
+        df[col] = pd.to_numeric(df[col].astype(str).str.replace(',', '', regex=False),
+                                errors='coerce')
+    df.index = list(df['bgrq'])
+    return df
 
 """
 Created on 2022/11/30
@@ -620,197 +746,132 @@ Created on 2022/11/30
 @contact: ben02060846@qq.com
 """
 def _get_cbsheet(url, retry_count=3, pause=5):
-    for _ in range(retry_count):
+    for _ in rt.attempts(retry_count, pause):
         try:
             print(sys._getframe().f_code.co_name, url)
             request = Request(url)
-            text = urlopen(request, timeout=10).read()
+            text = tp.urlopen(request, timeout=10).read()
             text = text.decode('gb2312')
-            text = text.replace('--', '')
             text = text.replace('万元', '')
             text = text.replace('万', '')
-            text = text.replace(',', '')
             html = lxml.html.parse(StringIO(text))
             res = html.xpath("//table[@class=\"list list_d\"]")
-            df = pd.read_html(etree.tostring(res[0]))[0]
-            df = df.transpose()
-            df0 = df[1:]
-            df0 = df0[df0.columns[1:]]
-            df0.columns = list(df.iloc[0][1:])
-            df0.index = list(df[0][1:])
-            df0 = df0[pd.notnull(df0.index)]
-            for col in df0.columns:
-                try:
-                    df0[col] = [x.replace(',', '') for x in df0[col]]
-                    df0[col] = df0[col].astype(float)
-                except:
-                    pass
-            df0 = df0.fillna(0)
-            return df0
+            return _statement_frame(res[0])
         except Exception as e:
             print(sys._getframe().f_code.co_name, url)
             print(e)
-            time.sleep(pause)
 
 """
 Created on 2022/11/30
 @author: Charlie Zhou
 @contact: ben02060846@qq.com
 """
-def __parse_sina_table(url, retry_count=1, pause=5, table_name='ProfitStatementNewTable0', update=False):
-    for _ in range(retry_count):
-        try:
-            print(sys._getframe().f_code.co_name, url)
-            __cache_file_path = '%s%s' % (ct.CACHE_DIR, url.replace('/', ''))
-            current_year = ct.CURRENT_YEAR
-            current_season = ct.CURRENT_SEASON
-            if os.path.exists(__cache_file_path) and ct.USE_CACHE and not update:
-                print(sys._getframe().f_code.co_name, '正在使用缓存', __cache_file_path)
-                df0 = pd.read_csv(__cache_file_path, index_col=0)
-                def __cal_df0(df0):
-                    cols = []
-                    for col in df0.columns:
-                        cols.append(unicode(col))
-                    df0.columns = cols
-                    return df0
-
-                if table_name != 'ProfitStatementNewTable0':
-                    return __cal_df0(df0)
-                else:
-                    # print df0.index[0].split('-')
-                    # print current_year, current_season
-                    if df0.index[0].split('-')[0] != current_year:
-                        return __cal_df0(df0)
-                    elif df0.index[0].split('-')[1] == current_season:
-                        return __cal_df0(df0)
+def __parse_sina_table(url, retry_count=1, pause=5, table_name='ProfitStatementNewTable0', update=False,
+                       ttl=None, validate=None):
+    return cache.fetch(url, lambda: _fetch_sina_table(url, retry_count, pause, table_name),
+                       'sina_statement', ttl=ttl, update=update,
+                       validate=lambda df: _sina_cache_valid(df, table_name) and
+                       (validate is None or validate(df)))
+
+
+# 新浪财务报表: 类别 -> (页面, 表格id)
+_SINA_STATEMENTS = {'balance': ('vFD_BalanceSheet', 'BalanceSheetNewTable0'),
+                    'income': ('vFD_ProfitStatement', 'ProfitStatementNewTable0'),
+                    'cashflow': ('vFD_CashFlow', 'ProfitStatementNewTable0'),
+                    'guideline': ('vFD_FinancialGuideLine', 'BalanceSheetNewTable0')}
+
+
+def _sina_statement(code, kind, year, update=False):
+    """
+    获取新浪某一年的财务报表, 与get_cbsheet/get_inst/get_cfst/get_sina_caiwu_index共用缓存
+    已有年报(或更早)的年份不会再变化, 缓存ct.STATEMENT_CLOSED_TTL秒; 当年的报表每次重新获取
+    """
+    page, table_name = _SINA_STATEMENTS[kind]
+    url = 'http://money.finance.sina.com.cn/corp/go.php/%s/stockid/%s/ctrl/%d/displaytype/4.phtml' % (
+        page, code, year)
+    this_year = datetime.date.today().year
+    if year >= this_year:
+        return __parse_sina_table(url, table_name=table_name, update=True)
+    closed = lambda df: year < this_year - 1 or '%d-12-31' % year in df.index
+    return __parse_sina_table(url, table_name=table_name, update=update,
+                              ttl=ct.STATEMENT_CLOSED_TTL, validate=closed)
+
+
+def _sina_cache_valid(df, table_name):
+    """
+    利润表缓存的最新一期是当年但不是当前季度时, 说明已有新财报, 需要重新获取
+    """
+    if table_name != 'ProfitStatementNewTable0' or len(df) == 0:
+        return True
+    period = str(df.index[0]).split('-')
+    return period[0] != ct.CURRENT_YEAR or period[1] == ct.CURRENT_SEASON
 
+
+def _fetch_sina_table(url, retry_count, pause, table_name):
+    for _ in rt.attempts(retry_count, pause):
+        try:
             request = Request(url)
-            text = urlopen(request, timeout=10).read()
+            text = tp.urlopen(request, timeout=10).read()
             text = text.decode('gb2312')
-            text = text.replace('--', '')
-            text = text.replace(',', '')
             html = lxml.html.parse(StringIO(text))
             res = html.xpath("//table[@id=\"%s\"]" % table_name)
-            df = pd.read_html(etree.tostring(res[0]))[0]
-            df = df.transpose()
-            df0 = df[1:]
-            df0 = df0[df0.columns[1:]]
-            df0.columns = list(df.iloc[0][1:])
-            df0.index = list(df[0][1:])
-            df0 = df0[pd.notnull(df0.index)]
-            for col in df0.columns:
-                try:
-                    df0[col] = [x.replace(',', '') for x in df0[col]]
-                    df0[col] = df0[col].astype(float)
-                except Exception as e:
-                    # print(e)
-                    pass
-            df0 = df0.fillna(0)
-            print('save to cache', __cache_file_path)
-            df0.to_csv(__cache_file_path)
-            time.sleep(3)
-            return df0
+            return _statement_frame(res[0])
         except Exception as e:
             print(sys._getframe().f_code.co_name, url)
             print(e)
-            time.sleep(pause)
 """
 Created on 2022/11/30
 @author: Charlie Zhou
 @contact: ben02060846@qq.com
 """
+def _statement_frame(table):
+    """
+    新浪财报表格(第一行为报告期, 第一列为科目)转为以报告期为索引, 科目为列的DataFrame,
+    数值列为float, 空值('--')为0
+    """
+    rows = ht.table_rows(table)
+    width = max(len(r) for r in rows)
+    periods = list(zip(*[r + [''] * (width - len(r)) for r in rows]))[1:]
+    df = ht.frame([list(p[1:]) for p in periods], [r[0] for r in rows[1:]])
+    df.index = [p[0] for p in periods]
+    df = df[[d not in ht.NA_VALUES for d in df.index]]
+    return df.fillna(0)
+
+
 def __convert_billion_dataframe(df):
     # 把亿万转换为数字,方便计算
-    d = {'亿': 10 ** 8, '万': 10 ** 4}
-    for col in df.columns:
-        # dataframe中有的类型是object,转换为string
-        df[col] = df[col].astype('|S')  # which will by default set the length to the max len it encounters
-
-    arr1 = []
-    for i in range(df.shape[0]):
-        arr0 = []
-        for col in df.columns:
-            pos0 = df.iloc[i][col].find('亿')
-            pos1 = df.iloc[i][col].find('万')
-            if pos0 > 0:
-                mult = 10 ** 8
-                num = df.iloc[i][col][:pos0]
-            elif pos1 > 0:
-                mult = 10 ** 4
-                num = df.iloc[i][col][:pos1]
-            else:
-                mult = 1
-                num = df.iloc[i][col]
-            arr0.append(float(num) * mult)
-        arr1.append(arr0)
-    df = pd.DataFrame(data=arr1, columns=df.columns)
+    # 整个表展开成一列做字符串向量操作: 单位前面的部分乘以对应倍数, 没有单位的直接转为float
+    text = pd.Series(df.values.astype(str).ravel())
+    yi = text.str.extract(u'^([^亿]+)亿', expand=False)
+    wan = text.str.extract(u'^([^万]+)万', expand=False)
+    num = yi.where(yi.notnull(), wan.where(wan.notnull(), text))
+    mult = np.where(yi.notnull(), 10 ** 8, np.where(wan.notnull(), 10 ** 4, 1))
+    values = (num.astype(float).values * mult).reshape(df.shape)
+    df = pd.DataFrame(data=values, columns=df.columns)
 
     return df
+
+
+# 旧版本的CSV缓存保存的是未转换单位的原始表格, 读取时一并转换
+cache.register_csv_transform('sina_statement_us', __convert_billion_dataframe)
 """
 Created on 2022/11/30
 @author: Charlie Zhou
 @contact: ben02060846@qq.com
 """
 def __parse_sina_table_us(url, retry_count=1, pause=5, table_name='ProfitStatementNewTable0'):
-    for _ in range(retry_count):
-        # try:
-            print(sys._getframe().f_code.co_name, url)
-            __cache_file_path = '%s%s' % (ct.CACHE_DIR, url.replace('/', ''))
-
-            # if not os.path.exists(__cache_file_path):
-            #     # 如果不存在缓存, 那就是获取不到的股票了,或者是新股
-            #     return None
-
-            if os.path.exists(__cache_file_path) and ct.USE_CACHE:
-                print(sys._getframe().f_code.co_name, '正在使用缓存', __cache_file_path)
-                df0 = pd.read_csv(__cache_file_path, index_col=0)
-                def __cal_df0(df0):
-                    cols = []
-                    for col in df0.columns:
-                        cols.append(unicode(col))
-                    df0.columns = cols
-                    return df0
-                df0 = __convert_billion_dataframe(df0)
-                return __cal_df0(df0)
+    # 缓存中保存的是已转换单位的数据, 命中时不用再转换
+    return cache.fetch(url, lambda: _fetch_sina_table_us(url, table_name),
+                       'sina_statement_us')
 
-            request = Request(url)
-            text = urlopen(request, timeout=10).read()
-            text = text.decode('gb2312')
-            # html = lxml.html.parse(StringIO(text))
-            # res0 = html.xpath("//table")
-            # df000 = pd.read_html(etree.tostring(res0[0]))[0]
-            # print df000
-            # exit()
-
-            text = text.replace('--', '')
-            text = text.replace(',', '')
-            html = lxml.html.parse(StringIO(text))
 
-            res = html.xpath("//table[@class=\"%s\"]" % table_name)
-            df = pd.read_html(etree.tostring(res[1]))[0]
-            df = df.transpose()
-            df0 = df[1:]
-            df0 = df0[df0.columns[1:]]
-            df0.columns = list(df.iloc[0][1:])
-            df0.index = list(df[0][1:])
-            df0 = df0[pd.notnull(df0.index)]
-            for col in df0.columns:
-                try:
-                    df0[col] = [x.replace(',', '') for x in df0[col]]
-                    df0[col] = df0[col].astype(float)
-                except Exception as e:
-                    # print(e)
-                    pass
-            df0 = df0.fillna(0)
-            print('save to cache', __cache_file_path)
-            df0.to_csv(__cache_file_path)
-            time.sleep(10)
-            df0 = __convert_billion_dataframe(df0)
-            return df0
-        # except Exception, e:
-        #     print sys._getframe().f_code.co_name, url
-        #     print e
-        #     time.sleep(pause)
+def _fetch_sina_table_us(url, table_name):
+    request = Request(url)
+    text = tp.urlopen(request, timeout=10).read()
+    text = text.decode('gb2312')
+    html = lxml.html.parse(StringIO(text))
+    res = html.xpath("//table[@class=\"%s\"]" % table_name)
+    return __convert_billion_dataframe(_statement_frame(res[1]))
 """
 Created on 2022/11/30
 @author: Charlie Zhou
@@ -868,35 +929,32 @@ Created on 2022/11/30
 @author: Charlie Zhou
 @contact: ben02060846@qq.com
 """
+def _get_text(url, timeout=60):
+    """
+    按重试策略获取页面内容(UTF-8解码后的文本), 全部失败时抛出最后一次的错误
+    """
+    return rt.RetryPolicy(retries=3).call(tp.get, url, timeout=timeout).decode('utf-8', 'replace')
+
+
 def get_aastock_profit_loss(code, period, is_update = False):
     url = 'http://www.aastocks.com/en/stocks/analysis/company-fundamental/profit-loss?symbol=%s&period=%d' \
                       % (code, period)
     print(sys._getframe().f_code.co_name, url)
-    __cache_file_path = '%s%s' % (ct.CACHE_DIR, url.replace('/', ''))
-    if not is_update and os.path.exists(__cache_file_path) and os.path.exists(__cache_file_path + '2') and ct.USE_CACHE:
-        print(sys._getframe().f_code.co_name, '正在使用缓存', __cache_file_path)
-        df = pd.read_csv(__cache_file_path, index_col=0)
-        df2 = pd.read_csv(__cache_file_path + '2', index_col=
-                          0)
-        return df, df2
-
-    for _ in range(3):
+
+    def _fetch():
+        text = _get_text(url)
+        # 网络错误向上抛出, 只有页面中没有数据表时返回None
         try:
-            text = urlopen(Request(url.encode('utf-8')), timeout=60).read()
-            break
-        except Exception as e:
-            print(e)
-            time.sleep(60)
-    try:
-        sarr = etree.tostring(lxml.html.parse(StringIO(text)).xpath('//table[@id="cnhk-list"]')[0])
-        df = pd.read_html(sarr)[0]
-        sarr = etree.tostring(lxml.html.parse(StringIO(text)).xpath('//table[@id="cnhk-list2"]')[0])
-        df2 = pd.read_html(sarr)[0]
-        df.to_csv(__cache_file_path)
-        df2.to_csv(__cache_file_path + '2')
-        return df, df2
-    except:
-        return None, None
+            html = lxml.html.parse(StringIO(text))
+            sarr = etree.tostring(html.xpath('//table[@id="cnhk-list"]')[0], encoding='unicode')
+            df = pd.read_html(StringIO(sarr))[0]
+            sarr = etree.tostring(html.xpath('//table[@id="cnhk-list2"]')[0], encoding='unicode')
+            df2 = pd.read_html(StringIO(sarr))[0]
+            return df, df2
+        except (IndexError, ValueError):
+            return None, None
+    return cache.fetch(url, _fetch, 'aastock', parts=2, update=is_update, legacy=('', '2'))
+
 
 """
 Created on 2022/11/30
@@ -907,26 +965,18 @@ def get_aastock_buyback(code, is_update=False):
     url = 'http://www.aastocks.com/en/stocks/analysis/company-fundamental/securities-buyback?symbol=%s' \
                       % (code)
     print(sys._getframe().f_code.co_name, url)
-    __cache_file_path = '%s%s' % (ct.CACHE_DIR, url.replace('/', ''))
-    if not is_update and os.path.exists(__cache_file_path) and ct.USE_CACHE:
-        print(sys._getframe().f_code.co_name, '正在使用缓存', __cache_file_path)
-        df = pd.read_csv(__cache_file_path, index_col=0)
-        return df
 
-    for _ in range(3):
+    def _fetch():
+        text = _get_text(url)
+        # 网络错误向上抛出, 只有页面中没有数据表时返回None
         try:
-            text = urlopen(Request(url.encode('utf-8')), timeout=60).read()
-            break
-        except Exception as e:
-            print(e)
-            time.sleep(60)
-    try:
-        sarr = etree.tostring(lxml.html.parse(StringIO(text)).xpath('//table[@class="cnhk-cf tblM s4 s5 mar15T"]')[0])
-        df = pd.read_html(sarr)[0]
-        df.to_csv(__cache_file_path)
-        return df
-    except:
-        return None
+            sarr = etree.tostring(lxml.html.parse(StringIO(text)).xpath('//table[@class="cnhk-cf tblM s4 s5 mar15T"]')[0],
+                                  encoding='unicode')
+            return pd.read_html(StringIO(sarr))[0]
+        except (IndexError, ValueError):
+            return None
+    return cache.fetch(url, _fetch, 'aastock', update=is_update)
+
 
 """
 Created on 2022/11/30
@@ -937,28 +987,14 @@ def get_aastock_balance_sheet(code, period):
     print('get_aastock_balance_sheet')
     url = 'http://www.aastocks.com/en/stocks/analysis/company-fundamental/balance-sheet?symbol=%s&period=%d' \
                       % (code, period)
-    __cache_file_path = '%s%s' % (ct.CACHE_DIR, url.replace('/', ''))
-    print('是否使用缓存: ', ct.USE_CACHE)
-    if os.path.exists(__cache_file_path) and ct.USE_CACHE:
-        print(sys._getframe().f_code.co_name, '正在使用缓存', __cache_file_path)
-        df0 = pd.read_csv(__cache_file_path, index_col=0)
-        return df0
-    else:
+
+    def _fetch():
         print('正在从网络获取')
+        text = _get_text(url)
+        sarr = etree.tostring(lxml.html.parse(StringIO(text)).xpath('//table[@id="cnhk-list"]')[0])
+        return pd.read_html(sarr)[0]
+    return cache.fetch(url, _fetch, 'aastock')
 
-    for _ in range(3):
-        try:
-            text = urlopen(Request(url.encode('utf-8')), timeout=60).read()
-            break
-        except Exception as e:
-            print(e)
-            time.sleep(60)
-    sarr = etree.tostring(lxml.html.parse(StringIO(text)).xpath('//table[@id="cnhk-list"]')[0])
-    df = pd.read_html(sarr)[0]
-    df.to_csv(__cache_file_path)
-    sarr = etree.tostring(lxml.html.parse(StringIO(text)).xpath('//table[@id="cnhk-list2"]')[0])
-    df2 = pd.read_html(sarr)[0]
-    return df
 
 """
 Created on 2022/11/30
@@ -969,25 +1005,13 @@ def get_aastock_cash_flow(code, period):
     url = 'http://www.aastocks.com/en/stocks/analysis/company-fundamental/cash-flow?symbol=%s&period=%d' \
                       % (code, period)
     print(sys._getframe().f_code.co_name, url)
-    __cache_file_path = '%s%s' % (ct.CACHE_DIR, url.replace('/', ''))
-    if os.path.exists(__cache_file_path) and ct.USE_CACHE:
-        print(sys._getframe().f_code.co_name, '正在使用缓存', __cache_file_path)
-        df0 = pd.read_csv(__cache_file_path, index_col=0)
-        return df0
 
-    for _ in range(3):
-        try:
-            text = urlopen(Request(url.encode('utf-8')), timeout=60).read()
-            break
-        except Exception as e:
-            print(e)
-            time.sleep(60)
-    sarr = etree.tostring(lxml.html.parse(StringIO(text)).xpath('//table[@id="cnhk-list"]')[0])
-    df = pd.read_html(sarr)[0]
-    df.to_csv(__cache_file_path)
-    # sarr = etree.tostring(lxml.html.parse(StringIO(text)).xpath('//table[@id="cnhk-list2"]')[0])
-    # df2 = pd.read_html(sarr)[0]
-    return df
+    def _fetch():
+        text = _get_text(url)
+        sarr = etree.tostring(lxml.html.parse(StringIO(text)).xpath('//table[@id="cnhk-list"]')[0])
+        return pd.read_html(sarr)[0]
+    return cache.fetch(url, _fetch, 'aastock')
+
 
 """
 Created on 2022/11/30
@@ -999,26 +1023,8 @@ def get_wsj_hk_income_statement(code, cf_type='quarter', market='HK'):
         url = 'https://quotes.wsj.com/in/xbom/%s/financials/%s/income-statement' % (code, cf_type)
     else:
         url = 'https://quotes.wsj.com/HK/%s/financials/%s/income-statement' % (code[1:], cf_type)
-    __cache_file_path = '%s%s' % (ct.CACHE_DIR, url.replace('/', ''))
-    # if os.path.exists(__cache_file_path) and (ct.USE_CACHE or cf_type == 'annual'):
-    if os.path.exists(__cache_file_path) and (ct.USE_CACHE):
-        print(sys._getframe().f_code.co_name, '正在使用缓存', __cache_file_path)
-        df0 = pd.read_csv(__cache_file_path, index_col=0)
-        return df0
     print(sys._getframe().f_code.co_name, url)
-    for _ in range(3):
-        try:
-            text = urlopen(Request(url), timeout=60).read()
-            break
-        except Exception as e:
-            print(e)
-            time.sleep(60)
-    html = lxml.html.parse(StringIO(text))
-    res = html.xpath('//table[@class="cr_dataTable"]')
-    sarr = etree.tostring(res[0])
-    df = pd.read_html(sarr)[0]
-    df.to_csv(__cache_file_path)
-    return df
+    return cache.fetch(url, lambda: _wsj_tables(url, 1)[0], 'wsj')
 
 """
 Created on 2022/11/30
@@ -1038,31 +1044,17 @@ def get_wsj_balance_sheet(code, cf_type='annual', market='hk'):
         else:
             url = 'https://quotes.wsj.com/CN/XSHE/%s/financials/%s/balance-sheet' % (code, cf_type)
     print(sys._getframe().f_code.co_name, url)
-    __cache_file_path = '%s%s' % (ct.CACHE_DIR, url.replace('/', ''))
-    if os.path.exists(__cache_file_path) and os.path.exists(__cache_file_path+'1') and (ct.USE_CACHE or cf_type == 'annual'):
-        print(sys._getframe().f_code.co_name, '正在使用缓存', __cache_file_path)
-        df0 = pd.read_csv(__cache_file_path, index_col=0)
-        df1 = pd.read_csv(__cache_file_path + '1', index_col=0)
-        return df0, df1
+    return cache.fetch(url, lambda: _wsj_tables(url, 2), 'wsj', parts=2, legacy=('', '1'))
 
 
-    for _ in range(3):
-        try:
-            text = urlopen(Request(url), timeout=60).read()
-            break
-        except Exception as e:
-            print(e)
-            time.sleep(60)
+def _wsj_tables(url, count):
+    """
+    获取wsj财务页面中的前count个数据表
+    """
+    text = _get_text(url)
     html = lxml.html.parse(StringIO(text))
     res = html.xpath('//table[@class="cr_dataTable"]')
-
-    df = pd.read_html(etree.tostring(res[0]))[0]
-    df.to_csv(__cache_file_path)
-
-    df1 = pd.read_html(etree.tostring(res[1]))[0]
-    df1.to_csv(__cache_file_path + '1')
-
-    return df, df1
+    return tuple(pd.read_html(etree.tostring(res[i]))[0] for i in range(count))
 
 import sys
 """
@@ -1083,34 +1075,8 @@ def get_wsj_hk_free_cash_flow(code, cf_type='annual', market='hk'):
         else:
             url = 'https://quotes.wsj.com/CN/XSHE/%s/financials/%s/cash-flow' % (code, cf_type)
     print(sys._getframe().f_code.co_name, url)
-    __cache_file_path = '%s%s2' % (ct.CACHE_DIR, url.replace('/', ''))
-    if os.path.exists(__cache_file_path) and os.path.exists(__cache_file_path + '1') and os.path.exists(
-            __cache_file_path + '2') and (ct.USE_CACHE or cf_type == 'annual'):
-        print(sys._getframe().f_code.co_name, '正在使用缓存', __cache_file_path)
-        df0 = pd.read_csv(__cache_file_path, index_col=0)
-        df1 = pd.read_csv(__cache_file_path+'1', index_col=0)
-        df2 = pd.read_csv(__cache_file_path+'2', index_col=0)
-        return df0, df1, df2
-    for _ in range(3):
-        try:
-            text = urlopen(Request(url), timeout=60).read()
-            break
-        except Exception as e:
-            print (e, '获取自由现金流失败')
-            time.sleep(60)
-    html = lxml.html.parse(StringIO(text))
-    res = html.xpath('//table[@class="cr_dataTable"]')
-
-    df = pd.read_html(etree.tostring(res[0]))[0]
-    df.to_csv(__cache_file_path)
-
-    df1 = pd.read_html(etree.tostring(res[1]))[0]
-    df1.to_csv(__cache_file_path + '1')
-
-    df2 = pd.read_html(etree.tostring(res[2]))[0]
-    df2.to_csv(__cache_file_path + '2')
-
-    return df, df1, df2
+    return cache.fetch(url, lambda: _wsj_tables(url, 3), 'wsj', parts=3,
+                       legacy=('2', '21', '22'))
 
 """
 Created on 2022/11/30
@@ -1120,7 +1086,7 @@ Created on 2022/11/30
 def get_wsj_hk_predict_pe(code):
     try:
         wsj_pe_url = 'https://quotes.wsj.com/HK/XHKG/%s/research-ratings' % code[1:]
-        text = urlopen(Request(wsj_pe_url.encode('utf-8')), timeout=60).read()
+        text = tp.urlopen(Request(wsj_pe_url.encode('utf-8')), timeout=60).read()
         sarr = etree.tostring(lxml.html.parse(StringIO(text)).xpath('//*[@id="rr_module_yearly_estimates"]/table[@class="cr_dataTable crTable-trends"]/tbody/tr[@class="firstRow"]/td[@class="valueCell"]')[0])
         earning_per_share = float(sarr.split('</sup>')[1].split('<')[0])
         price = float(lxml.html.parse(StringIO(text)).xpath('//*[@id="quote_val"]')[0].text)
@@ -1240,25 +1206,18 @@ Created on 2022/11/30
 """
 def get_profit_yoy(code, year=2016):
     '''
-    扣非净利润同比
+    扣非净利润同比, 本年和上年两页并发获取, 按报告期对齐后计算
+    多只股票请用 gr.yoy(get_cwfx_many(codes, [year - 1, year]), ['jlrkc'])
     '''
     symbol = _code_to_symbol(code)
-    url = 'http://comdata.finance.gtimg.cn/data/ylnl/%s/%d' % (symbol, year)
-    df_0 = _get_cwfx(url, 'ylnl')
-    df_0['jlrkc_yoy'] = np.nan
-    print(df_0)
-    url = 'http://comdata.finance.gtimg.cn/data/ylnl/%s/%d' % (symbol, year - 1)
-    df_1 = _get_cwfx(url, 'ylnl')
-    for idx, row in df_0.iterrows():
-        date = str(year - 1) + '-' + row['bgrq'][5:]
-        rets = df_1[df_1['bgrq'] == date]
-        print(rets)
-        if rets.shape[0] > 0:
-            try:
-                val = (row['jlrkc'] / float(rets.iloc[0]['jlrkc']) - 1) * 100
-                df_0.set_value(idx, 'jlrkc_yoy', val)
-            except Exception as e:
-                print(e)
+    frames = wk.run_tasks(lambda y: _get_cwfx(ct.CWFX_URL % ('ylnl', symbol, y), 'ylnl'),
+                          [year, year - 1])
+    df_0 = frames[0]
+    if df_0 is None:
+        return None
+    df_0 = df_0.copy()
+    both = pd.concat([df for df in frames if df is not None])
+    df_0['jlrkc_yoy'] = gr.yoy(both, ['jlrkc'])['jlrkc_yoy'].to_numpy()[:len(df_0)]
     return df_0
 
 """
@@ -1310,6 +1269,51 @@ def get_djcw(code, year=2016, years=0, index=False):
     return _get_cwfx(url, 'djcw')
 
 
+def get_cwfx_many(codes, years, kind='profit', index=False, update=False,
+                  max_workers=None, retry_count=3, pause=1):
+    """
+    批量获取多只股票、多个年度的腾讯财务比率(get_profit/get_growth/get_debtpaying/get_operation/get_djcw),
+    所有(代码, 年度)通过线程池获取, 已过去的年度缓存ct.STATEMENT_CLOSED_TTL秒
+    请求受ct.HOST_RATE_LIMITS中gtimg.cn的限速(默认每秒20个), 未缓存时总吞吐量不超过该限速,
+    单个请求耗时在50ms左右时与逐个请求相差不大; 需要更快时用set_rate_limit('gtimg.cn', n)调高限速
+    Parameters
+    ------
+      codes: string or list 股票代码 e.g. ['600848', '000001']
+      years: int or list 年度 e.g. range(2015, 2022)
+      kind: string profit-盈利能力 growth-成长能力 debtpaying-偿债能力 operation-营运能力 djcw-单季财务,
+            也可以直接使用接口中的数据键(ylnl, cznl, czzb, yynl, djcw)
+      index: bool codes是否为指数代码
+      update: bool 为True时忽略缓存, 全部重新获取
+      max_workers: int 并发线程数, 为空时使用ct.MAX_WORKERS
+    return
+    -------
+      DataFrame 以(code, bgrq报告期)为MultiIndex, 列为接口中的各指标(数值), 没有数据时返回None
+    """
+    key = ct.CWFX_KINDS.get(kind, kind)
+    codes = [codes] if isinstance(codes, str) else list(codes)
+    years = [years] if isinstance(years, int) else list(years)
+    this_year = datetime.date.today().year
+
+    def fetch(task):
+        code, year = task
+        symbol = ct.INDEX_SYMBOL[code] if index else _code_to_symbol(code)
+        ttl = ct.STATEMENT_CLOSED_TTL if year < this_year - 1 else None
+        return _get_cwfx(ct.CWFX_URL % (key, symbol, year), key, retry_count, pause,
+                         update, ttl)
+
+    tasks = [(code, year) for code in codes for year in years]
+    frames = wk.run_tasks(fetch, tasks, max_workers)
+    frames = [df.assign(code=code) for (code, _), df in zip(tasks, frames)
+              if df is not None and len(df) > 0]
+    if len(frames) == 0:
+        return None
+    df = pd.concat(frames, ignore_index=True)
+    df['bgrq'] = pd.to_datetime(df['bgrq'], errors='coerce')
+    df = df[df['bgrq'].notnull()].set_index(['code', 'bgrq'])
+    df = df[~df.index.duplicated()]
+    return df.sort_index()
+
+
 from datetime import date
 
 
@@ -1451,9 +1455,23 @@ def get_k_data(code=None, start='', end='',
                ktype='D', autype='qfq',
                index=False,
                retry_count=3,
-               pause=0.001):
+               pause=0.001,
+               max_workers=None):
 
-    # print('tushare.trading.get_k_data', end)
+    urls, dataflag, symbol = _k_data_urls(code, start, end, ktype, autype, index)
+    # 按年份拆分的多个url并发获取, 最后一次性拼接并按日期去重
+    frames = wk.run_tasks(lambda url: _get_k_data(url, dataflag,
+                                                  symbol, code,
+                                                  index, ktype,
+                                                  retry_count, pause),
+                          urls, max_workers)
+    return _merge_k_data(frames, start, end, ktype)
+
+
+def _k_data_urls(code, start='', end='', ktype='D', autype='qfq', index=False):
+    """
+    生成get_k_data需要请求的url列表, 返回(urls, dataflag, symbol)
+    """
     is_us = False
     if re.compile(u"[a-zA-Z]+").search(code, 0) is not None:
         is_us = True
@@ -1501,15 +1519,19 @@ def get_k_data(code=None, start='', end='',
             dataflag = 'm%s' % ktype
     else:
         raise TypeError('ktype input error.')
-    data = pd.DataFrame()
-    for url in urls:
-        # print(datetime.datetime.now(), '-'*20)
-        _temp = _get_k_data(url, dataflag,
-                                       symbol, code,
-                                       index, ktype,
-                                       retry_count, pause)
-        data = data.append(_temp,   ignore_index=True)
-        # print(datetime.datetime.now(), '-'*20)
+    return urls, dataflag, symbol
+
+
+def _merge_k_data(frames, start='', end='', ktype='D'):
+    frames = [df for df in frames if df is not None]
+    if len(frames) == 0:
+        data = pd.DataFrame()
+    elif len(frames) == 1:
+        data = frames[0]
+    else:
+        data = pd.concat(frames, ignore_index=True)
+        data = data.drop_duplicates('date')
+        data = data.sort_values(by='date').reset_index(drop=True)
     if ktype not in ct.K_MIN_LABELS:
         if ((start is not None) & (start != '')) & ((end is not None) & (end != '')):
             data = data[(data.date >= start) & (data.date <= end)]
@@ -1566,7 +1588,7 @@ def get_etf_data(code=None, start='', end='',
     lines = None
     try:
         request = Request(url)
-        lines = urlopen(request, timeout=10).read()
+        lines = tp.urlopen(request, timeout=10).read()
         if len(lines) < 100:  # no data
             return None
     except Exception as e:
@@ -1585,8 +1607,6 @@ def get_etf_data(code=None, start='', end='',
     return df
 
 
-# 为了第二次访问的时候, 速度更快, 所以先建立session
-session = requests.session()
 def _get_k_data(url, dataflag='',
                 symbol='',
                 code='',
@@ -1595,55 +1615,53 @@ def _get_k_data(url, dataflag='',
                 retry_count=1,
                 pause=0.001):
     # print (url)
-    for _ in range(retry_count):
-        # print(_)
-        # if _ > 0:
-        #     time.sleep(pause)
+    for _ in rt.attempts(retry_count, pause):
         try:
-            # request = Request(url)
-            # lines = urlopen(request, timeout=10).read()
-            # lines = urlopen(url).read()
-            lines = session.get(url).content.decode('utf-8')
+            # 传输层按域名复用连接并限速
+            lines = tp.get(url).decode('utf-8')
             if len(lines) < 100:  # no data
                 return None
         except Exception as e:
             print(e)
         else:
-            # lines = lines.decode('utf-8') if ct.PY3 else lines
-            lines = lines.split('=')[1]
-            reg = re.compile(r',{"(nd|cqr).*?}')
-            lines = re.subn(reg, '', lines)
-            js = json.loads(lines[0])
-            dataflag = dataflag if dataflag in list(js['data'][symbol].keys()) else ct.TT_K_TYPE[ktype.upper()]
-            if len(code) == 5 and ktype == '5':
-                results = []
-                for item in js['data'][symbol][dataflag]:
-                    for row in item[u'data']:
-                        if len(row) != 0:
-                            cols = row.split(' ')
-                            col_t = cols[0]
-                            col_price = cols[1]
-                            if int(col_t) % 5 == 0:
-                                results.append({'date': '%s %s' % (item[u'date'], col_t), 'price': col_price})
-                return pd.DataFrame(results).sort_values(by='date', ascending=True)
-            else:
-                if symbol.find('us') == 0:
-                    totals = []
-                    for i in js['data'][symbol][dataflag]:
-                        totals.append(i[:6])
-                    df = pd.DataFrame(totals, columns=ct.KLINE_TT_COLS)
-                elif len(code) == 5:
-                    df = pd.DataFrame(js['data'][symbol][dataflag], columns=ct.KLINE_HKTT_COLS)
-                else:
-                    df = pd.DataFrame(js['data'][symbol][dataflag], columns=ct.KLINE_TT_COLS)
-                df['code'] = symbol if index else code
-                if ktype in ct.K_MIN_LABELS:
-                    df['date'] = df['date'].map(lambda x: '%s-%s-%s %s:%s' % (x[0:4], x[4:6],
-                                                                              x[6:8], x[8:10],
-                                                                              x[10:12]))
-                for col in df.columns[1:6]:
-                    df[col] = df[col].astype(float)
-                return df
+            return _parse_k_data(lines, dataflag, symbol, code, index, ktype)
+
+
+def _parse_k_data(lines, dataflag='', symbol='', code='', index=False, ktype=''):
+    lines = lines.split('=')[1]
+    reg = re.compile(r',{"(nd|cqr).*?}')
+    lines = re.subn(reg, '', lines)
+    js = json.loads(lines[0])
+    dataflag = dataflag if dataflag in list(js['data'][symbol].keys()) else ct.TT_K_TYPE[ktype.upper()]
+    if len(code) == 5 and ktype == '5':
+        results = []
+        for item in js['data'][symbol][dataflag]:
+            for row in item[u'data']:
+                if len(row) != 0:
+                    cols = row.split(' ')
+                    col_t = cols[0]
+                    col_price = cols[1]
+                    if int(col_t) % 5 == 0:
+                        results.append({'date': '%s %s' % (item[u'date'], col_t), 'price': col_price})
+        return pd.DataFrame(results).sort_values(by='date', ascending=True)
+    else:
+        if symbol.find('us') == 0:
+            totals = []
+            for i in js['data'][symbol][dataflag]:
+                totals.append(i[:6])
+            df = pd.DataFrame(totals, columns=ct.KLINE_TT_COLS)
+        elif len(code) == 5:
+            df = pd.DataFrame(js['data'][symbol][dataflag], columns=ct.KLINE_HKTT_COLS)
+        else:
+            df = pd.DataFrame(js['data'][symbol][dataflag], columns=ct.KLINE_TT_COLS)
+        df['code'] = symbol if index else code
+        if ktype in ct.K_MIN_LABELS:
+            df['date'] = df['date'].map(lambda x: '%s-%s-%s %s:%s' % (x[0:4], x[4:6],
+                                                                      x[6:8], x[8:10],
+                                                                      x[10:12]))
+        for col in df.columns[1:6]:
+            df[col] = df[col].astype(float)
+        return df
 
 
 def get_hists(symbols, start=None, end=None,
@@ -1652,20 +1670,97 @@ def get_hists(symbols, start=None, end=None,
     """
     批量获取历史行情数据，具体参数和返回数据类型请参考get_hist_data接口
     """
-    df = pd.DataFrame()
     if isinstance(symbols, list) or isinstance(symbols, set) or isinstance(symbols, tuple) or isinstance(symbols,
                                                                                                          pd.Series):
+        frames = []
         for symbol in symbols:
             data = get_hist_data(symbol, start=start, end=end,
                                  ktype=ktype, retry_count=retry_count,
                                  pause=pause)
             data['code'] = symbol
-            df = df.append(data, ignore_index=True)
-        return df
+            frames.append(data)
+        if len(frames) == 0:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
     else:
         return None
 
 
+def get_k_data_many(codes, start='', end='',
+                    ktype='D', autype='qfq',
+                    index=False,
+                    retry_count=3,
+                    pause=0.001,
+                    max_workers=None,
+                    code_retries=1,
+                    as_dict=False):
+    """
+    批量获取k线数据, 用线程池并发调用get_k_data, 适合全市场数据更新
+    Parameters
+    ------
+      codes:list, tuple, set 或 Series
+                  股票代码列表 e.g. ['600848', '000651']
+      start, end, ktype, autype, index, retry_count, pause:
+                  同get_k_data
+      max_workers : int, 默认 ct.MAX_WORKERS
+                  并发线程数
+      code_retries : int, 默认 1
+                  失败的代码在全部代码获取完之后重新获取的轮数
+      as_dict : bool, 默认 False
+                  True时返回{code: DataFrame}, 否则返回包含code列的长表
+    return
+    -------
+      (data, report)
+          data: DataFrame 所有代码的k线数据长表(as_dict=True时为dict)
+          report: DataFrame 以code为索引的获取报告
+              seconds 累计耗时(秒)，rows 行数，attempts 尝试次数，error 失败原因(成功时为空)
+    """
+    codes = list(pd.unique(pd.Series(list(codes), dtype=object)))
+    kwargs = dict(start=start, end=end, ktype=ktype, autype=autype,
+                  index=index, retry_count=retry_count, pause=pause,
+                  max_workers=1)
+    results = {}
+    report = dict((code, [0.0, 0, 0, None]) for code in codes)
+    pending = codes
+    for _ in range(code_retries + 1):
+        if len(pending) == 0:
+            break
+        rets = wk.run_tasks(lambda code: _get_k_data_timed(code, kwargs),
+                            pending, max_workers)
+        pending = []
+        for code, df, seconds, error in rets:
+            rep = report[code]
+            rep[0] += seconds
+            rep[2] += 1
+            rep[3] = error
+            if error is None:
+                if 'code' not in df.columns:
+                    df['code'] = code
+                rep[1] = len(df)
+                results[code] = df
+            else:
+                pending.append(code)
+    report = pd.DataFrame([report[code] for code in codes], index=codes,
+                          columns=['seconds', 'rows', 'attempts', 'error'])
+    report.index.name = 'code'
+    if as_dict:
+        return dict((code, results[code]) for code in codes if code in results), report
+    frames = [results[code] for code in codes if code in results]
+    if len(frames) == 0:
+        return pd.DataFrame(), report
+    return pd.concat(frames, ignore_index=True), report
+
+
+def _get_k_data_timed(code, kwargs):
+    t0 = time.time()
+    try:
+        df = get_k_data(code, **kwargs)
+        error = None if df is not None and len(df) > 0 else 'no data'
+    except Exception as e:
+        df, error = None, str(e) or e.__class__.__name__
+    return code, df, time.time() - t0, error
+
+
 def _random(n=13):
     from random import randint
     start = 10 ** (n - 1)
@@ -0,0 +1,76 @@
+# -*- coding:utf-8 -*-
+"""
+复权计算和get_h_data的前复权基准, 新浪复权页面由桩传输层返回
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from tushare.stock import adjust as fq
+from tushare.stock import trading as td
+from tushare.util import transport as tp
+
+# 2021-07-07除息, 每股派0.5元, 除息前收盘10.00: 后复权因子由1.0变为10/9.5
+FACTOR = 10 / 9.5
+DAYS = [('2021-07-05', 10.00, 1.0), ('2021-07-06', 10.20, 1.0),
+        ('2021-07-07', 9.60, FACTOR), ('2021-07-08', 9.70, FACTOR)]
+# 前复权: 除息日之前的价格乘以9.5/10, 之后不变
+QFQ_CLOSE = [9.70, 9.60, 9.69, 9.50]
+RAW_CLOSE = [9.70, 9.60, 10.20, 10.00]
+
+
+def fq_page():
+    rows = ''.join('<tr><td>%s</td>%s<td>1000</td><td>10000</td><td>%.6f</td></tr>' % (
+        day, '<td>%.4f</td>' % (close * factor) * 4, factor) for day, close, factor in DAYS[::-1])
+    return (u'<html><table id="FundHoldSharesTable"><tr><th>title</th></tr>'
+            u'<tr><td>日期</td><td>开盘价</td><td>最高价</td><td>收盘价</td><td>最低价</td>'
+            u'<td>交易量</td><td>交易金额</td><td>复权因子</td></tr>%s</table></html>' % rows).encode('GBK')
+
+
+class Stub(object):
+
+    def get(self, url, headers=None, timeout=None):
+        if 'year=2021&jidu=3' in url:
+            return fq_page()
+        return b'<html></html>'
+
+
+@pytest.fixture(autouse=True)
+def stub():
+    fq.clear_factors()
+    old = tp.set_transport(Stub())
+    yield
+    tp.set_transport(old)
+    fq.clear_factors()
+
+
+def h_data(autype, **kwargs):
+    return td.get_h_data('600000', '2021-07-01', '2021-07-31', autype, pause=0, **kwargs)
+
+
+def test_qfq_uses_page_factors():
+    df = h_data('qfq')
+    assert list(df.index.strftime('%Y-%m-%d')) == [d[0] for d in DAYS[::-1]]
+    assert list(df['close']) == QFQ_CLOSE
+    assert list(df['open']) == QFQ_CLOSE
+
+
+def test_qfq_asof_before_ex_date():
+    df = h_data('qfq', asof='2021-07-06')
+    assert list(df['close']) == [round(c * FACTOR, 2) for c in QFQ_CLOSE[:2]] + [10.20, 10.00]
+
+
+def test_hfq_and_raw():
+    np.testing.assert_allclose(h_data('hfq')['close'], [round(c * f, 2) for _, c, f in DAYS[::-1]])
+    assert list(h_data(None)['close']) == RAW_CLOSE
+
+
+def test_factor_at_and_merge():
+    fq.update_factors('x', pd.DataFrame({'date': ['2021-01-04', '2021-06-01'], 'factor': [1.0, 1.2]}))
+    factors = fq.update_factors('x', pd.DataFrame({'date': ['2021-06-01', '2021-09-01'],
+                                                   'factor': [1.25, 1.5]}))
+    assert list(factors) == [1.0, 1.25, 1.5]
+    assert list(fq.factor_at(factors, ['2020-01-01', '2021-06-01', '2021-08-01', '2022-01-01'])) == \
+        [1.0, 1.25, 1.25, 1.5]
@@ -0,0 +1,78 @@
+# -*- coding:utf-8 -*-
+"""
+tushare.aio: 异步请求的重试和熔断, 以及异步接口与同步接口共用的解析; 网络请求由假的_request代替
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import asyncio
+import pytest
+from tushare.stock import cons as ct
+from tushare.util import retry as rt
+from test_hqparse import quote
+
+pytest.importorskip('aiohttp')
+import tushare.aio as tsa
+from tushare.aio import client
+
+
+@pytest.fixture
+def responses(monkeypatch):
+    monkeypatch.setattr(ct, 'RETRY_BACKOFF', 0)
+    rt.breaker.reset()
+    replies = []
+    urls = []
+
+    async def request(url, headers=None, timeout=None):
+        urls.append(url)
+        reply = replies.pop(0) if len(replies) > 1 else replies[0]
+        if isinstance(reply, Exception):
+            raise reply
+        return reply(url) if callable(reply) else reply
+    monkeypatch.setattr(client, '_request', request)
+    yield replies, urls
+    rt.breaker.reset()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_fetch_retries_network_errors(responses):
+    replies, urls = responses
+    replies.extend([IOError('reset'), IOError('reset'), b'ok'])
+    assert run(client.fetch('http://x.example.com/', retry_count=3, pause=0)) == b'ok'
+    assert len(urls) == 3
+
+
+def test_fetch_raises_last_error(responses):
+    replies, urls = responses
+    replies.append(IOError('down'))
+    with pytest.raises(IOError, match='down'):
+        run(client.fetch('http://y.example.com/', retry_count=2, pause=0))
+    assert len(urls) == 2
+
+
+def test_fetch_does_not_retry_other_errors(responses):
+    replies, urls = responses
+    replies.append(ValueError('bad'))
+    with pytest.raises(ValueError):
+        run(client.fetch('http://z.example.com/', retry_count=3, pause=0))
+    assert len(urls) == 1
+
+
+def test_realtime_quotes_concurrently(responses):
+    replies, _ = responses
+    replies.append(lambda url: quote('sh' + url.split('list=sh')[1].rstrip(',')).encode('GBK'))
+
+    async def main():
+        return await asyncio.gather(*[tsa.get_realtime_quotes(code) for code in ['600000', '600016']])
+    frames = run(main())
+    assert [list(df['code']) for df in frames] == [['600000'], ['600016']]
+
+
+def test_today_ticks_without_pages(responses):
+    replies, _ = responses
+    replies.append(b"({detailPages:[]})")
+    df = run(tsa.get_today_ticks('600000'))
+    assert len(df) == 0 and list(df.columns) == ct.TODAY_TICK_COLUMNS
@@ -0,0 +1,100 @@
+# -*- coding:utf-8 -*-
+"""
+util.cache 的读写, 过期, 开关和LRU淘汰
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import os
+import time
+import pandas as pd
+import pytest
+from tushare.stock import cons as ct
+from tushare.util import cache
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(ct, 'CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(ct, 'USE_CACHE', True)
+    cache._usage.clear()
+    return tmp_path
+
+
+def files(root):
+    return [f for _, _, fs in os.walk(str(root)) for f in fs]
+
+
+def frame():
+    return pd.DataFrame({'a': [1.5, 2.5], 'b': ['x', 'y']}, index=['2021-12-31', '2020-12-31'])
+
+
+def test_put_get_roundtrip():
+    cache.put('k', frame(), 'ns')
+    pd.testing.assert_frame_equal(cache.get('k', 'ns'), frame())
+    assert cache.get('other', 'ns') is None
+
+
+def test_fetch_hits_cache():
+    calls = []
+
+    def func():
+        calls.append(1)
+        return frame()
+    cache.fetch('k', func, 'ns')
+    cache.fetch('k', func, 'ns')
+    assert len(calls) == 1
+    cache.fetch('k', func, 'ns', update=True)
+    assert len(calls) == 2
+
+
+def test_expired_entry_is_a_miss():
+    cache.put('k', frame(), 'ns')
+    assert cache.get('k', 'ns', ttl=-1) is None
+
+
+def test_use_cache_false_writes_nothing(cache_dir, monkeypatch):
+    monkeypatch.setattr(ct, 'USE_CACHE', False)
+    df = cache.fetch('k', frame, 'ns')
+    pd.testing.assert_frame_equal(df, frame())
+    assert files(cache_dir) == []
+
+
+def test_evict_skips_temp_files(cache_dir, monkeypatch):
+    folder = cache_dir / 'ns'
+    folder.mkdir()
+    tmp = folder / 'writing.tmp'
+    tmp.write_bytes(b'x' * 100)
+    cache.put('k', frame(), 'ns')
+    monkeypatch.setattr(ct, 'CACHE_MAX_BYTES', 1)
+    cache._usage.clear()
+    cache._evict(cache.cache_root())
+    assert files(cache_dir) == ['writing.tmp']
+
+
+def test_legacy_csv_is_converted(cache_dir):
+    url = 'http://money.finance.sina.com.cn/corp/go.php/vFD_BalanceSheet/stockid/600000/ctrl/2020.phtml'
+    legacy = cache_dir / url.replace('/', '')
+    frame().to_csv(str(legacy))
+    written = int(time.time()) - 100
+    os.utime(str(legacy), (written, written))
+    df = cache.fetch(url, lambda: None, 'ns', ttl=3600)
+    pd.testing.assert_frame_equal(df, frame())
+    assert not legacy.exists()
+    path, st = cache._find(cache._key_path(url, 'ns'))
+    assert st.st_mtime == written
+    assert cache.fetch(url, lambda: None, 'ns', ttl=60) is None
+
+
+def test_legacy_parts_and_transform(cache_dir):
+    url = 'https://quotes.wsj.com/HK/0700/financials/annual/cash-flow'
+    for suffix, scale in [('2', 1), ('21', 2), ('22', 3)]:
+        (frame().assign(a=lambda d: d['a'] * scale)).to_csv(str(cache_dir / (url.replace('/', '') + suffix)))
+    cache.register_csv_transform('legacy_ns', lambda df: df.assign(c=1))
+    try:
+        parts = cache.fetch(url, lambda: None, 'legacy_ns', parts=3, legacy=('2', '21', '22'))
+    finally:
+        cache._csv_transforms.pop('legacy_ns')
+    assert [list(df['a']) for df in parts] == [[1.5, 2.5], [3.0, 5.0], [4.5, 7.5]]
+    assert all(list(df['c']) == [1, 1] for df in parts)
+    assert files(cache_dir) and not any(f.startswith('https') for f in files(cache_dir))
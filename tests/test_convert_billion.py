@@ -0,0 +1,61 @@
+# -*- coding:utf-8 -*-
+"""
+__convert_billion_dataframe 与原来逐个单元格转换的实现对比
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import numpy as np
+import pandas as pd
+from tushare.stock import trading as td
+
+convert = getattr(td, '__convert_billion_dataframe')
+
+
+def convert_loop(df):
+    """
+    原来的实现(逐行逐列find单位), 仅把bytes换成str以便在python3中运行
+    """
+    arr1 = []
+    for i in range(df.shape[0]):
+        arr0 = []
+        for col in df.columns:
+            cell = str(df.iloc[i][col])
+            pos0 = cell.find(u'亿')
+            pos1 = cell.find(u'万')
+            if pos0 > 0:
+                mult = 10 ** 8
+                num = cell[:pos0]
+            elif pos1 > 0:
+                mult = 10 ** 4
+                num = cell[:pos1]
+            else:
+                mult = 1
+                num = cell
+            arr0.append(float(num) * mult)
+        arr1.append(arr0)
+    return pd.DataFrame(data=arr1, columns=df.columns)
+
+
+def random_frame(rng, rows, cols):
+    units = [u'', u'亿', u'万', u'亿万']
+    values = rng.uniform(-1e4, 1e4, size=(rows, cols)).round(rng.integers(0, 4))
+    cells = [[u'%s%s' % (v, units[rng.integers(len(units))]) for v in row] for row in values]
+    return pd.DataFrame(cells, columns=['c%d' % i for i in range(cols)],
+                        index=rng.permutation(rows))
+
+
+def test_matches_loop_on_random_frames():
+    rng = np.random.default_rng(20261018)
+    for _ in range(200):
+        df = random_frame(rng, int(rng.integers(1, 20)), int(rng.integers(1, 8)))
+        pd.testing.assert_frame_equal(convert(df), convert_loop(df))
+
+
+def test_plain_numbers_and_input_untouched():
+    df = pd.DataFrame({'a': [u'1.5亿', u'2万'], 'b': [3, u'4.25']})
+    before = df.copy()
+    res = convert(df)
+    assert res['a'].tolist() == [1.5e8, 2e4]
+    assert res['b'].tolist() == [3.0, 4.25]
+    pd.testing.assert_frame_equal(df, before)
@@ -0,0 +1,66 @@
+# -*- coding:utf-8 -*-
+"""
+TradeCalendar 交易日查询: 单个日期与日期数组, 日历范围之外和没有日历数据时按工作日处理
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from tushare.util import dateu as du
+
+
+@pytest.fixture
+def cal():
+    # 2022年国庆: 10-01至10-07休市, 10-08, 10-09为周末
+    dates = pd.date_range('2022-09-26', '2022-10-14')
+    closed = (dates.weekday >= 5) | ((dates >= '2022-10-01') & (dates <= '2022-10-07'))
+    df = pd.DataFrame({'calendarDate': dates.strftime('%Y-%m-%d'),
+                       'isOpen': np.where(closed, 0, 1)})
+    return du.TradeCalendar(df)
+
+
+def test_is_trading_day(cal):
+    assert cal.is_trading_day('2022-09-30')
+    assert not cal.is_trading_day('2022-10-05')
+    assert not cal.is_trading_day('2022-10-08')
+    assert cal.is_trading_day('20221010')
+    assert cal.is_trading_day(pd.Timestamp('2022-10-10'))
+    assert list(cal.is_trading_day(['2022-10-07', '2022-10-10'])) == [False, True]
+    # 日历范围之外按周一至周五处理
+    assert cal.is_trading_day('2023-01-04')
+    assert not cal.is_trading_day('2023-01-07')
+
+
+def test_next_prev(cal):
+    assert cal.next_trading_day('2022-09-30') == '2022-10-10'
+    assert cal.prev_trading_day('2022-10-10') == '2022-09-30'
+    assert cal.next_trading_day('2022-10-05') == '2022-10-10'
+    assert cal.prev_trading_day('2022-09-26') is None
+    assert cal.next_trading_day('2022-10-14') is None
+    res = cal.next_trading_day(np.array(['2022-09-29', '2022-10-14'], dtype='datetime64[D]'))
+    assert str(res[0]) == '2022-09-30' and np.isnat(res[1])
+
+
+def test_shift_and_between(cal):
+    assert cal.shift('2022-09-30', 1) == '2022-10-10'
+    assert cal.shift('2022-10-05', 0) == '2022-09-30'
+    assert cal.shift('2022-10-10', -5) == '2022-09-26'
+    assert cal.shift('2022-10-10', 10) is None
+    assert list(cal.shift(['2022-09-26', '2022-10-08'], 2).astype(str)) == \
+        ['2022-09-28', '2022-10-11']
+    assert cal.trading_days_between('2022-09-26', '2022-10-14') == 10
+    assert cal.trading_days_between('2022-10-01', '2022-10-09') == 0
+    assert list(cal.trading_days_between(['2022-09-30', '2022-10-14'],
+                                         ['2022-10-10', '2022-09-26'])) == [2, 0]
+    assert list(cal.trading_days('2022-09-29', '2022-10-11').astype(str)) == \
+        ['2022-09-29', '2022-09-30', '2022-10-10', '2022-10-11']
+
+
+def test_weekday_fallback():
+    cal = du.TradeCalendar(pd.DataFrame(columns=['calendarDate', 'isOpen']))
+    assert cal.is_trading_day('2022-10-05')
+    assert not cal.is_trading_day('2022-10-08')
+    assert cal.next_trading_day('2022-10-07') == '2022-10-10'
+    assert cal.trading_days_between('2022-10-01', '2022-10-31') == 21
@@ -0,0 +1,74 @@
+# -*- coding:utf-8 -*-
+"""
+get_fundamental_panel 基本面面板: 按需获取报表, 重名列加后缀, 按代码合并, 整个面板缓存
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import os
+import pandas as pd
+import pytest
+from tushare.stock import cons as ct
+from tushare.stock import fundamental as fd
+from tushare.util import cache
+
+CODES = {'report': ['600000', '000001'], 'profit': ['600000']}
+
+
+@pytest.fixture
+def calls(tmp_path, monkeypatch):
+    monkeypatch.setattr(ct, 'CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(ct, 'USE_CACHE', True)
+    cache._usage.clear()
+    calls = []
+
+    def fake(kind, year, quarter, update=False):
+        calls.append(kind)
+        cols = fd._FD_PAGES[kind][1]
+        codes = CODES.get(kind, ['000001'])
+        data = dict((c, [float(i + 1)] * len(codes)) for i, c in enumerate(cols))
+        data['code'] = codes
+        data['name'] = ['n' + c for c in codes]
+        return pd.DataFrame(data, columns=cols)
+
+    monkeypatch.setattr(fd, '_fd_quarter', fake)
+    return calls
+
+
+def test_full_panel(calls):
+    df = fd.get_fundamental_panel(2021, 4)
+    assert sorted(calls) == sorted(fd._PANEL_KINDS)
+    assert list(df['code']) == ['000001', '600000']
+    assert list(df['name']) == ['n000001', 'n600000']
+    for col in ['roe', 'roe_profit', 'eps', 'eps_profit', 'net_profits_profit', 'mbrg', 'cf_nm']:
+        assert col in df.columns
+    assert df['roe'].tolist() == [6.0, 6.0]
+    assert pd.isna(df['roe_profit'][0]) and df['roe_profit'][1] == 3.0
+    # 第二次直接读取缓存的面板
+    del calls[:]
+    pd.testing.assert_frame_equal(fd.get_fundamental_panel(2021, 4), df)
+    assert calls == []
+
+
+def test_fields(calls):
+    df = fd.get_fundamental_panel(2021, 4, fields=['roe'])
+    assert sorted(calls) == ['profit', 'report']
+    assert list(df.columns) == ['code', 'name', 'roe', 'roe_profit']
+    del calls[:]
+    df = fd.get_fundamental_panel(2021, 4, fields=['roe_profit', 'mbrg'])
+    assert sorted(calls) == ['growth', 'profit']
+    assert list(df.columns) == ['code', 'name', 'roe_profit', 'mbrg']
+    # 只取部分列的面板不写入缓存
+    assert cache.get('fundamental_panel/2021/4', 'fundamental_panel') is None
+
+
+def test_use_cache_off(calls, tmp_path, monkeypatch):
+    monkeypatch.setattr(ct, 'USE_CACHE', False)
+    assert len(fd.get_fundamental_panel(2021, 4)) == 2
+    assert [f for _, _, fs in os.walk(str(tmp_path)) for f in fs] == []
+
+
+def test_panels(calls):
+    df = fd.get_fundamental_panels([(2021, 4), (2022, 1)], fields=['eps'])
+    assert list(df.columns[:4]) == ['year', 'quarter', 'code', 'name']
+    assert df[['year', 'quarter']].drop_duplicates().values.tolist() == [[2021, 4], [2022, 1]]
@@ -0,0 +1,71 @@
+# -*- coding:utf-8 -*-
+"""
+growth 同比/环比/TTM: 单层报告期索引与(code, 报告期)索引, 缺失对比期和对比期为0
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import numpy as np
+import pandas as pd
+from tushare.stock import growth as gr
+
+PERIODS = ['2021-03-31', '2021-06-30', '2021-09-30', '2021-12-31',
+           '2022-03-31', '2022-06-30', '2022-09-30', '2022-12-31']
+# 年初至今的累计利润
+PROFIT = [10.0, 30.0, 60.0, 100.0, 20.0, 50.0, 90.0, 140.0]
+
+
+def single():
+    return pd.DataFrame({'profit': PROFIT}, index=PERIODS)
+
+
+def panel():
+    a = single().iloc[::-1]
+    b = pd.DataFrame({'profit': [0.0, 5.0]}, index=['2021-06-30', '2022-06-30'])
+    return pd.concat([a, b], keys=['600000', '000001'])
+
+
+def test_yoy():
+    res = gr.yoy(single())
+    assert list(res.columns) == ['profit_yoy']
+    assert res['profit_yoy'].iloc[:4].isnull().all()
+    np.testing.assert_allclose(res['profit_yoy'].iloc[4:], [100.0, 100 * 50 / 30. - 100, 50.0, 40.0])
+
+
+def test_panel_rows_stay_aligned():
+    df = panel()
+    res = gr.yoy(df)
+    assert res.index.equals(df.index)
+    assert np.isclose(res.loc[('600000', '2022-12-31'), 'profit_yoy'], 40.0)
+    # 上年同期为0时为NaN, 与另一只股票的同一报告期不混淆
+    assert np.isnan(res.loc[('000001', '2022-06-30'), 'profit_yoy'])
+    assert np.isnan(res.loc[('000001', '2021-06-30'), 'profit_yoy'])
+
+
+def test_single_quarter_and_qoq():
+    sq = gr.single_quarter(single())
+    assert list(sq['profit']) == [10.0, 20.0, 30.0, 40.0, 20.0, 30.0, 40.0, 50.0]
+    res = gr.qoq(single(), cumulative=True)
+    np.testing.assert_allclose(res['profit_qoq'].iloc[1:], [100.0, 50.0, 100 / 3., -50.0, 50.0,
+                                                       100 / 3., 25.0])
+    assert np.isnan(res['profit_qoq'].iloc[0])
+    assert gr.qoq(single())['profit_qoq'].iloc[4] == -80.0
+
+
+def test_ttm():
+    res = gr.ttm(single())
+    assert list(res.columns) == ['profit_ttm']
+    assert res['profit_ttm'].iloc[:3].isnull().all()
+    assert list(res['profit_ttm'].iloc[3:]) == [100.0, 110.0, 120.0, 130.0, 140.0]
+    res = gr.ttm(panel())
+    assert res.loc[('600000', '2022-09-30'), 'profit_ttm'] == 130.0
+    yoy = gr.ttm_yoy(single())
+    assert list(yoy.columns) == ['profit_ttm_yoy']
+    assert np.isclose(yoy['profit_ttm_yoy'].iloc[-1], 40.0)
+    assert yoy['profit_ttm_yoy'].iloc[:7].isnull().all()
+
+
+def test_text_values():
+    df = pd.DataFrame({'profit': ['10', '--'], 'name': ['a', 'b']}, index=['2021-03-31', '2022-03-31'])
+    res = gr.yoy(df, ['profit'])
+    assert list(res.columns) == ['profit_yoy'] and res['profit_yoy'].isnull().all()
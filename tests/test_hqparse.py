@@ -0,0 +1,47 @@
+# -*- coding:utf-8 -*-
+"""
+hqparse.read_hq / read_quotes 对sinajs实时行情文本的解析
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import numpy as np
+from tushare.stock import trading as td
+from tushare.util import hqparse as hq
+
+
+def quote(symbol, name=u'浦发银行', price=10.0):
+    fields = [name] + ['%.2f' % (price + k * 0.01) for k in range(7)]
+    fields += ['123400', '%.2f' % (price * 123400)]
+    fields += ['%d' % (100 * (k + 1)) if k % 2 == 0 else '%.2f' % price for k in range(20)]
+    fields += ['2026-10-16', '15:00:00', '00']
+    return u'var hq_str_%s="%s";' % (symbol, ','.join(fields))
+
+
+def test_read_quotes_types():
+    df = hq.read_quotes((quote('sh600000') + '\n' + quote('sz000001', u'平安银行', 12.0)).encode('GBK'))
+    assert list(df['symbol']) == ['sh600000', 'sz000001']
+    assert list(df['name']) == [u'浦发银行', u'平安银行']
+    assert df['price'].dtype == np.float64 and df['price'][1] == 12.02
+    assert df['volume'][0] == 123400 and df['b1_v'][0] == 1
+
+
+def test_all_empty_payload():
+    text = b'var hq_str_sh600000="";\nvar hq_str_sz000002="";'
+    assert len(hq.read_quotes(text)) == 0
+    assert td._parse_realtime_quotes(text) is None
+
+
+def test_empty_and_partial_rows():
+    text = u'var hq_str_sh600001="";\nvar hq_str_sh600002="停牌,1.5";\n' + quote('sh600000')
+    df = hq.read_quotes(text.encode('GBK'))
+    assert list(df['symbol']) == ['sh600002', 'sh600000']
+    assert df['open'][0] == 1.5 and np.isnan(df['price'][0])
+    assert df['volume'][0] == 0
+
+
+def test_read_hq_without_names():
+    df = hq.read_hq(u'var hq_str_gb_aapl="Apple,1.5,x";\nvar hq_str_gb_none="";')
+    assert list(df['symbol']) == ['gb_aapl', 'gb_none']
+    assert list(df.columns) == ['symbol', 0, 1, 2]
+    assert df[1][0] == '1.5' and df[0].isna()[1]
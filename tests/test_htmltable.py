@@ -0,0 +1,65 @@
+# -*- coding:utf-8 -*-
+"""
+htmltable 从lxml树直接提取表格: 合并单元格, 千分位, 百分号, 空值和类型推断
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+from io import StringIO
+import lxml.html
+import numpy as np
+import pandas as pd
+from tushare.util import htmltable as ht
+
+
+def table(html):
+    return lxml.html.parse(StringIO(u'<html><body>%s</body></html>' % html)).xpath('//table')[0]
+
+
+def test_spans_are_expanded():
+    t = table(u'<table><tr><th colspan="2">期间</th><th rowspan="2">x</th></tr>'
+              u'<tr><td>a</td><td>b</td></tr><tr><td>1</td><td>2</td><td>3</td></tr></table>')
+    assert ht.table_rows(t) == [[u'期间', u'期间', 'x'], ['a', 'b', 'x'], ['1', '2', '3']]
+    assert ht.table_rows(t, skiprows=2) == [['1', '2', '3']]
+
+
+def test_thead_tbody_and_nested_text():
+    t = table(u'<table><thead><tr><th>h</th></tr></thead>'
+              u'<tbody><tr><td><a href="#">600000</a> <span>x</span></td></tr></tbody></table>')
+    assert ht.table_rows(t) == [['h'], ['600000 x']]
+
+
+def test_column_types():
+    df = ht.frame([['600000', u'浦发', '1,234.5', '12.5%', '--'],
+                   ['000001', u'平安', '20', '-3%', '7']],
+                  ['code', 'name', 'amount', 'pct', 'n'], percent=['pct'])
+    assert df['code'].dtype == np.int64 and list(df['code']) == [600000, 1]
+    assert list(df['name']) == [u'浦发', u'平安']
+    assert list(df['amount']) == [1234.5, 20.0]
+    assert list(df['pct']) == [12.5, -3.0]
+    assert np.isnan(df['n'][0]) and df['n'][1] == 7
+
+
+def test_ragged_rows_drop_and_empty():
+    df = ht.frame([['a', '1', 'x'], ['b']], ['k', 'v'], drop=[2])
+    assert list(df['k']) == ['a', 'b']
+    assert df['v'][0] == 1 and np.isnan(df['v'][1])
+    empty = ht.frame([], ['a', 'b'])
+    assert list(empty.columns) == ['a', 'b'] and len(empty) == 0
+
+
+def test_to_numeric():
+    assert list(ht.to_numeric(['1', '2'])) == [1, 2]
+    assert list(ht.to_numeric(['1.5', 'N/A'])[:1]) == [1.5]
+    assert ht.to_numeric(['--', '']).isnull().all()
+    mixed = ht.to_numeric(['1', 'abc', '--'])
+    assert mixed[1] == 'abc' and pd.isna(mixed[2])
+
+
+def test_matches_read_html():
+    rows = ''.join(u'<tr><td>%d</td><td>name%d</td><td>%.2f</td><td>%d</td></tr>' % (i, i, i * 1.25, i * 7)
+                   for i in range(30))
+    html = u'<table><tr><th>a</th><th>b</th><th>c</th><th>d</th></tr>%s</table>' % rows
+    expected = pd.read_html(StringIO(html))[0]
+    got = ht.read_table(table(html), ['a', 'b', 'c', 'd'], skiprows=1)
+    pd.testing.assert_frame_equal(got, expected, check_dtype=False)
@@ -0,0 +1,51 @@
+# -*- coding:utf-8 -*-
+"""
+import tushare 不导入pandas/lxml, 不访问网络, 并且足够快
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import json
+import os
+import subprocess
+import sys
+
+IMPORT_BUDGET = 0.5
+
+SCRIPT = '''
+import json, socket, sys, time
+calls = []
+def block(name):
+    def fail(*args, **kwargs):
+        calls.append(name)
+        raise OSError('network access during import')
+    return fail
+socket.socket.connect = block('connect')
+socket.create_connection = block('create_connection')
+socket.getaddrinfo = block('getaddrinfo')
+start = time.perf_counter()
+import tushare
+elapsed = time.perf_counter() - start
+print(json.dumps({'elapsed': elapsed, 'calls': calls,
+                  'modules': [m for m in ('pandas', 'lxml', 'numpy', 'requests')
+                              if m in sys.modules]}))
+'''
+
+
+def _import_in_subprocess():
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in sys.path if p))
+    out = subprocess.check_output([sys.executable, '-c', SCRIPT], env=env)
+    return json.loads(out.decode('utf-8').strip().splitlines()[-1])
+
+
+def test_import_is_lazy_and_offline():
+    res = _import_in_subprocess()
+    assert res['calls'] == []
+    assert 'pandas' not in res['modules']
+    assert 'lxml' not in res['modules']
+
+
+def test_import_time_budget():
+    # 取多次中最快的一次, 避免机器偶尔繁忙造成误报
+    elapsed = min(_import_in_subprocess()['elapsed'] for _ in range(3))
+    assert elapsed < IMPORT_BUDGET, 'import tushare took %.3fs' % elapsed
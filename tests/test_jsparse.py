@@ -0,0 +1,23 @@
+# -*- coding:utf-8 -*-
+"""
+jsparse.loads 对JavaScript对象字面量的解析
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+from tushare.util import jsparse
+
+
+def test_number_keys():
+    assert jsparse.loads('{1:2}') == {'1': 2}
+    assert jsparse.loads('{a:1, 2 : [3, 4], 5:{6:null}}') == {'a': 1, '2': [3, 4], '5': {'6': None}}
+
+
+def test_numbers_in_arrays_and_strings_untouched():
+    assert jsparse.loads('[1,2,{3:4}]') == [1, 2, {'3': 4}]
+    assert jsparse.loads('{"x":"a,1:b"}') == {'x': 'a,1:b'}
+
+
+def test_js_literal_features():
+    text = u"({symbol:'sh600000', name:'浦发银行', v:undefined, t:true,});"
+    assert jsparse.loads(text) == {'symbol': 'sh600000', 'name': u'浦发银行', 'v': None, 't': True}
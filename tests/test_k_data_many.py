@@ -0,0 +1,44 @@
+# -*- coding:utf-8 -*-
+"""
+get_k_data_many: 并发获取, 失败代码的重试轮次和获取报告
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import pandas as pd
+from tushare.stock import trading as td
+
+
+def fake_k_data(failures):
+    calls = []
+
+    def get_k_data(code, **kwargs):
+        calls.append(code)
+        if failures.get(code, 0) > 0:
+            failures[code] -= 1
+            raise IOError('timeout')
+        if code == '000002':
+            return None
+        return pd.DataFrame({'date': ['2021-01-04', '2021-01-05'], 'close': [1.0, 2.0]})
+    return get_k_data, calls
+
+
+def test_long_frame_and_report(monkeypatch):
+    get_k_data, calls = fake_k_data({'000001': 1})
+    monkeypatch.setattr(td, 'get_k_data', get_k_data)
+    df, report = td.get_k_data_many(['600848', '000001', '000002', '600848'], max_workers=3)
+    assert sorted(calls) == ['000001', '000001', '000002', '000002', '600848']
+    assert list(df['code']) == ['600848', '600848', '000001', '000001']
+    assert list(report.index) == ['600848', '000001', '000002']
+    assert list(report['attempts']) == [1, 2, 2]
+    assert list(report['rows']) == [2, 2, 0]
+    assert list(report['error'].isna()) == [True, True, False]
+    assert report.loc['000002', 'error'] == 'no data'
+
+
+def test_as_dict_and_no_retries(monkeypatch):
+    get_k_data, _ = fake_k_data({'000001': 1})
+    monkeypatch.setattr(td, 'get_k_data', get_k_data)
+    data, report = td.get_k_data_many(['600848', '000001'], code_retries=0, as_dict=True)
+    assert list(data) == ['600848']
+    assert report.loc['000001', 'error'] == 'timeout'
@@ -0,0 +1,67 @@
+# -*- coding:utf-8 -*-
+"""
+OrderBook 五档盘口快照的原地更新和查询
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import numpy as np
+import pandas as pd
+from tushare.stock.orderbook import OrderBook
+from tushare.util import hqparse as hq
+from test_hqparse import quote
+
+
+def quotes(rows):
+    """
+    rows: [(code, price, pre_close, bid1, ask1, bid_volume, ask_volume)]
+    """
+    data = []
+    for code, price, pre, bid, ask, bv, av in rows:
+        row = {'code': code, 'price': price, 'pre_close': pre, 'open': pre, 'high': price,
+               'low': price, 'volume': 1000, 'amount': price * 1000, 'time': '10:00:00'}
+        for i in range(1, 6):
+            row['b%d_p' % i] = bid - (i - 1) * 0.01
+            row['a%d_p' % i] = ask + (i - 1) * 0.01
+            row['b%d_v' % i] = bv
+            row['a%d_v' % i] = av
+        data.append(row)
+    return pd.DataFrame(data)
+
+
+def test_update_in_place_and_append_codes():
+    book = OrderBook(['600000'])
+    book.update(quotes([('600000', 10.0, 9.0, 9.99, 10.01, 30, 10)]))
+    book.update(quotes([('000001', 20.0, 20.0, 19.98, 20.02, 10, 10),
+                        ('600000', 10.5, 9.0, 10.49, 10.51, 10, 30)]))
+    assert list(book.codes) == ['600000', '000001']
+    assert book.get('600000')['price'] == 10.5
+    np.testing.assert_allclose(book.spread(), [0.02, 0.04])
+    np.testing.assert_allclose(book.mid(), [10.5, 20.0])
+    np.testing.assert_allclose(book.imbalance(), [-0.5, 0.0])
+
+
+def test_empty_rows_are_nan():
+    book = OrderBook(['600000', '600001'])
+    book.update(quotes([('600000', 10.0, 9.0, 9.99, 10.01, 0, 0)]))
+    assert np.isnan(book.spread()[1]) and np.isnan(book.change()[1])
+    assert np.isnan(book.imbalance()[0])
+
+
+def test_top_movers():
+    book = OrderBook()
+    book.update(quotes([('a', 11.0, 10.0, 0, 0, 0, 0), ('b', 9.0, 10.0, 0, 0, 0, 0),
+                        ('c', 10.5, 10.0, 0, 0, 0, 0), ('d', 0.0, 10.0, 0, 0, 0, 0)]))
+    up = book.top_movers(2)
+    assert list(up.index) == ['a', 'c']
+    np.testing.assert_allclose(up, [10.0, 5.0])
+    assert list(book.top_movers(1, ascending=True).index) == ['b']
+    assert len(book.top_movers(10)) == 3
+
+
+def test_update_from_read_quotes():
+    book = OrderBook()
+    book.update(hq.read_quotes(quote('sh600000').encode('GBK')))
+    frame = book.to_frame()
+    assert list(frame['code']) == ['600000']
+    assert frame['price'][0] == 10.02 and frame['b1_v'][0] == 1 and frame['a1_v'][0] == 11
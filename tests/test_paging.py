@@ -0,0 +1,107 @@
+# -*- coding:utf-8 -*-
+"""
+分页抓取: paging.iter_pages/collect_pages, 以及龙虎榜统计cap_tops经桩传输层的多页获取和中途失败
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import re
+import pandas as pd
+import pytest
+from tushare.stock import billboard as bb
+from tushare.util import paging as pg
+from tushare.util import transport as tp
+
+ROWS = 4
+
+
+def lhb_page(page, pages):
+    rows = ''.join(u'<tr><td>%d</td><td>股票%d</td><td>%d</td><td>1,200.5</td><td>800</td>'
+                   u'<td>400.5</td><td>3</td><td>2</td></tr>' % (i, i, i % 5 + 1)
+                   for i in range((page - 1) * ROWS, page * ROWS))
+    pager = u'<div class="pages"><a onclick="set_page_num(\'%d\')">下一页</a></div>' % (page + 1) \
+        if page < pages else u''
+    return (u'<html><table id="dataTable"><thead><tr><td>代码</td></tr></thead>%s</table>%s</html>'
+            % (rows, pager)).encode('GBK')
+
+
+class Stub(object):
+
+    def __init__(self, pages, fail=None):
+        self.pages = pages
+        self.fail = fail
+        self.requested = []
+
+    def get(self, url, headers=None, timeout=None):
+        page = int(re.search(r'&p=(\d+)', url).group(1))
+        self.requested.append(page)
+        if page == self.fail:
+            raise IOError('page %d down' % page)
+        return lhb_page(page, self.pages)
+
+
+@pytest.fixture
+def transport():
+    old = []
+
+    def install(stub):
+        old.append(tp.set_transport(stub))
+        return stub
+    yield install
+    if old:
+        tp.set_transport(old[0])
+
+
+def test_cap_tops_collects_every_page(transport):
+    stub = transport(Stub(pages=3))
+    df = bb.cap_tops(5, retry_count=1, pause=0)
+    assert stub.requested == [1, 2, 3]
+    assert len(df) == 3 * ROWS
+    assert list(df['code'][:2]) == ['000000', '000001']
+    assert df['bamount'][0] == 1200.5 and df['count'][4] == 5
+
+
+def test_cap_tops_page_failure_raises(transport):
+    stub = transport(Stub(pages=3, fail=2))
+    with pytest.raises(IOError):
+        bb.cap_tops(5, retry_count=2, pause=0)
+    assert stub.requested == [1, 2, 2]
+
+
+def test_iter_pages_stops_on_repeated_page():
+    pages = {1: ([1], 2), 2: ([2], 1)}
+    fetch = lambda p: (pd.DataFrame({'a': pages[p][0]}), pages[p][1])
+    assert list(pg.collect_pages(fetch)['a']) == [1, 2]
+
+
+def test_collect_pages_empty():
+    assert pg.collect_pages(lambda p: (None, None)) is None
+
+
+class ForecastStub(object):
+
+    def __init__(self, pages, fail=None):
+        self.pages = pages
+        self.fail = fail
+
+    def get(self, url, headers=None, timeout=None):
+        page = int(re.search(r'&p=(\d+)', url).group(1))
+        if page == self.fail:
+            raise IOError('page %d down' % page)
+        rows = ''.join(u'<tr><td>%d</td><td>股票%d</td><td>预增</td><td>2021-01-2%d</td><td>x</td>'
+                       u'<td>x</td><td>0.5%d</td><td>50%%~80%%</td><td>x</td></tr>' % (i, i, page, i)
+                       for i in range(page * 10, page * 10 + 3))
+        pager = u'<div class="pages"><a onclick="set_page_num(\'%d\')">下一页</a></div>' % (page + 1) \
+            if page < self.pages else u''
+        return (u'<html><table class="list_table">%s</table>%s</html>' % (rows, pager)).encode('GBK')
+
+
+def test_forecast_data_pages(transport):
+    from tushare.stock import reference as rf
+    transport(ForecastStub(pages=2))
+    df = rf.forecast_data(2020, 4)
+    assert list(df['code']) == ['000010', '000011', '000012', '000020', '000021', '000022']
+    assert list(df.columns) == ['code', 'name', 'type', 'report_date', 'pre_eps', 'range']
+    transport(ForecastStub(pages=3, fail=3))
+    with pytest.raises(IOError):
+        rf.forecast_data(2020, 4)
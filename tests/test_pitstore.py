@@ -0,0 +1,88 @@
+# -*- coding:utf-8 -*-
+"""
+pitstore 时点基本面存档: 披露日推断, 去重写入, 按当天已披露的数据查询
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import numpy as np
+import pandas as pd
+import pytest
+from tushare.stock import cons as ct
+from tushare.util import pitstore as pit
+
+
+@pytest.fixture(autouse=True)
+def pit_dir(monkeypatch, tmp_path):
+    monkeypatch.setattr(ct, 'PIT_DIR', str(tmp_path))
+
+
+def report(rows):
+    return pd.DataFrame(rows, columns=['code', 'eps', 'report_date'])
+
+
+def load():
+    # 2021年报3月20日披露, 2022一季报4月25日披露
+    pit.ingest('report', report([['600000', 1.0, '03-20'], ['1', 2.0, '04-10']]), year=2021, quarter=4)
+    pit.ingest('report', report([['600000', 0.3, '04-25']]), year=2022, quarter=1)
+
+
+def test_ingest_publish_dates():
+    load()
+    df = pit.read('report')
+    assert list(df.columns[:3]) == pit.KEYS
+    assert list(df['code']) == ['000001', '600000', '600000']
+    assert [str(d.date()) for d in df['publish']] == ['2022-04-10', '2022-03-20', '2022-04-25']
+    # 没有披露日期时取法定截止日, 中报为8月31日
+    pit.ingest('report', pd.DataFrame({'code': ['600000'], 'eps': [0.6]}), year=2022, quarter=2)
+    assert str(pit.read('report', '600000')['publish'].iloc[-1].date()) == '2022-08-31'
+    # 同一键重复写入以新数据为准
+    assert pit.ingest('report', report([['600000', 0.35, '2022-04-25']]), year=2022, quarter=1) == 4
+    assert pit.read('report', '600000')['eps'].tolist() == [1.0, 0.35, 0.6]
+
+
+def test_asof_lag():
+    load()
+    res = pit.asof('report', ['600000'] * 4 + ['000001', '600001'],
+                   ['2022-03-20', '2022-03-21', '2022-04-25', '2022-04-26', '2022-05-01', '2022-05-01'],
+                   ['eps'])
+    assert list(res.columns) == ['period', 'publish', 'eps']
+    assert np.isnan(res['eps'][0])
+    assert list(res['eps'][1:5]) == [1.0, 1.0, 0.3, 2.0]
+    assert np.isnan(res['eps'][5])
+    same_day = pit.asof('report', ['600000'], ['2022-03-20'], ['eps'], lag=0)
+    assert same_day['eps'][0] == 1.0
+
+
+def test_restatement_of_older_period():
+    load()
+    # 一季报之后更正年报: 更正的是更早的报告期, 不替换已可见的一季报
+    pit.ingest('report', report([['600000', 1.1, '2022-05-10']]), year=2021, quarter=4)
+    res = pit.asof('report', ['600000', '600000'], ['2022-04-01', '2022-06-01'], ['eps'])
+    assert list(res['eps']) == [1.0, 0.3]
+    # 同一报告期的更正替换之前的数据
+    pit.ingest('report', report([['600000', 0.32, '2022-05-20']]), year=2022, quarter=1)
+    assert pit.asof('report', ['600000'], ['2022-06-01'], ['eps'])['eps'][0] == 0.32
+
+
+def test_join_and_wide():
+    load()
+    days = pd.date_range('2022-04-08', '2022-04-27', freq='B')
+    panel = pd.DataFrame({'date': np.tile(days, 2),
+                          'code': ['600000'] * len(days) + ['000001'] * len(days),
+                          'close': 1.0})
+    joined = pit.asof_join('report', panel, ['eps'])
+    assert list(joined.columns) == ['date', 'code', 'close', 'eps']
+    wide = pit.asof_wide('report', days, ['600000', '000001'], 'eps')
+    assert wide.shape == (len(days), 2)
+    expected = wide.stack(future_stack=True).swaplevel().sort_index()
+    got = joined.set_index(['code', 'date'])['eps'].sort_index()
+    np.testing.assert_array_equal(got.to_numpy(), expected.to_numpy())
+    assert wide.loc['2022-04-11', '000001'] == 2.0 and np.isnan(wide.loc['2022-04-08', '000001'])
+    assert wide.loc['2022-04-26', '600000'] == 0.3 and wide.loc['2022-04-25', '600000'] == 1.0
+
+
+def test_missing_dataset():
+    assert pit.read('none') is None
+    assert pit.asof('none', ['600000'], ['2022-01-01'], ['eps'])['eps'].isnull().all()
+    assert pit.asof_wide('none', ['2022-01-04'], ['600000'], 'eps').isnull().all().all()
@@ -0,0 +1,55 @@
+# -*- coding:utf-8 -*-
+"""
+QuoteStream 的轮询和OrderBook快照, 行情由桩传输层返回
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import re
+import pytest
+from tushare.stock.quotes import QuoteStream
+from tushare.util import transport as tp
+from test_hqparse import quote
+
+
+class Stub(object):
+
+    def __init__(self, pages):
+        self.pages = pages
+
+    def get(self, url, headers=None, timeout=None):
+        symbols = re.search(r'list=(.*)$', url).group(1).split(',')
+        pages = [self.pages.get(s, u'var hq_str_%s="";' % s) for s in symbols if s]
+        return b'\n'.join(p if isinstance(p, bytes) else p.encode('GBK') for p in pages)
+
+
+@pytest.fixture
+def pages():
+    pages = {'sh600000': quote('sh600000')}
+    old = tp.set_transport(Stub(pages))
+    yield pages
+    tp.set_transport(old)
+
+
+def test_poll_returns_changed_rows(pages):
+    stream = QuoteStream(['600000', '000001'], chunk_size=1)
+    try:
+        df = stream.poll()
+        assert list(df['code']) == ['600000']
+        assert len(stream.poll()) == 0
+        pages['sh600000'] = quote('sh600000', price=11.0)
+        assert list(stream.poll()['price']) == [11.02]
+    finally:
+        stream.close()
+
+
+def test_bad_chunk_does_not_stop_stream(pages):
+    # 不是GBK编码, 解析失败
+    pages['sz000001'] = b'\xff\xff var hq_str_sz000001="x,1,2,3";'
+    pages['sz000002'] = u'var hq_str_sz000002="";'
+    stream = QuoteStream(['600000', '000001', '000002'], chunk_size=1)
+    try:
+        df = stream.poll()
+        assert list(df['code']) == ['600000']
+    finally:
+        stream.close()
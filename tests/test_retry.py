@@ -0,0 +1,97 @@
+# -*- coding:utf-8 -*-
+"""
+retry: 重试策略的退避, 可重试错误的判断, 总耗时上限和按域名熔断
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import socket
+import time
+import pytest
+from tushare.stock import cons as ct
+from tushare.util import retry as rt
+
+
+class StatusError(Exception):
+
+    def __init__(self, status):
+        Exception.__init__(self, status)
+        self.status = status
+
+
+def failing(errors, result='ok'):
+    calls = []
+
+    def func():
+        calls.append(1)
+        if len(calls) <= len(errors):
+            raise errors[len(calls) - 1]
+        return result
+    return func, calls
+
+
+def test_is_retryable():
+    assert rt.is_retryable(IOError('reset'))
+    assert rt.is_retryable(socket.timeout())
+    assert rt.is_retryable(StatusError(503)) and rt.is_retryable(StatusError(429))
+    assert not rt.is_retryable(StatusError(404))
+    assert not rt.is_retryable(ValueError('bad'))
+    assert not rt.is_retryable(rt.CircuitOpenError('open'))
+
+
+def test_call_retries_until_success():
+    func, calls = failing([IOError('a'), IOError('b')])
+    assert rt.RetryPolicy(3, backoff=0).call(func) == 'ok'
+    assert len(calls) == 3
+
+
+def test_call_raises_last_error():
+    func, calls = failing([IOError('a'), IOError('b'), IOError('c')])
+    with pytest.raises(IOError, match='c'):
+        rt.RetryPolicy(3, backoff=0).call(func)
+
+
+def test_call_does_not_retry_client_errors():
+    func, calls = failing([StatusError(404)])
+    with pytest.raises(StatusError):
+        rt.RetryPolicy(3, backoff=0).call(func)
+    assert len(calls) == 1
+
+
+def test_delay_is_exponential_and_capped():
+    policy = rt.RetryPolicy(10, backoff=1, max_backoff=5, jitter=0)
+    assert [policy.delay(i) for i in range(1, 6)] == [1, 2, 4, 5, 5]
+    jittered = rt.RetryPolicy(10, backoff=1, jitter=0.5).delay(2)
+    assert 1 <= jittered <= 2
+
+
+def test_deadline_stops_retrying():
+    policy = rt.RetryPolicy(5, backoff=10, jitter=0, deadline=1)
+    assert list(policy.attempts()) == [0]
+
+
+def test_attempts_stops_after_non_retryable_error(monkeypatch):
+    monkeypatch.setattr(ct, 'RETRY_BACKOFF', 0)
+    seen = []
+    for i in rt.attempts(3, 0):
+        seen.append(i)
+        rt.note_error(StatusError(403))
+    assert seen == [0]
+
+
+def test_circuit_breaker(monkeypatch):
+    monkeypatch.setattr(ct, 'CIRCUIT_THRESHOLD', 2)
+    monkeypatch.setattr(ct, 'CIRCUIT_RESET', 0.05)
+    breaker = rt.CircuitBreaker()
+    breaker.failure('h')
+    breaker.allow('h')
+    breaker.failure('h')
+    with pytest.raises(rt.CircuitOpenError):
+        breaker.allow('h')
+    breaker.allow('other')
+    time.sleep(0.06)
+    breaker.allow('h')
+    with pytest.raises(rt.CircuitOpenError):
+        breaker.allow('h')
+    breaker.success('h')
+    breaker.allow('h')
@@ -0,0 +1,58 @@
+# -*- coding:utf-8 -*-
+"""
+get_statement 多年新浪财报: 表格转置, 按年份并发获取后合并去重, 统一不同年份的科目名称
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+from io import StringIO
+import lxml.html
+import pandas as pd
+from tushare.stock import fundamental as fd
+from tushare.stock import trading as td
+
+
+def statement(periods, items):
+    return pd.DataFrame(items, index=periods)
+
+
+YEARS = {
+    2022: statement(['2022-06-30', '2022-03-31'],
+                    {u'资产总计': [30.0, 20.0], u'归属于母公司股东的权益': [3.0, 2.0]}),
+    # 年报出现在下一年的表中时重复, 合并后只保留一行
+    2021: statement(['2022-03-31', '2021-12-31', '2021-09-30'],
+                    {u'资产总计': [20.0, 10.0, 9.0], u'归属于母公司股东权益合计': [2.0, 1.0, 0.9]}),
+    2020: statement([], {}),
+}
+
+
+def test_merge_years(monkeypatch):
+    calls = []
+
+    def fake(code, kind, year, update=False):
+        calls.append((code, kind, year, update))
+        return YEARS.get(year)
+
+    monkeypatch.setattr(td, '_sina_statement', fake)
+    df = fd.get_statement('600000', 'balance', 2019, 2022, max_workers=2)
+    assert sorted(c[2] for c in calls) == [2019, 2020, 2021, 2022]
+    assert all(c[:2] == ('600000', 'balance') for c in calls)
+    assert list(df.index) == ['2022-06-30', '2022-03-31', '2021-12-31', '2021-09-30']
+    assert list(df['total_assets']) == [30.0, 20.0, 10.0, 9.0]
+    assert list(df['net_assets']) == [3.0, 2.0, 1.0, 0.9]
+
+
+def test_no_data(monkeypatch):
+    monkeypatch.setattr(td, '_sina_statement', lambda *args: None)
+    assert fd.get_statement('600000', 'income', 2020, 2021) is None
+
+
+def test_statement_frame():
+    html = (u'<table id="t"><tr><td>报表日期</td><td>2021-12-31</td><td>2021-09-30</td></tr>'
+            u'<tr><td>资产总计</td><td>1,000.5</td><td>900</td></tr>'
+            u'<tr><td>商誉</td><td>--</td><td>3</td></tr></table>')
+    table = lxml.html.parse(StringIO(html)).xpath('//table')[0]
+    df = td._statement_frame(table)
+    assert list(df.index) == ['2021-12-31', '2021-09-30']
+    assert list(df[u'资产总计']) == [1000.5, 900.0]
+    assert list(df[u'商誉']) == [0, 3]
@@ -0,0 +1,97 @@
+# -*- coding:utf-8 -*-
+"""
+tickstore 分笔存档的追加, 读取, 截断和索引, 以及get_tick_data下载一次后从存档读取
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import os
+import pandas as pd
+import pytest
+from tushare.stock import cons as ct
+from tushare.stock import trading as td
+from tushare.util import tickstore as tks
+from tushare.util import transport as tp
+
+DATE = '2021-07-05'
+
+
+@pytest.fixture(autouse=True)
+def tick_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(ct, 'TICK_DIR', str(tmp_path))
+    monkeypatch.setattr(ct, 'USE_CACHE', True)
+    return tmp_path
+
+
+def ticks(times, start=10.0):
+    return pd.DataFrame({'time': times,
+                         'price': [start + i * 0.01 for i in range(len(times))],
+                         'pchange': ['%.2f%%' % (i * 0.1) for i in range(len(times))],
+                         'change': ['--'] + [0.01] * (len(times) - 1),
+                         'volume': [100 * (i + 1) for i in range(len(times))],
+                         'amount': [1000.0 * (i + 1) for i in range(len(times))],
+                         'type': [u'买盘', u'卖盘', u'中性盘'][:len(times)]})
+
+
+def test_append_and_read():
+    assert tks.read('600000', DATE) is None
+    assert tks.append('600000', DATE, ticks(['09:30:00', '09:30:03'])) == 2
+    assert tks.append('600000', DATE, ticks(['09:30:06'], 11.0), complete=True) == 3
+    df = tks.read('600000', DATE)
+    assert list(df['time']) == ['09:30:00', '09:30:03', '09:30:06']
+    assert list(df['price']) == [10.0, 10.01, 11.0]
+    assert list(df['pchange']) == [0.0, 0.1, 0.0]
+    assert pd.isna(df['change'][0]) and df['change'][1] == 0.01
+    assert list(df['type']) == [u'买盘', u'卖盘', u'买盘']
+    meta = tks.info('600000', DATE)
+    assert meta['rows'] == 3 and meta['complete'] and meta['last_time'] == '09:30:06'
+
+
+def test_missing_columns_and_torn_write(tick_dir):
+    tks.append('600000', DATE, ticks(['09:30:00', '09:30:03']))
+    # 上次追加写了数据但没来得及更新meta.json
+    with open(os.path.join(str(tick_dir), DATE, '600000', 'price'), 'ab') as f:
+        f.write(b'\0' * 5)
+    tks.append('600000', DATE, ticks(['09:30:06']).drop(['pchange', 'type'], axis=1))
+    df = tks.read('600000', DATE, ['time', 'price', 'pchange', 'type'])
+    assert list(df['price']) == [10.0, 10.01, 10.0]
+    assert df['pchange'][2] == 0 and df['type'][2] == u'中性盘'
+
+
+def test_tail_count_index_delete():
+    tks.append('600000', DATE, ticks(['09:30:00', '09:30:03', '09:30:03']))
+    tks.append('000001', '2021-07-06', ticks(['09:30:00']), complete=True)
+    assert tks.tail_count('600000', DATE, '09:30:03') == 2
+    assert tks.tail_count('600000', DATE, '09:31:00') == 0
+    idx = tks.index()
+    assert idx.values.tolist() == [[DATE, '600000', 3, False], ['2021-07-06', '000001', 1, True]]
+    tks.delete('600000', DATE)
+    assert tks.info('600000', DATE) is None and len(tks.index(date=DATE)) == 0
+
+
+class TickStub(object):
+
+    def __init__(self):
+        self.calls = 0
+
+    def get(self, url, headers=None, timeout=None):
+        self.calls += 1
+        lines = [u'成交时间\t成交价格\t价格变动\t成交量(手)\t成交额(元)\t性质',
+                 u'15:00:00\t10.02\t0.01\t3\t3006\t买盘',
+                 u'14:59:57\t10.01\t--\t2\t2002\t卖盘',
+                 u'09:25:00\t10.01\t0.01\t1\t1001\t中性盘']
+        return '\n'.join(lines).encode('GBK')
+
+
+def test_get_tick_data_archives_history():
+    stub = TickStub()
+    old = tp.set_transport(stub)
+    try:
+        first = td.get_tick_data('600000', DATE)
+        second = td.get_tick_data('600000', DATE)
+    finally:
+        tp.set_transport(old)
+    assert stub.calls == 1
+    assert list(first['time']) == ['15:00:00', '14:59:57', '09:25:00']
+    pd.testing.assert_frame_equal(first, second)
+    assert list(second.columns) == ct.TICK_COLUMNS and tks.info('600000', DATE)['complete']
@@ -0,0 +1,127 @@
+# -*- coding:utf-8 -*-
+"""
+transport: 默认传输层的限速, 并发数, 熔断计数, 以及urlopen兼容接口; 不访问网络, session由假对象代替
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import threading
+import time
+import pytest
+from tushare.stock import cons as ct
+from tushare.util import retry as rt
+from tushare.util import transport as tp
+from tushare.util import workers as wk
+
+try:
+    from urllib.request import Request
+except ImportError:
+    from urllib2 import Request
+
+
+class HTTPError(IOError):
+
+    def __init__(self, status):
+        IOError.__init__(self, 'HTTP %d' % status)
+        self.status = status
+
+
+class FakeResponse(object):
+
+    def __init__(self, content, status=200):
+        self.content = content
+        self.status = status
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            raise HTTPError(self.status)
+
+
+class FakeSession(object):
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None):
+        self.requests.append((url, headers, timeout))
+        return self.respond(url)
+
+
+@pytest.fixture
+def transport(monkeypatch):
+    monkeypatch.setattr(ct, 'HOST_RATE_LIMITS', {})
+    monkeypatch.setattr(ct, 'CIRCUIT_THRESHOLD', 3)
+    rt.breaker.reset()
+    t = tp.Transport(timeout=7)
+
+    def install(respond):
+        session = FakeSession(respond)
+        monkeypatch.setattr(t, 'session', lambda host: session)
+        return session
+    yield t, install
+    rt.breaker.reset()
+
+
+def test_get_returns_content(transport):
+    t, install = transport
+    session = install(lambda url: FakeResponse(b'ok'))
+    assert t.get('http://a.example.com/x', headers={'X': '1'}) == b'ok'
+    assert session.requests == [('http://a.example.com/x', {'X': '1'}, 7)]
+
+
+def test_server_errors_open_the_circuit(transport):
+    t, install = transport
+    install(lambda url: FakeResponse(b'', 503))
+    for _ in range(3):
+        with pytest.raises(HTTPError):
+            t.get('http://down.example.com/')
+    with pytest.raises(rt.CircuitOpenError):
+        t.get('http://down.example.com/')
+    assert isinstance(rt.last_error(), rt.CircuitOpenError)
+
+
+def test_client_errors_do_not_count(transport):
+    t, install = transport
+    install(lambda url: FakeResponse(b'', 404))
+    for _ in range(5):
+        with pytest.raises(HTTPError):
+            t.get('http://missing.example.com/')
+    rt.breaker.allow('missing.example.com')
+
+
+def test_max_in_flight_per_host(transport, monkeypatch):
+    t, install = transport
+    monkeypatch.setattr(ct, 'HOST_MAX_IN_FLIGHT', {'default': 2})
+    lock = threading.Lock()
+    state = {'now': 0, 'peak': 0}
+
+    def respond(url):
+        with lock:
+            state['now'] += 1
+            state['peak'] = max(state['peak'], state['now'])
+        time.sleep(0.02)
+        with lock:
+            state['now'] -= 1
+        return FakeResponse(b'')
+    install(respond)
+    wk.run_tasks(lambda i: t.get('http://busy.example.com/%d' % i), range(8), max_workers=8)
+    assert state['peak'] == 2
+
+
+def test_urlopen_accepts_request_objects():
+    class Stub(object):
+        def get(self, url, headers=None, timeout=None):
+            self.seen = (url, headers, timeout)
+            return b'a\nb\n'
+    stub = Stub()
+    old = tp.set_transport(stub)
+    try:
+        request = Request('http://x.example.com/p')
+        request.add_header('Referer', 'http://x.example.com/')
+        with tp.urlopen(request, timeout=3) as r:
+            assert r.readlines() == [b'a\n', b'b\n']
+        assert stub.seen == ('http://x.example.com/p', {'Referer': 'http://x.example.com/'}, 3)
+        assert tp.urlopen(b'http://x.example.com/q').read() == b'a\nb\n'
+    finally:
+        assert tp.set_transport(old) is stub
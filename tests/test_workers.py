@@ -0,0 +1,50 @@
+# -*- coding:utf-8 -*-
+"""
+workers: 线程池run_tasks, 令牌桶RateLimiter和按域名限速
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import threading
+import pytest
+from tushare.stock import cons as ct
+from tushare.util import workers as wk
+
+
+def test_run_tasks_keeps_order():
+    threads = set()
+
+    def square(x):
+        threads.add(threading.current_thread().name)
+        return x * x
+    assert wk.run_tasks(square, range(20), max_workers=4) == [x * x for x in range(20)]
+    assert wk.run_tasks(square, [3]) == [9]
+    assert wk.run_tasks(square, [], max_workers=4) == []
+
+
+def test_run_tasks_single_worker_runs_inline():
+    names = wk.run_tasks(lambda _: threading.current_thread().name, range(3), max_workers=1)
+    assert names == [threading.current_thread().name] * 3
+
+
+def test_rate_limiter_burst_then_queue():
+    limiter = wk.RateLimiter(10, burst=2)
+    waits = [limiter.reserve() for _ in range(4)]
+    assert waits[0] == 0 and waits[1] == 0
+    assert waits[2] == pytest.approx(0.1, abs=0.02)
+    assert waits[3] == pytest.approx(0.2, abs=0.02)
+
+
+def test_match_host_by_suffix():
+    table = {'gtimg.cn': 20, 'sina.com.cn': 10}
+    assert wk.match_host('qt.gtimg.cn', table) == ('gtimg.cn', 20)
+    assert wk.match_host('gtimg.cn:80', table) == ('gtimg.cn', 20)
+    assert wk.match_host('notgtimg.cn', table) == (None, None)
+
+
+def test_throttle_delay_per_host(monkeypatch):
+    monkeypatch.setattr(ct, 'HOST_RATE_LIMITS', {'example.com': 5})
+    monkeypatch.setattr(wk, '_limiters', {})
+    waits = [wk.throttle_delay('http://a.example.com/x') for _ in range(7)]
+    assert waits[:5] == [0.0] * 5 and waits[6] > waits[5] > 0
+    assert wk.throttle_delay('http://other.org/') == 0.0
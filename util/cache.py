@@ -0,0 +1,344 @@
+# -*- coding:utf-8 -*-
+"""
+本地磁盘缓存: 按接口设置过期时间, 总容量超限时按最近最少使用(LRU)淘汰
+缓存文件名为key的sha1, 写入先落临时文件再原子替换
+数据以feather(需要pyarrow, 读取时内存映射)或pickle保存, 读出即为带类型的DataFrame
+旧版本以url命名的CSV缓存在未命中时查找, 转换为当前格式后删除
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import os
+import time
+import hashlib
+import tempfile
+import functools
+import threading
+import pandas as pd
+from tushare.stock import cons as ct
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+_lock = threading.Lock()
+_usage = {}
+_csv_transforms = {}
+_INDEX_COL = '__index__'
+_EXTS = ['.feather', '.pkl']
+
+
+def set_cache_dir(path):
+    """
+    设置缓存根目录, 默认为 ~/.tushare/cache/
+    """
+    ct.CACHE_DIR = path
+    return cache_root()
+
+
+def set_cache_size(max_bytes):
+    """
+    设置缓存总容量上限(字节), 超出后按最近最少使用淘汰
+    """
+    ct.CACHE_MAX_BYTES = max_bytes
+    _evict(cache_root())
+
+
+def set_cache_ttl(namespace, seconds):
+    """
+    设置某类接口缓存的过期秒数, None表示永不过期
+    """
+    ct.CACHE_TTL[namespace] = seconds
+
+
+def cache_root():
+    return os.path.abspath(os.path.expanduser(ct.CACHE_DIR))
+
+
+def _key_path(key, namespace):
+    """
+    返回不带扩展名的缓存文件路径
+    """
+    if not isinstance(key, bytes):
+        key = key.encode('utf-8')
+    name = hashlib.sha1(key).hexdigest()
+    return os.path.join(cache_root(), namespace, name[:2], name)
+
+
+def _find(base):
+    for ext in _EXTS:
+        path = base + ext
+        try:
+            return path, os.stat(path)
+        except OSError:
+            pass
+    return None, None
+
+
+def _ttl(namespace, ttl):
+    if ttl is not None:
+        return ttl
+    return ct.CACHE_TTL.get(namespace, ct.CACHE_TTL.get('default'))
+
+
+def _write_feather(path, df):
+    names = list(df.columns)
+    if not all(isinstance(c, str) for c in names) or \
+            len(set(names)) != len(names) or _INDEX_COL in names:
+        raise ValueError('feather只支持不重复的字符串列名')
+    out = df.copy(deep=False)
+    out.insert(0, _INDEX_COL, df.index)
+    feather.write_feather(out.reset_index(drop=True), path)
+
+
+def _write_frame(path, df):
+    """
+    按ct.CACHE_FORMAT写入, feather不支持的数据(如混合类型的列)改用pickle, 返回扩展名
+    """
+    if ct.CACHE_FORMAT == 'feather' and feather is not None:
+        try:
+            _write_feather(path, df)
+            return '.feather'
+        except Exception:
+            pass
+    df.to_pickle(path)
+    return '.pkl'
+
+
+def _read_frame(path):
+    if path.endswith('.feather'):
+        df = feather.read_table(path, memory_map=True).to_pandas()
+        df = df.set_index(_INDEX_COL)
+        df.index.name = None
+        return df
+    return pd.read_pickle(path)
+
+
+def get(key, namespace='default', ttl=None):
+    """
+    读取缓存, 不存在或已过期时返回None
+    Parameters
+    ------
+      key: string 缓存键, 一般为请求的url
+      namespace: string 接口类别, 对应ct.CACHE_TTL中的过期设置
+      ttl: int 过期秒数, 为空时使用ct.CACHE_TTL中的设置
+    """
+    path, st = _find(_key_path(key, namespace))
+    if path is None:
+        return None
+    ttl = _ttl(namespace, ttl)
+    now = time.time()
+    if ttl is not None and now - st.st_mtime > ttl:
+        return None
+    try:
+        df = _read_frame(path)
+    except Exception as e:
+        print(e)
+        return None
+    # mtime记录写入时间用于判断过期, atime记录最近访问时间用于LRU淘汰
+    try:
+        os.utime(path, (now, st.st_mtime))
+    except OSError:
+        pass
+    return df
+
+
+def put(key, df, namespace='default'):
+    """
+    写入缓存, 先写临时文件再原子替换, 并发读取不会读到半个文件
+    """
+    if df is None:
+        return
+    base = _key_path(key, namespace)
+    folder = os.path.dirname(base)
+    if not os.path.exists(folder):
+        try:
+            os.makedirs(folder)
+        except OSError:
+            pass
+    fd, tmp = tempfile.mkstemp(dir=folder, suffix='.tmp')
+    os.close(fd)
+    try:
+        ext = _write_frame(tmp, df)
+        path = base + ext
+        os.replace(tmp, path)
+    except Exception:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    # 换了格式时删除旧格式的文件, 保证一个key只有一份数据
+    for other in _EXTS:
+        if other != ext and os.path.exists(base + other):
+            os.remove(base + other)
+    root = cache_root()
+    with _lock:
+        if root in _usage:
+            _usage[root] += os.path.getsize(path)
+    _evict(root)
+
+
+def delete(key, namespace='default'):
+    base = _key_path(key, namespace)
+    for ext in _EXTS:
+        if os.path.exists(base + ext):
+            os.remove(base + ext)
+
+
+def register_csv_transform(namespace, func):
+    """
+    注册读取旧版本CSV缓存时对该类数据的转换, 如旧缓存保存的是未转换单位的原始表格
+    """
+    _csv_transforms[namespace] = func
+
+
+def _legacy_paths(key, suffixes):
+    """
+    旧版本的缓存是缓存目录下以url去掉'/'命名的CSV文件, 多个表格时在文件名后加后缀
+    """
+    base = os.path.join(cache_root(), key.replace('/', ''))
+    return [base + s for s in suffixes]
+
+
+def _load_legacy(key, keys, namespace, suffixes):
+    """
+    缓存未命中时查找旧版本的CSV缓存, 找到时转换为当前格式写入缓存并删除旧文件,
+    保留原来的写入时间(过期时间照常计算), 返回是否转换了
+    """
+    try:
+        paths = _legacy_paths(key, suffixes)
+        stats = [os.stat(path) for path in paths]
+    except (OSError, ValueError):
+        return False
+    try:
+        frames = [pd.read_csv(path, index_col=0) for path in paths]
+        func = _csv_transforms.get(namespace)
+        if func is not None:
+            frames = [func(df) for df in frames]
+    except Exception as e:
+        print(paths[0], e)
+        return False
+    for k, df, st in zip(keys, frames, stats):
+        put(k, df, namespace)
+        path, _ = _find(_key_path(k, namespace))
+        os.utime(path, (st.st_atime, st.st_mtime))
+    for path in paths:
+        os.remove(path)
+    return True
+
+
+def clear_cache(namespace=None):
+    """
+    清空缓存, namespace为空时清空全部
+    """
+    root = cache_root()
+    folder = root if namespace is None else os.path.join(root, namespace)
+    for path, _ in _entries(folder):
+        os.remove(path)
+    with _lock:
+        _usage.pop(root, None)
+
+
+def _entries(folder, temp=True):
+    """
+    遍历缓存文件, temp为False时跳过put正在写入的.tmp临时文件
+    """
+    for dirpath, _, files in os.walk(folder):
+        for f in files:
+            if not temp and f.endswith('.tmp'):
+                continue
+            path = os.path.join(dirpath, f)
+            try:
+                yield path, os.stat(path)
+            except OSError:
+                pass
+
+
+def _evict(root):
+    """
+    缓存总大小超过ct.CACHE_MAX_BYTES时, 按最近访问时间从旧到新删除
+    """
+    max_bytes = ct.CACHE_MAX_BYTES
+    if not max_bytes:
+        return
+    with _lock:
+        used = _usage.get(root)
+        if used is not None and used <= max_bytes:
+            return
+        entries = list(_entries(root, temp=False))
+        used = sum(st.st_size for _, st in entries)
+        if used > max_bytes:
+            entries.sort(key=lambda x: x[1].st_atime)
+            for path, st in entries:
+                if used <= max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    used -= st.st_size
+                except OSError:
+                    pass
+        _usage[root] = used
+
+
+def fetch(key, func, namespace='default', ttl=None, parts=1,
+          update=False, validate=None, legacy=None):
+    """
+    优先从缓存读取, 未命中时调用func()从网络获取并写入缓存; ct.USE_CACHE为False时不读也不写缓存
+    Parameters
+    ------
+      key: string 缓存键
+      func: function 未命中时调用, 返回DataFrame, parts>1时返回同样个数的DataFrame元组
+      namespace: string 接口类别
+      ttl: int 过期秒数
+      parts: int func返回的DataFrame个数
+      update: bool 为True时忽略缓存, 强制从网络获取
+      validate: function 传入缓存的数据, 返回False时视为未命中
+      legacy: tuple 旧版本CSV缓存各表格的文件名后缀, 为空时parts为1的查找('',), 多个表格的不查找
+    """
+    keys = [key] if parts == 1 else ['%s#%s' % (key, i) for i in range(parts)]
+    if legacy is None and parts == 1:
+        legacy = ('',)
+    if ct.USE_CACHE and not update:
+        data = _get_all(keys, namespace, ttl)
+        if data is None and legacy and _load_legacy(key, keys, namespace, legacy):
+            data = _get_all(keys, namespace, ttl)
+        if data is not None:
+            data = data[0] if parts == 1 else tuple(data)
+            if validate is None or validate(data):
+                return data
+    data = func()
+    if data is None:
+        return data
+    values = [data] if parts == 1 else data
+    if not ct.USE_CACHE or any(df is None for df in values):
+        return data
+    for k, df in zip(keys, values):
+        put(k, df, namespace)
+    return data
+
+
+def _get_all(keys, namespace, ttl):
+    frames = []
+    for k in keys:
+        df = get(k, namespace, ttl)
+        if df is None:
+            return None
+        frames.append(df)
+    return frames
+
+
+def cached(namespace='default', ttl=None, parts=1):
+    """
+    缓存装饰器, 以函数名和调用参数作为缓存键, 任意返回DataFrame的接口都可以使用
+    如: get_report_data = cached('report')(get_report_data)
+    被装饰的函数多一个update参数, 为True时强制从网络获取
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            update = kwargs.pop('update', False)
+            key = '%s.%s%r%r' % (func.__module__, func.__name__, args,
+                                 sorted(kwargs.items()))
+            return fetch(key, lambda: func(*args, **kwargs), namespace,
+                         ttl, parts, update)
+        return wrapper
+    return decorator
@@ -1,9 +1,15 @@
 # -*- coding:utf-8 -*-
 
+import re
 import datetime
 import time
+import threading
+from io import BytesIO
+import numpy as np
 import pandas as pd
 from tushare.stock import cons as ct
+from tushare.util import cache
+from tushare.util import transport as tp
 
 def year_qua(date):
     mon = date[5:7]
@@ -75,28 +81,172 @@ def get_quarts(start, end):
     return [str(d).split('Q') for d in idx][::-1]
 
 
-def trade_cal():
+def trade_cal(update=False):
     '''
             交易日历
     isOpen=1是交易日，isOpen=0为休市
+    日历文件保存在本地缓存中, 超过ct.CACHE_TTL['trade_cal']后重新下载
     '''
-    df = pd.read_csv(ct.ALL_CAL_FILE)
-    return df
+    return cache.fetch(ct.ALL_CAL_FILE, _download_cal, 'trade_cal', update=update)
+
+
+def _download_cal():
+    return pd.read_csv(BytesIO(tp.get(ct.ALL_CAL_FILE, timeout=10)))
+
+
+_ISO_DAY = re.compile(r'\d{4}-\d{2}-\d{2}$')
+# 没有日历数据时使用的周一至周五的日期范围
+_WEEKDAY_RANGE = ('1990-01-01', '2100-01-01')
+
+
+class TradeCalendar(object):
+    """
+    交易日历: 交易日保存为升序的datetime64[D]数组, 并建立日期字符串集合,
+    is_trading_day对单个日期是O(1)的集合查找, 其他查询对日期数组用searchsorted一次完成
+    日历范围之外的日期按周一至周五为交易日处理, 移动到范围之外时结果为None/NaT;
+    没有日历数据(下载失败或缓存为空)时全部按周一至周五为交易日处理
+    cal = TradeCalendar(trade_cal())
+    cal.is_trading_day('2022-10-08'), cal.shift(['2022-09-30', '2022-10-08'], 5)
+    Parameters
+    ------
+      df: DataFrame trade_cal()的结果, 列为calendarDate, isOpen
+    """
+
+    def __init__(self, df):
+        if df is None or len(df) == 0:
+            dates = np.arange(_WEEKDAY_RANGE[0], _WEEKDAY_RANGE[1], dtype='datetime64[D]')
+            self.days = dates[np.is_busday(dates)]
+        else:
+            dates = pd.to_datetime(df['calendarDate']).to_numpy().astype('datetime64[D]')
+            self.days = np.sort(dates[df['isOpen'].to_numpy() == 1])
+        self.first = str(dates.min())
+        self.last = str(dates.max())
+        self._days = set(self.days.astype(str))
+        self.loaded = time.time()
+
+    def is_trading_day(self, date):
+        """
+        是否为交易日, date为单个日期时返回bool, 为日期数组时返回bool数组
+        """
+        # 只有YYYY-MM-DD格式的字符串可以直接按字符串比较范围并查集合, 其他格式统一转换
+        if isinstance(date, str) and _ISO_DAY.match(date) and self.first <= date <= self.last:
+            return date in self._days
+        days, scalar = _to_days(date)
+        pos = np.searchsorted(self.days, days).clip(0, max(len(self.days) - 1, 0))
+        res = self.days[pos] == days if len(self.days) else np.zeros(len(days), bool)
+        outside = (days < np.datetime64(self.first)) | (days > np.datetime64(self.last))
+        res = np.where(outside, np.is_busday(days), res)
+        return bool(res[0]) if scalar else res
+
+    def next_trading_day(self, dates):
+        """
+        每个日期之后(不含当天)的第一个交易日
+        """
+        days, scalar = _to_days(dates)
+        return self._take(np.searchsorted(self.days, days, side='right'), scalar)
+
+    def prev_trading_day(self, dates):
+        """
+        每个日期之前(不含当天)的最后一个交易日
+        """
+        days, scalar = _to_days(dates)
+        return self._take(np.searchsorted(self.days, days, side='left') - 1, scalar)
+
+    def shift(self, dates, n):
+        """
+        每个日期移动n个交易日(n为负数时向前), 非交易日先回到之前最近的交易日再移动
+        """
+        days, scalar = _to_days(dates)
+        return self._take(np.searchsorted(self.days, days, side='right') - 1 + n, scalar)
+
+    def trading_days_between(self, start, end):
+        """
+        [start, end]之间(含两端)的交易日数, start/end可以是等长的日期数组
+        """
+        s, scalar = _to_days(start)
+        e, _ = _to_days(end)
+        count = (np.searchsorted(self.days, e, side='right') -
+                 np.searchsorted(self.days, s, side='left')).clip(0)
+        return int(count[0]) if scalar else count
+
+    def trading_days(self, start, end):
+        """
+        [start, end]之间的交易日, 返回升序的datetime64[D]数组
+        """
+        s = np.datetime64(str(start)[:10])
+        e = np.datetime64(str(end)[:10])
+        return self.days[np.searchsorted(self.days, s):np.searchsorted(self.days, e, side='right')]
+
+    def _take(self, pos, scalar):
+        valid = (pos >= 0) & (pos < len(self.days))
+        res = np.full(len(pos), np.datetime64('NaT'), dtype='datetime64[D]')
+        res[valid] = self.days[pos[valid]]
+        if scalar:
+            return str(res[0]) if valid[0] else None
+        return res
+
+
+def _to_days(dates):
+    """
+    把单个日期或日期数组转为datetime64[D]数组, 返回(数组, 是否为单个日期)
+    """
+    if isinstance(dates, np.ndarray) and dates.dtype.kind == 'M':
+        return dates.astype('datetime64[D]'), False
+    scalar = np.ndim(dates) == 0
+    values = pd.to_datetime([dates] if scalar else dates)
+    return np.asarray(values, dtype='datetime64[ns]').astype('datetime64[D]'), scalar
+
+
+_calendar = None
+_calendar_lock = threading.Lock()
+
+
+def calendar(update=False):
+    """
+    返回进程内共享的TradeCalendar, 第一次使用时加载, 超过ct.CACHE_TTL['trade_cal']后重新加载
+    """
+    global _calendar
+    with _calendar_lock:
+        if update or _calendar is None or \
+                time.time() - _calendar.loaded > ct.CACHE_TTL['trade_cal']:
+            try:
+                df = trade_cal(update)
+            except Exception as e:
+                print(e)
+                df = None
+            # 获取失败时沿用已加载的日历, 还没有日历时按周一至周五为交易日
+            if _calendar is None or (df is not None and len(df) > 0):
+                _calendar = TradeCalendar(df)
+            else:
+                _calendar.loaded = time.time()
+        return _calendar
+
+
+def is_trading_day(date):
+    return calendar().is_trading_day(date)
 
 
 def is_holiday(date):
     '''
-            判断是否为交易日，返回True or False
+            判断是否为休市日(周末或节假日)，返回True or False
     '''
-    df = trade_cal()
-    holiday = df[df.isOpen == 0]['calendarDate'].values
-    if isinstance(date, str):
-        today = datetime.datetime.strptime(date, '%Y-%m-%d')
+    return not calendar().is_trading_day(date)
 
-    if today.isoweekday() in [6, 7] or date in holiday:
-        return True
-    else:
-        return False
+
+def next_trading_day(dates):
+    return calendar().next_trading_day(dates)
+
+
+def prev_trading_day(dates):
+    return calendar().prev_trading_day(dates)
+
+
+def shift(dates, n):
+    return calendar().shift(dates, n)
+
+
+def trading_days_between(start, end):
+    return calendar().trading_days_between(start, end)
 
 
 def last_tddate():
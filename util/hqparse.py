@@ -0,0 +1,65 @@
+# -*- coding:utf-8 -*-
+"""
+sinajs实时行情(var hq_str_xxx="...";)的解析: 整段文本只解码一次,
+改写为CSV后由pd.read_csv一次性切分全部行, 数值列直接解析为float/int
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import re
+import csv
+from io import StringIO
+import numpy as np
+import pandas as pd
+from tushare.stock import cons as ct
+
+LIVE_FLOAT_COLS = [c for c in ct.LIVE_DATA_COLS[1:30] if not c.endswith('_v') and c != 'volume']
+LIVE_INT_COLS = ['volume'] + [c for c in ct.LIVE_DATA_COLS if c.endswith('_v')]
+_HQ_REG = re.compile(r'var hq_str_(\w*)="')
+
+
+def read_hq(content, names=None, dtype=None):
+    """
+    把sinajs行情文本解析为DataFrame, 每个代码一行, 第一列symbol为hq_str_之后的代码
+    代码不存在或停牌时返回空字符串, 对应的行除symbol外都是NaN
+    Parameters
+    ------
+      content: bytes(GBK编码)或string
+      names: list 字段名, 多出的字段丢弃, 缺少的字段为NaN; 为空时列名为0,1,2...
+      dtype: dict 字段类型, 未指定的字段为字符串
+    """
+    if isinstance(content, bytes):
+        content = content.decode('GBK')
+    text = _HQ_REG.sub(r'\1,', content).replace('";', '')
+    if names is None:
+        width = max([line.count(',') for line in text.splitlines()] or [0])
+        names = list(range(width))
+    cols = ['symbol'] + list(names)
+    # 第一行是只有占位symbol的整行, 全部代码都不存在(每行只有symbol)时read_csv也按cols的列数切分, 读入后去掉
+    text = '_' + ',' * (len(cols) - 1) + '\n' + text
+    types = dict((c, str) for c in cols)
+    types.update(dtype or {})
+    kwargs = dict(header=None, names=cols, usecols=list(range(len(cols))),
+                  quoting=csv.QUOTE_NONE, keep_default_na=False, na_values=[''])
+    try:
+        df = pd.read_csv(StringIO(text), dtype=types, **kwargs)
+    except ValueError:
+        # 数值列中出现了非数字的内容, 按字符串读入后逐列转换, 无法转换的记为NaN
+        df = pd.read_csv(StringIO(text), dtype=str, **kwargs)
+        for col, t in (dtype or {}).items():
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype(t)
+    return df.iloc[1:].reset_index(drop=True)
+
+
+def read_quotes(content):
+    """
+    解析A股实时行情, 返回带类型的DataFrame: symbol, name, 价格类为float,
+    成交量为int(股), 五档委托量为int(手), date, time; 空行(代码不存在)被去掉
+    """
+    types = dict((c, np.float64) for c in LIVE_FLOAT_COLS + LIVE_INT_COLS)
+    df = read_hq(content, ct.LIVE_DATA_COLS[:-1], types)
+    df = df[df['name'].notna()].reset_index(drop=True)
+    ints = df[LIVE_INT_COLS].fillna(0).to_numpy(dtype=np.int64)
+    ints[:, 1:] //= 100
+    df[LIVE_INT_COLS] = ints
+    return df
@@ -0,0 +1,132 @@
+# -*- coding:utf-8 -*-
+"""
+从已解析的lxml树中直接提取表格: 一次遍历行和单元格得到文本, 按列推断类型,
+代替 etree.tostring 拼接后再交给 pd.read_html 重新解析一遍
+支持colspan/rowspan展开, 千分位, '--'等空值以及百分号
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import numpy as np
+import pandas as pd
+
+NA_VALUES = frozenset(['', '--', 'NaN', 'nan', 'N/A', 'NA', 'null', 'NULL', 'None'])
+_CELLS = ('td', 'th')
+
+
+def _span(cell, name):
+    try:
+        return max(1, int(cell.get(name) or 1))
+    except ValueError:
+        return 1
+
+
+def table_rows(rows, skiprows=0):
+    """
+    提取单元格文本, 返回list of list
+    Parameters
+    ------
+      rows: lxml的table元素, 或tr元素的列表
+      skiprows: int 跳过开头的行数
+    """
+    if not isinstance(rows, list):
+        rows = rows.xpath('./tr|./thead/tr|./tbody/tr|./tfoot/tr')
+    out = []
+    spans = {}
+    for tr in rows:
+        row = []
+        for cell in tr:
+            if cell.tag not in _CELLS:
+                continue
+            if spans:
+                _fill_spans(row, spans)
+            if len(cell):
+                text = ''.join(cell.itertext()).strip()
+            else:
+                text = (cell.text or '').strip()
+            if not cell.attrib:
+                row.append(text)
+                continue
+            rowspan = _span(cell, 'rowspan')
+            for _ in range(_span(cell, 'colspan')):
+                if rowspan > 1:
+                    spans[len(row)] = [text, rowspan - 1]
+                row.append(text)
+        if spans:
+            _fill_spans(row, spans)
+        out.append(row)
+    return out[skiprows:]
+
+
+def _fill_spans(row, spans):
+    """
+    补上上面的行rowspan延续到本行的单元格
+    """
+    while len(row) in spans:
+        span = spans[len(row)]
+        row.append(span[0])
+        span[1] -= 1
+        if span[1] == 0:
+            del spans[len(row) - 1]
+
+
+def to_numeric(values, thousands=',', percent=False, na_values=NA_VALUES):
+    """
+    把一列文本转换为数值, 空值为NaN; 含有非数字内容时返回去掉空值的原文本
+    """
+    values = list(values)
+    if values:
+        # 常见情况是整列都是数字, 直接由numpy转换, 省去pandas字符串操作的固定开销
+        for dtype in (np.int64, np.float64):
+            try:
+                return pd.Series(np.array(values, dtype=dtype))
+            except (ValueError, TypeError, OverflowError):
+                pass
+    s = pd.Series(values, dtype=object)
+    s = s.where(s.notnull() & ~s.isin(na_values))
+    if s.isnull().all():
+        return s.astype(float)
+    clean = s
+    if thousands:
+        clean = clean.str.replace(thousands, '', regex=False)
+    if percent:
+        clean = clean.str.rstrip('%')
+    try:
+        return pd.to_numeric(clean)
+    except (ValueError, TypeError):
+        return s
+
+def frame(data, columns=None, drop=None, percent=None, thousands=',',
+          na_values=NA_VALUES):
+    """
+    把table_rows得到的文本行转为DataFrame, 行长度不一时补为空值,
+    能整列转换为数值的列为int/float, 其他列为字符串; 参数同read_table
+    """
+    width = max([len(r) for r in data] or [len(columns or [])])
+    cols = list(zip(*[r + [None] * (width - len(r)) for r in data])) or [()] * width
+    keep = [i for i in range(width) if not drop or i not in drop]
+    names = list(columns) if columns is not None else keep
+    percent = set(percent or [])
+    values = dict((j, to_numeric(cols[i], thousands, names[j] in percent, na_values).values)
+                  for j, i in enumerate(keep))
+    return pd.DataFrame(values, columns=range(len(keep))).set_axis(names, axis=1)
+
+
+def read_table(rows, columns=None, skiprows=0, drop=None, percent=None,
+               thousands=',', na_values=NA_VALUES):
+    """
+    从lxml树中提取表格为DataFrame, 代替 pd.read_html(etree.tostring(table))
+    Parameters
+    ------
+      rows: lxml的table元素, 或tr元素的列表
+      columns: list 列名, 为空时为0,1,2...
+      skiprows: int 跳过开头的行数
+      drop: list 在设置列名之前删除的列序号, 同 df.drop(drop, axis=1)
+      percent: list 需要去掉百分号后转为数值的列名
+      thousands: string 千分位分隔符
+      na_values: set 视为空值的文本
+    return
+    -------
+      DataFrame
+    """
+    return frame(table_rows(rows, skiprows), columns, drop, percent, thousands, na_values)
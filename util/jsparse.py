@@ -0,0 +1,61 @@
+# -*- coding:utf-8 -*-
+"""
+解析网页接口返回的JavaScript对象字面量, 如 {symbol:"sh600000",'name':'浦发银行',}
+用一个正则分词器把它改写为标准JSON后交给json.loads, 不执行任何代码
+支持: 不带引号的键(包括数字键 {1:2}), 单引号字符串, 末尾多余的逗号, undefined, 外层括号和分号;
+其他不带引号的标识符作为字符串处理
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import re
+import json
+
+# 分词: 先按字符串切开, 字符串之外的代码拼在一起再按标识符切开, 都用C实现的re.split完成,
+# Python层只对标识符做一次列表推导
+_STRINGS = re.compile(r'''("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')''', re.DOTALL)
+_IDENTS = re.compile(r'(?<![\w$.])([A-Za-z_$][\w$]*)')
+_TRAILING = re.compile(r',(\s*[\]}])')
+_NUMBER_KEYS = re.compile(r'([{,]\s*)(-?\d+(?:\.\d+)?)(\s*:)')
+_SQ_ESCAPE = re.compile(r'''\\'|"''')
+_NAMES = {'true': 'true', 'false': 'false', 'null': 'null',
+          'undefined': 'null', 'NaN': 'NaN', 'Infinity': 'Infinity'}
+_SEP = '\x00'
+
+
+def _sq_escape(m):
+    return "'" if m.group(0) == "\\'" else '\\"'
+
+
+def _strip(text):
+    text = text.strip().rstrip(';').strip()
+    while text[:1] == '(' and text[-1:] == ')':
+        text = text[1:-1].strip()
+    return text
+
+
+def to_json(text):
+    """
+    把JavaScript对象字面量改写为标准JSON字符串
+    """
+    if isinstance(text, bytes):
+        text = text.decode('utf-8')
+    parts = _STRINGS.split(_strip(text))
+    code = _TRAILING.sub(r'\1', _SEP.join(parts[0::2]))
+    code = _NUMBER_KEYS.sub(r'\1"\2"\3', code)
+    # 标识符是不带引号的键或取值, true/false/null等保留, 其余加上引号
+    tokens = _IDENTS.split(code)
+    tokens[1::2] = [_NAMES.get(name) or '"%s"' % name for name in tokens[1::2]]
+    parts[0::2] = ''.join(tokens).split(_SEP)
+    if "'" in text:
+        for i in range(1, len(parts), 2):
+            if parts[i][0] == "'":
+                parts[i] = '"%s"' % _SQ_ESCAPE.sub(_sq_escape, parts[i][1:-1])
+    return ''.join(parts)
+
+
+def loads(text):
+    """
+    解析JavaScript对象字面量, 返回dict/list, 格式错误时抛出ValueError
+    """
+    return json.loads(to_json(text))
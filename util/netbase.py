@@ -1,9 +1,10 @@
 # -*- coding:utf-8 -*- 
 
 try:
-    from urllib.request import urlopen, Request
+    from urllib.request import Request
 except ImportError:
-    from urllib2 import urlopen, Request
+    from urllib2 import Request
+from tushare.util import transport as tp
 
 
 class Client(object):
@@ -24,5 +25,5 @@ class Client(object):
         self._request = request
         
     def gvalue(self):
-        values = urlopen(self._request, timeout = 10).read()
+        values = tp.urlopen(self._request, timeout = 10).read()
         return values
@@ -0,0 +1,57 @@
+# -*- coding:utf-8 -*-
+"""
+分页抓取驱动: 迭代获取每一页, 最后一次性拼接
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import pandas as pd
+from tushare.stock import cons as ct
+from tushare.util import retry as rt
+
+
+def iter_pages(fetch_page, page=1, retry_count=3, pause=0.001):
+    """
+    逐页获取数据的生成器, 每获取到一页就产出该页的DataFrame
+    Parameters
+    ------
+      fetch_page: function
+                  fetch_page(page) 返回 (df, next_page), next_page为None时表示没有下一页
+      page: 起始页
+      retry_count : int, 默认 3
+                  每一页如遇网络等问题重复执行的次数
+      pause : int, 默认 0
+                  重复请求数据过程中暂停的秒数
+    """
+    seen = set()
+    while page is not None and str(page) not in seen:
+        seen.add(str(page))
+        for _ in rt.attempts(retry_count, pause):
+            try:
+                df, next_page = fetch_page(page)
+            except Exception as e:
+                print(e)
+            else:
+                break
+        else:
+            raise IOError(ct.NETWORK_URL_ERROR_MSG)
+        if df is not None and len(df) > 0:
+            yield df
+        page = next_page
+
+
+def concat_pages(pages):
+    """
+    把逐页获取的DataFrame一次性拼接, 没有数据时返回None
+    """
+    frames = list(pages)
+    if len(frames) == 0:
+        return None
+    return pd.concat(frames, ignore_index=True)
+
+
+def collect_pages(fetch_page, page=1, retry_count=3, pause=0.001):
+    """
+    获取全部分页数据并拼接为一个DataFrame, 参数同iter_pages
+    """
+    return concat_pages(iter_pages(fetch_page, page, retry_count, pause))
@@ -0,0 +1,267 @@
+# -*- coding:utf-8 -*-
+"""
+本地时点(point-in-time)基本面存档: 每个数据集一个文件, 每行以(code, period报告期, publish披露日)为键,
+回测时按"某天已经披露了什么"查询, 查询用searchsorted对全部(代码, 日期)一次完成, 没有逐行的Python循环
+    pit.ingest('report', ts.get_report_data(2021, 4), year=2021, quarter=4)
+    pit.ingest('czzb', ts.get_debtpaying('600848', 2021), code='600848')
+    df = pit.asof_join('report', prices, ['eps', 'roe'])
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import os
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+from tushare.stock import cons as ct
+from tushare.util import dateu as du
+try:
+    import pyarrow.feather as feather
+except ImportError:
+    feather = None
+
+KEYS = ['code', 'period', 'publish']
+# 各报告期的法定披露截止日: 报告期月份 -> 向后的月末数, 没有披露日期时以截止日为披露日
+_DEADLINE_MONTHS = {3: 1, 6: 2, 9: 1, 12: 4}
+_locks = {}
+_locks_lock = threading.Lock()
+
+
+def set_pit_dir(path):
+    """
+    设置时点基本面存档目录, 默认为 ~/.tushare/pit/
+    """
+    ct.PIT_DIR = path
+    return pit_root()
+
+
+def pit_root():
+    return os.path.abspath(os.path.expanduser(ct.PIT_DIR))
+
+
+def _lock(dataset):
+    with _locks_lock:
+        return _locks.setdefault(dataset, threading.Lock())
+
+
+def _path(dataset, ext):
+    return os.path.join(pit_root(), dataset + ext)
+
+
+def read(dataset, code=None):
+    """
+    读取数据集, 按(code, publish, period)排序, 没有存档时返回None
+    """
+    for ext in ['.feather', '.pkl']:
+        path = _path(dataset, ext)
+        if os.path.exists(path):
+            if ext == '.feather':
+                df = feather.read_table(path, memory_map=True).to_pandas()
+            else:
+                df = pd.read_pickle(path)
+            if code is not None:
+                codes = [code] if isinstance(code, str) else list(code)
+                df = df[df['code'].isin(codes)].reset_index(drop=True)
+            return df
+    return None
+
+
+def _write(dataset, df):
+    root = pit_root()
+    if not os.path.exists(root):
+        os.makedirs(root)
+    fd, tmp = tempfile.mkstemp(dir=root, suffix='.tmp')
+    os.close(fd)
+    ext = '.pkl'
+    if feather is not None:
+        try:
+            feather.write_feather(df, tmp)
+            ext = '.feather'
+        except Exception:
+            pass
+    if ext == '.pkl':
+        df.to_pickle(tmp)
+    os.replace(tmp, _path(dataset, ext))
+    other = _path(dataset, '.pkl' if ext == '.feather' else '.feather')
+    if os.path.exists(other):
+        os.remove(other)
+
+
+def _deadline(period):
+    """
+    报告期对应的法定披露截止日
+    """
+    res = pd.Series(pd.NaT, index=period.index, dtype='datetime64[ns]')
+    for month, n in _DEADLINE_MONTHS.items():
+        hit = period.dt.month == month
+        if hit.any():
+            res[hit] = period[hit] + pd.offsets.MonthEnd(n)
+    return res
+
+
+def _publish(df, period):
+    """
+    披露日: report_date为MM-DD时按报告期补全年份(早于报告期的是下一年),
+    为完整日期时直接使用, 缺失时取法定披露截止日
+    """
+    deadline = _deadline(period)
+    if 'report_date' not in df.columns:
+        return deadline
+    text = df['report_date'].astype(str).str.strip()
+    short = text.str.len() == 5
+    text = text.where(~short, period.dt.year.astype(str) + '-' + text)
+    publish = pd.to_datetime(text, errors='coerce', format='%Y-%m-%d')
+    publish = publish.where(~(short & (publish < period)), publish + pd.DateOffset(years=1))
+    return publish.fillna(deadline)
+
+
+def ingest(dataset, df, code=None, year=None, quarter=None):
+    """
+    把接口返回的基本面数据写入存档, 同一(code, period, publish)以新数据为准, 返回存档总行数
+    Parameters
+    ------
+      dataset: string 数据集名称, 如 'report', 'czzb'
+      df: DataFrame get_report_data/get_profit_data/get_fundamental_panel等(报告期由year, quarter给出),
+          或get_debtpaying/get_profit等_get_cwfx的结果(报告期为bgrq列, 代码由code给出)
+      code: string 股票代码, df中没有code列时使用
+      year, quarter: int df中没有bgrq列时的报告期
+    """
+    if df is None or len(df) == 0:
+        return 0
+    df = df.reset_index(drop=True)
+    if 'bgrq' in df.columns:
+        period = pd.to_datetime(df['bgrq'], errors='coerce')
+    else:
+        period = pd.Series(pd.Timestamp(du.get_q_date(year, quarter)), index=df.index)
+    data = df.drop([c for c in ['code', 'bgrq', 'report_date'] if c in df.columns], axis=1)
+    data.insert(0, 'publish', _publish(df, period).to_numpy(dtype='datetime64[ns]'))
+    data.insert(0, 'period', period.to_numpy(dtype='datetime64[ns]'))
+    data.insert(0, 'code', df['code'].astype(str).str.zfill(6) if 'code' in df.columns else code)
+    data = data[data['period'].notnull()]
+    with _lock(dataset):
+        old = read(dataset)
+        if old is not None:
+            data = pd.concat([old, data], ignore_index=True)
+        data = data.drop_duplicates(KEYS, keep='last')
+        data = data.sort_values(['code', 'publish', 'period']).reset_index(drop=True)
+        _write(dataset, data)
+    return len(data)
+
+
+def _effective(df):
+    """
+    每只股票按披露日排列后, 只保留报告期不早于之前已披露的最新报告期的记录:
+    补充披露或更正更早的报告期不改变"最新一期"的数据, 同一报告期的更正则替换之前的数据
+    """
+    period = df['period'].to_numpy(dtype='datetime64[ns]').astype(np.int64)
+    latest = pd.Series(period).groupby(df['code'].to_numpy()).cummax().to_numpy()
+    return df[period >= latest].reset_index(drop=True)
+
+
+def asof_index(table, codes, dates, lag=1):
+    """
+    对每个(代码, 日期)找出当天可见的最新一条记录在table中的行号, 找不到时为-1
+    Parameters
+    ------
+      table: DataFrame read()的结果(已按code, publish排序)
+      codes: 代码数组
+      dates: 与codes等长的日期数组
+      lag: int 披露后第几天可用, 默认1(披露当天收盘后的数据次日才能使用)
+    """
+    if not isinstance(codes, pd.Series):
+        codes = np.asarray(codes, dtype=object)
+    qcode, names = pd.factorize(codes)
+    return _locate(table, names, qcode, _days(dates), lag)
+
+
+def _days(dates):
+    return np.asarray(pd.to_datetime(dates), dtype='datetime64[D]').astype(np.int64)
+
+
+def _locate(table, names, qcode, qday, lag):
+    """
+    names为去重后的查询代码, qcode为每个查询在names中的序号;
+    把(代码序号, 日期)编码为一个整数, 对全部查询做一次searchsorted
+    """
+    tcode = pd.Index(names).get_indexer(table['code'])
+    keep = tcode >= 0
+    tcode = tcode[keep].astype(np.int64)
+    rows = np.flatnonzero(keep)
+    tday = table['publish'].to_numpy(dtype='datetime64[D]').astype(np.int64)[keep] + lag
+    qcode = np.asarray(qcode, dtype=np.int64)
+    if len(tday) == 0 or len(qday) == 0:
+        return np.full(len(qday), -1, dtype=np.int64)
+    base = min(tday.min(), qday.min())
+    span = max(tday.max(), qday.max()) - base + 1
+    order = np.lexsort((tday, tcode))
+    tcode, rows = tcode[order], rows[order]
+    tkey = tcode * span + (tday[order] - base)
+    qkey = qcode * span + (qday - base)
+    pos = np.searchsorted(tkey, qkey, side='right') - 1
+    found = (pos >= 0) & (qcode >= 0)
+    found[found] = tcode[pos[found]] == qcode[found]
+    return np.where(found, rows[np.clip(pos, 0, None)], -1)
+
+
+def _take(table, cols, idx):
+    """
+    按行号取出各列, 行号为-1的为空值
+    """
+    miss = idx < 0
+    res = table[cols].take(np.where(miss, 0, idx)).reset_index(drop=True)
+    if miss.any():
+        res = res.apply(lambda col: col.where(~miss))
+    return res
+
+
+def _load(dataset, fields):
+    table = read(dataset)
+    if table is None:
+        return None, ['period', 'publish'] + list(fields or [])
+    table = _effective(table)
+    cols = ['period', 'publish'] + [c for c in (fields or table.columns[3:]) if c in table.columns]
+    return table, cols
+
+
+def asof(dataset, codes, dates, fields=None, lag=1):
+    """
+    查询每个(代码, 日期)当天已披露的最新一期数据, 返回与codes/dates逐行对应的DataFrame,
+    列为period, publish和fields(为空时为全部字段), 没有数据的行为NaN
+    """
+    table, cols = _load(dataset, fields)
+    if table is None:
+        return pd.DataFrame(index=range(len(codes)), columns=cols)
+    return _take(table, cols, asof_index(table, codes, dates, lag))
+
+
+def asof_join(dataset, panel, fields=None, date_col='date', code_col='code', lag=1):
+    """
+    把时点基本面并入日线面板(长表, 每行一个代码一天), 返回增加了fields列的新面板
+    Parameters
+    ------
+      dataset: string 数据集名称
+      panel: DataFrame 包含date_col和code_col两列, date_col也可以是索引
+      fields: list 需要并入的字段, 为空时为全部字段
+    """
+    dates = panel.index if date_col not in panel.columns else panel[date_col]
+    res = asof(dataset, panel[code_col], np.asarray(dates), fields, lag)
+    res.index = panel.index
+    return pd.concat([panel, res.drop(['period', 'publish'], axis=1)], axis=1)
+
+
+def asof_wide(dataset, dates, codes, field, lag=1):
+    """
+    返回某个字段的宽表: 索引为dates, 列为codes, 值为每天可见的最新一期数据
+    """
+    dates = pd.DatetimeIndex(pd.to_datetime(dates))
+    codes = list(codes)
+    table, cols = _load(dataset, [field])
+    if table is None or field not in cols:
+        return pd.DataFrame(np.nan, index=dates, columns=codes)
+    # 按代码在外、日期在内排列查询, 编码后的查询键整体有序
+    qcode = np.repeat(np.arange(len(codes)), len(dates))
+    qday = np.tile(_days(dates), len(codes))
+    idx = _locate(table, codes, qcode, qday, lag)
+    values = _take(table, [field], idx)[field].to_numpy()
+    return pd.DataFrame(values.reshape(len(codes), len(dates)).T, index=dates, columns=codes)
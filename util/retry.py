@@ -0,0 +1,165 @@
+# -*- coding:utf-8 -*-
+"""
+统一的重试策略: 指数退避加随机抖动, 区分可重试的错误, 总耗时上限,
+以及按域名的熔断器(连续失败过多时暂停请求该域名)
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import time
+import random
+import socket
+import threading
+from tushare.stock import cons as ct
+
+
+class CircuitOpenError(IOError):
+    """
+    域名处于熔断状态, 请求未发出
+    """
+    pass
+
+
+_local = threading.local()
+
+
+def note_error(exc):
+    """
+    传输层记录当前线程最近一次请求的错误, 成功时记为None
+    """
+    _local.error = exc
+
+
+def last_error():
+    return getattr(_local, 'error', None)
+
+
+def is_retryable(exc):
+    """
+    判断错误是否值得重试: 网络错误, 超时, 5xx, 429可以重试; 其他4xx和熔断不重试
+    """
+    if isinstance(exc, CircuitOpenError):
+        return False
+    response = getattr(exc, 'response', None)
+    status = getattr(response, 'status_code', None) or getattr(exc, 'code', None) \
+        or getattr(exc, 'status', None)
+    if isinstance(status, int):
+        return status >= 500 or status in (408, 429)
+    return isinstance(exc, (IOError, OSError, socket.timeout))
+
+
+class CircuitBreaker(object):
+    """
+    按域名熔断: 连续失败ct.CIRCUIT_THRESHOLD次后, ct.CIRCUIT_RESET秒内直接失败,
+    之后放行一次试探请求, 成功则恢复
+    """
+
+    def __init__(self):
+        self._failures = {}
+        self._opened = {}
+        self._lock = threading.Lock()
+
+    def allow(self, host):
+        with self._lock:
+            opened = self._opened.get(host)
+            if opened is None:
+                return
+            if time.time() - opened < ct.CIRCUIT_RESET:
+                raise CircuitOpenError('%s 连续请求失败, 暂停请求' % host)
+            # 半开状态: 放行这一次, 失败后重新计时
+            self._opened[host] = time.time()
+
+    def success(self, host):
+        with self._lock:
+            self._failures.pop(host, None)
+            self._opened.pop(host, None)
+
+    def failure(self, host):
+        with self._lock:
+            count = self._failures.get(host, 0) + 1
+            self._failures[host] = count
+            if ct.CIRCUIT_THRESHOLD and count >= ct.CIRCUIT_THRESHOLD:
+                self._opened[host] = time.time()
+
+    def reset(self, host=None):
+        with self._lock:
+            if host is None:
+                self._failures.clear()
+                self._opened.clear()
+            else:
+                self._failures.pop(host, None)
+                self._opened.pop(host, None)
+
+
+breaker = CircuitBreaker()
+
+
+class RetryPolicy(object):
+    """
+    重试策略
+    Parameters
+    ------
+      retries: int 最多尝试次数
+      backoff: float 第一次重试前等待的秒数, 之后每次翻倍, 为空时使用ct.RETRY_BACKOFF
+      max_backoff: float 单次等待的上限秒数, 为空时使用ct.RETRY_MAX_BACKOFF
+      jitter: float 0~1, 每次等待时间中随机部分的比例, 避免并发任务同时重试
+      deadline: float 总耗时上限秒数, 为空时使用ct.RETRY_DEADLINE, 再等待会超出时不再重试
+    """
+
+    def __init__(self, retries=3, backoff=None, max_backoff=None,
+                 jitter=0.5, deadline=None):
+        self.retries = retries
+        self.backoff = ct.RETRY_BACKOFF if backoff is None else backoff
+        self.max_backoff = ct.RETRY_MAX_BACKOFF if max_backoff is None else max_backoff
+        self.jitter = jitter
+        self.deadline = ct.RETRY_DEADLINE if deadline is None else deadline
+
+    def delay(self, attempt):
+        """
+        第attempt次重试(从1开始)前等待的秒数
+        """
+        d = min(self.max_backoff, self.backoff * 2 ** (attempt - 1))
+        return d * (1 - self.jitter) + random.uniform(0, d * self.jitter)
+
+    def attempts(self):
+        """
+        重试循环用的生成器, 产出尝试序号, 第一次不等待
+        循环体成功时应直接return或break, 被再次迭代即视为上一次失败;
+        上一次失败是传输层不可重试的错误(如404, 熔断)时提前结束
+        """
+        start = time.time()
+        for i in range(self.retries):
+            if i > 0:
+                err = last_error()
+                if err is not None and not is_retryable(err):
+                    return
+                d = self.delay(i)
+                if self.deadline and time.time() - start + d > self.deadline:
+                    return
+                time.sleep(d)
+            note_error(None)
+            yield i
+
+    def call(self, func, *args, **kwargs):
+        """
+        调用func, 遇到可重试的错误时按策略重试, 最终失败时抛出最后一次的错误
+        """
+        error = None
+        for _ in self.attempts():
+            try:
+                return func(*args, **kwargs)
+            except Exception as e:
+                note_error(e)
+                if not is_retryable(e):
+                    raise
+                print(e)
+                error = e
+        raise error if error is not None else IOError(ct.NETWORK_URL_ERROR_MSG)
+
+
+def attempts(retry_count=3, pause=0.001):
+    """
+    替代 for _ in range(retry_count): time.sleep(pause) 的重试循环
+    pause作为退避的起始秒数, 小于ct.RETRY_BACKOFF时使用ct.RETRY_BACKOFF
+    """
+    return RetryPolicy(retry_count, max(pause, ct.RETRY_BACKOFF)).attempts()
@@ -0,0 +1,200 @@
+# -*- coding:utf-8 -*-
+"""
+本地分笔数据存档: 每只股票每个交易日一个目录, 每列一个定长二进制文件, 只追加不改写,
+读取时内存映射; meta.json记录行数和是否已是完整的一天, 目录结构即为日期/代码索引
+数据按成交时间从早到晚保存, 盘中可以不断追加新的成交
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import os
+import json
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+from tushare.stock import cons as ct
+
+# 列名: 保存类型, time为HH:MM:SS定长字节串, type为-1(卖盘) 0(中性盘) 1(买盘)
+COLUMNS = [('time', 'S8'), ('price', 'f8'), ('pchange', 'f8'), ('change', 'f8'),
+           ('volume', 'i8'), ('amount', 'f8'), ('type', 'i1')]
+_DTYPES = dict(COLUMNS)
+_TICK_TYPES = [u'卖盘', u'中性盘', u'买盘']
+_META = 'meta.json'
+_locks = {}
+_locks_lock = threading.Lock()
+
+
+def set_tick_dir(path):
+    """
+    设置分笔存档目录, 默认为 ~/.tushare/ticks/
+    """
+    ct.TICK_DIR = path
+    return tick_root()
+
+
+def tick_root():
+    return os.path.abspath(os.path.expanduser(ct.TICK_DIR))
+
+
+def _folder(code, date):
+    return os.path.join(tick_root(), date, code)
+
+
+def _lock(code, date):
+    """
+    每个(code, date)一把可重入锁, 调用方可以把读存档、下载和append放在同一把锁内
+    """
+    with _locks_lock:
+        return _locks.setdefault((code, date), threading.RLock())
+
+
+def info(code, date):
+    """
+    返回存档信息 {'rows': 行数, 'columns': 列名, 'complete': 是否完整, 'last_time': 最后成交时间},
+    没有存档时返回None
+    """
+    try:
+        with open(os.path.join(_folder(code, date), _META)) as f:
+            return json.load(f)
+    except (IOError, OSError, ValueError):
+        return None
+
+
+def _write_meta(folder, meta):
+    fd, tmp = tempfile.mkstemp(dir=folder, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(meta, f)
+    os.replace(tmp, os.path.join(folder, _META))
+
+
+def _encode(df, col):
+    values = df[col]
+    if col == 'time':
+        return np.array(values.astype(str).tolist(), dtype='S8')
+    if col == 'type':
+        codes = values.map(dict((t, i - 1) for i, t in enumerate(_TICK_TYPES)))
+        return codes.fillna(0).to_numpy(dtype='i1')
+    if col == 'pchange' and not pd.api.types.is_numeric_dtype(values):
+        values = values.astype(str).str.replace('%', '', regex=False)
+    values = pd.to_numeric(values, errors='coerce')
+    if _DTYPES[col] == 'i8':
+        values = values.fillna(0)
+    return values.to_numpy(dtype=_DTYPES[col])
+
+
+def append(code, date, df, complete=False):
+    """
+    追加分笔数据, df须按成交时间从早到晚排列; 返回追加后的总行数
+    先写数据文件再原子替换meta.json, 中途失败时多写的部分在下次追加前被截掉
+    Parameters
+    ------
+      code: string 股票代码
+      date: string 日期 format：YYYY-MM-DD
+      df: DataFrame 列为COLUMNS中的全部或部分
+      complete: bool 为True时表示当天数据已完整, 之后直接从存档读取
+    """
+    folder = _folder(code, date)
+    with _lock(code, date):
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+        meta = info(code, date) or {'rows': 0, 'complete': False, 'last_time': None,
+                                    'columns': [c for c, _ in COLUMNS if c in df.columns]}
+        rows = meta['rows']
+        if df is not None and len(df) > 0:
+            for col in meta['columns']:
+                path = os.path.join(folder, col)
+                size = rows * np.dtype(_DTYPES[col]).itemsize
+                with open(path, 'ab') as f:
+                    if f.tell() != size:
+                        f.truncate(size)
+                    if col in df.columns:
+                        data = _encode(df, col)
+                    else:
+                        data = np.zeros(len(df), dtype=_DTYPES[col])
+                    f.write(data.tobytes())
+            rows += len(df)
+            meta['last_time'] = str(df['time'].iloc[-1])
+        meta['rows'] = rows
+        meta['complete'] = bool(complete or meta['complete'])
+        _write_meta(folder, meta)
+        return rows
+
+
+def arrays(code, date, columns=None):
+    """
+    以内存映射方式返回各列的数组(dict), 没有存档时返回None
+    """
+    meta = info(code, date)
+    if meta is None:
+        return None
+    folder = _folder(code, date)
+    res = {}
+    for col in columns or meta['columns']:
+        if meta['rows'] == 0:
+            res[col] = np.zeros(0, dtype=_DTYPES[col])
+        else:
+            res[col] = np.memmap(os.path.join(folder, col), dtype=_DTYPES[col],
+                                 mode='r', shape=(meta['rows'],))
+    return res
+
+
+def read(code, date, columns=None):
+    """
+    读取存档为DataFrame, 按成交时间从早到晚排列, 没有存档时返回None
+    """
+    data = arrays(code, date, columns)
+    if data is None:
+        return None
+    df = pd.DataFrame()
+    for col, values in data.items():
+        if col == 'time':
+            df[col] = values.astype('U8')
+        elif col == 'type':
+            df[col] = np.array(_TICK_TYPES, dtype=object)[values.astype(int) + 1]
+        else:
+            df[col] = np.asarray(values)
+    return df
+
+
+def tail_count(code, date, time):
+    """
+    存档末尾成交时间等于time的行数, 用于盘中追加时去掉与已有数据重复的成交
+    """
+    data = arrays(code, date, ['time'])
+    if data is None or len(data['time']) == 0:
+        return 0
+    times = data['time']
+    key = np.array(time, dtype='S8')
+    return len(times) - int(np.searchsorted(times, key, side='left'))
+
+
+def index(code=None, date=None):
+    """
+    列出已存档的数据, 返回DataFrame: date, code, rows, complete
+    """
+    root = tick_root()
+    rows = []
+    if date is not None:
+        dates = [date]
+    else:
+        dates = sorted(os.listdir(root)) if os.path.exists(root) else []
+    for d in dates:
+        folder = os.path.join(root, d)
+        if not os.path.isdir(folder):
+            continue
+        codes = [code] if code is not None else sorted(os.listdir(folder))
+        for c in codes:
+            meta = info(c, d)
+            if meta is not None:
+                rows.append([d, c, meta['rows'], meta['complete']])
+    return pd.DataFrame(rows, columns=['date', 'code', 'rows', 'complete'])
+
+
+def delete(code, date):
+    folder = _folder(code, date)
+    with _lock(code, date):
+        if os.path.exists(folder):
+            for f in os.listdir(folder):
+                os.remove(os.path.join(folder, f))
+            os.rmdir(folder)
@@ -0,0 +1,163 @@
+# -*- coding:utf-8 -*-
+"""
+统一的HTTP传输层: 按域名复用keep-alive连接池, 支持gzip, 超时,
+每个域名的最大并发请求数, 令牌桶限速以及熔断
+测试时可以用set_transport替换为本地的桩实现
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from tushare.stock import cons as ct
+from tushare.util import workers as wk
+from tushare.util import retry as rt
+
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse
+
+
+class Transport(object):
+    """
+    默认的传输实现, 每个域名一个requests.Session
+    requests默认发送Accept-Encoding: gzip, deflate并自动解压
+    Parameters
+    ------
+      timeout: 默认超时秒数, 为空时使用ct.HTTP_TIMEOUT
+      pool_maxsize: 每个域名连接池大小, 为空时与ct.MAX_WORKERS一致
+    """
+
+    def __init__(self, timeout=None, pool_maxsize=None):
+        self.timeout = timeout
+        self.pool_maxsize = pool_maxsize
+        self._sessions = {}
+        self._slots = {}
+        self._lock = threading.Lock()
+
+    def _pool_size(self):
+        return self.pool_maxsize or max(ct.MAX_WORKERS, 10)
+
+    def session(self, host):
+        with self._lock:
+            s = self._sessions.get(host)
+            if s is None:
+                s = requests.Session()
+                s.headers['User-Agent'] = ct.HTTP_USER_AGENT
+                adapter = HTTPAdapter(pool_connections=1,
+                                      pool_maxsize=self._pool_size())
+                s.mount('http://', adapter)
+                s.mount('https://', adapter)
+                self._sessions[host] = s
+            return s
+
+    def _slot(self, host):
+        """
+        按ct.HOST_MAX_IN_FLIGHT限制同一域名同时进行中的请求数
+        """
+        suffix, limit = wk.match_host(host, ct.HOST_MAX_IN_FLIGHT)
+        if suffix is None:
+            suffix, limit = host, ct.HOST_MAX_IN_FLIGHT.get('default')
+        if not limit:
+            return None
+        with self._lock:
+            slot = self._slots.get(suffix)
+            if slot is None or slot[0] != limit:
+                slot = (limit, threading.BoundedSemaphore(limit))
+                self._slots[suffix] = slot
+            return slot[1]
+
+    def get(self, url, headers=None, timeout=None):
+        """
+        GET请求, 返回响应内容(bytes), HTTP错误状态时抛出异常
+        网络错误和5xx计入该域名的熔断计数, 错误记录到rt.last_error()供重试循环判断
+        """
+        host = urlparse(url).netloc
+        timeout = timeout or self.timeout or ct.HTTP_TIMEOUT
+        try:
+            rt.breaker.allow(host)
+            wk.throttle(url)
+            slot = self._slot(host)
+            if slot is not None:
+                slot.acquire()
+            try:
+                r = self.session(host).get(url, headers=headers, timeout=timeout)
+                r.raise_for_status()
+            finally:
+                if slot is not None:
+                    slot.release()
+        except Exception as e:
+            rt.note_error(e)
+            if rt.is_retryable(e):
+                rt.breaker.failure(host)
+            raise
+        rt.breaker.success(host)
+        return r.content
+
+    def close(self):
+        with self._lock:
+            for s in self._sessions.values():
+                s.close()
+            self._sessions = {}
+
+
+class Response(object):
+    """
+    兼容urlopen返回值的用法: read(), readlines() 以及 with 语句
+    """
+
+    def __init__(self, content):
+        self._content = content
+
+    def read(self):
+        return self._content
+
+    def readlines(self):
+        return self._content.splitlines(True)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+
+_transport = Transport()
+
+
+def get_transport():
+    return _transport
+
+
+def set_transport(transport):
+    """
+    替换全局的传输实现, 返回原来的实现
+    transport需要实现 get(url, headers=None, timeout=None) 并返回bytes,
+    测试时可以传入指向本地桩服务器或直接返回固定内容的实现
+    """
+    global _transport
+    old = _transport
+    _transport = transport
+    return old
+
+
+def get(url, headers=None, timeout=None):
+    return _transport.get(url, headers=headers, timeout=timeout)
+
+
+def urlopen(request, timeout=None):
+    """
+    替代urllib的urlopen, request可以是url字符串或urllib的Request对象
+    """
+    if not hasattr(request, 'get_full_url'):
+        url, headers = request, None
+    else:
+        url, headers = request.get_full_url(), dict(request.header_items())
+    if isinstance(url, bytes):
+        url = url.decode('utf-8')
+    return Response(get(url, headers=headers, timeout=timeout))
@@ -0,0 +1,108 @@
+# -*- coding:utf-8 -*-
+"""
+并发抓取工具: 线程池与按域名限速
+Created on 2026/10/18
+@author: Charlie Zhou
+@contact: ben02060846@qq.com
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from tushare.stock import cons as ct
+
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse
+
+
+class RateLimiter(object):
+    """
+    令牌桶限速器
+    rate: 每秒补充的令牌数(即平均每秒请求数)
+    burst: 桶容量, 允许的瞬时突发请求数, 默认等于rate
+    """
+
+    def __init__(self, rate, burst=None):
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(rate, 1))
+        self._tokens = self.burst
+        self._last = time.time()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """
+        预订一个令牌, 返回需要等待的秒数(令牌可以透支, 透支部分按速率排队)
+        异步代码可以用返回值做非阻塞的等待
+        """
+        with self._lock:
+            now = time.time()
+            self._tokens = min(self.burst,
+                               self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            self._tokens -= 1
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def match_host(host, table):
+    """
+    按域名后缀匹配table中的配置, 返回(匹配到的后缀, 配置值)
+    """
+    host = host.split(':')[0]
+    for suffix, value in table.items():
+        if host == suffix or host.endswith('.' + suffix):
+            return suffix, value
+    return None, None
+
+
+def _host_rate(host):
+    """
+    按域名后缀匹配ct.HOST_RATE_LIMITS中的限速配置
+    """
+    return match_host(host, ct.HOST_RATE_LIMITS)
+
+
+def throttle_delay(url):
+    """
+    为请求url预订该域名的一个令牌, 返回需要等待的秒数, 没有限速时为0
+    """
+    suffix, rate = _host_rate(urlparse(url).netloc)
+    if suffix is None or not rate:
+        return 0.0
+    with _limiters_lock:
+        limiter = _limiters.get(suffix)
+        if limiter is None or limiter.rate != rate:
+            limiter = RateLimiter(rate)
+            _limiters[suffix] = limiter
+    return limiter.reserve()
+
+
+def throttle(url):
+    """
+    请求url之前调用, 超过该域名的限速时阻塞等待
+    """
+    wait = throttle_delay(url)
+    if wait > 0:
+        time.sleep(wait)
+
+
+def run_tasks(func, items, max_workers=None):
+    """
+    用线程池并发执行func(item), 结果顺序与items一致
+    max_workers为空时使用ct.MAX_WORKERS, 只有一个任务时直接在当前线程执行
+    """
+    items = list(items)
+    max_workers = ct.MAX_WORKERS if max_workers is None else max_workers
+    if len(items) <= 1 or max_workers <= 1:
+        return [func(item) for item in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(func, items))